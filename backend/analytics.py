@@ -6,6 +6,11 @@ Ported from JavaScript to Python
 from typing import Dict, List, Tuple
 from models import SystemState, Team, Faculty, Project, Interface
 
+try:
+    import numpy as np
+except ImportError:  # only needed for columnar interface stores
+    np = None
+
 
 class FramesAnalytics:
     """Analytics engine for FRAMES system diagnostics"""
@@ -13,21 +18,113 @@ class FramesAnalytics:
     def __init__(self, system_state: SystemState):
         self.state = system_state
 
+    # ------------------------------------------------------------------
+    # Interface aggregates
+    # Columnar states are answered with array operations; list-backed
+    # states keep the plain generator expressions.
+    # ------------------------------------------------------------------
+
+    def _columnar(self):
+        """Return the columnar interface store, or None for list-backed states"""
+        interfaces = self.state.interfaces
+        return interfaces if getattr(interfaces, 'is_columnar', False) else None
+
+    def _count_energy_loss(self, minimum=None, maximum=None, strict=False) -> int:
+        """Count interfaces whose energy loss falls inside the given bounds"""
+        store = self._columnar()
+        if store is not None:
+            values = store.energy_loss
+            mask = values == values  # excludes NaN
+            if minimum is not None:
+                mask &= (values > minimum) if strict else (values >= minimum)
+            if maximum is not None:
+                mask &= values <= maximum
+            return int(mask.sum())
+
+        def matches(loss):
+            if minimum is not None and not (loss > minimum if strict else loss >= minimum):
+                return False
+            return maximum is None or loss <= maximum
+
+        return sum(1 for i in self.state.interfaces if matches(i.energy_loss))
+
+    def _total_energy_loss(self) -> float:
+        store = self._columnar()
+        if store is not None:
+            return float(np.nansum(store.energy_loss))
+        return sum(i.energy_loss for i in self.state.interfaces)
+
+    def _count_bond_type(self, contains: str = None, equals: str = None) -> int:
+        """Count interfaces whose bond type contains or equals a value"""
+        store = self._columnar()
+        if store is not None:
+            return int(store.bond_type_mask(substring=contains, equals=equals).sum())
+        if equals is not None:
+            return sum(1 for i in self.state.interfaces if i.bond_type == equals)
+        return sum(1 for i in self.state.interfaces if contains in i.bond_type)
+
+    def _count_cross_discipline_interfaces(self) -> int:
+        """Count team-to-team interfaces that connect different disciplines"""
+        disciplines = {}
+        for team in self.state.teams:
+            disciplines.setdefault(team.id, team.discipline)
+
+        store = self._columnar()
+        if store is not None:
+            from_disc, to_disc = store.entity_attribute_codes(disciplines)
+            return int(((from_disc >= 0) & (to_disc >= 0) & (from_disc != to_disc)).sum())
+
+        count = 0
+        for interface in self.state.interfaces:
+            if interface.from_entity not in disciplines or interface.to_entity not in disciplines:
+                continue
+            if disciplines[interface.from_entity] != disciplines[interface.to_entity]:
+                count += 1
+        return count
+
+    def energy_loss_histogram(self, bins: Tuple[int, ...] = (0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100)) -> Dict:
+        """Histogram of interface energy loss (percent) over the given bin edges"""
+        store = self._columnar()
+        if store is not None:
+            values = store.energy_loss
+            values = values[~np.isnan(values)]
+        else:
+            values = [i.energy_loss for i in self.state.interfaces if i.energy_loss is not None]
+
+        if np is not None:
+            counts, _ = np.histogram(values, bins=bins)
+            counts = [int(c) for c in counts]
+        else:
+            # Same binning as numpy.histogram: half-open bins, last bin closed
+            counts = [0] * (len(bins) - 1)
+            for value in values:
+                for b in range(len(bins) - 1):
+                    last = b == len(bins) - 2
+                    if bins[b] <= value < bins[b + 1] or (last and value == bins[b + 1]):
+                        counts[b] += 1
+                        break
+
+        return {
+            'bins': list(bins),
+            'counts': counts,
+            'total': len(values)
+        }
+
     def calculate_statistics(self) -> Dict:
         """Calculate overall system statistics"""
         total_molecules = len(self.state.teams) + len(self.state.faculty) + len(self.state.projects)
         total_bonds = len(self.state.interfaces)
 
         # Calculate energy flow efficiency (percentage of strong bonds)
-        strong_bonds = sum(1 for i in self.state.interfaces if i.energy_loss <= 15)
+        strong_bonds = self._count_energy_loss(maximum=15)
         energy_flow = (strong_bonds / total_bonds * 100) if total_bonds > 0 else 0
 
         # Calculate decomposition risk (percentage of weak/fragile bonds)
-        weak_bonds = sum(1 for i in self.state.interfaces if i.energy_loss >= 35)
+        weak_bonds = self._count_energy_loss(minimum=35)
         decomposition_risk = (weak_bonds / total_bonds * 100) if total_bonds > 0 else 0
 
         # Calculate average energy loss
-        total_energy_loss = sum(i.energy_loss for i in self.state.interfaces)
+        total_energy_loss = self._total_energy_loss()
         avg_energy_loss = (total_energy_loss / total_bonds) if total_bonds > 0 else 0
 
         return {
@@ -48,8 +145,8 @@ class FramesAnalytics:
 
         team_faculty_ratio = team_count / max(faculty_count, 1)
 
-        codified_interfaces = sum(1 for i in self.state.interfaces if 'codified' in i.bond_type)
-        institutional_interfaces = sum(1 for i in self.state.interfaces if 'institutional' in i.bond_type)
+        codified_interfaces = self._count_bond_type(contains='codified')
+        institutional_interfaces = self._count_bond_type(contains='institutional')
 
         autonomy_score = 0
         analysis = ""
@@ -83,12 +180,7 @@ class FramesAnalytics:
         discipline_count = len(disciplines)
 
         # Count cross-discipline interfaces
-        cross_discipline_interfaces = 0
-        for interface in self.state.interfaces:
-            from_team = self.state.get_team(interface.from_entity)
-            to_team = self.state.get_team(interface.to_entity)
-            if from_team and to_team and from_team.discipline != to_team.discipline:
-                cross_discipline_interfaces += 1
+        cross_discipline_interfaces = self._count_cross_discipline_interfaces()
 
         partition_score = 0
         analysis = ""
@@ -101,7 +193,7 @@ class FramesAnalytics:
             partition_score += 35
             analysis += "Limited cross-discipline interfaces indicate knowledge partitioning. "
 
-        institutional_interfaces = sum(1 for i in self.state.interfaces if 'institutional' in i.bond_type)
+        institutional_interfaces = self._count_bond_type(contains='institutional')
         if institutional_interfaces > len(self.state.interfaces) * 0.5:
             partition_score += 40
             analysis += "High proportion of institutional knowledge interfaces suggests tacit knowledge silos. "
@@ -194,18 +286,13 @@ class FramesAnalytics:
             integration_score += 30
             analysis += "High interface density suggests high integration cost. "
 
-        weak_interfaces = sum(1 for i in self.state.interfaces if i.energy_loss > 30)
+        weak_interfaces = self._count_energy_loss(minimum=30, strict=True)
         if weak_interfaces > total_interfaces * 0.5:
             integration_score += 40
             analysis += "High proportion of weak interfaces increases coordination effort. "
 
         # Count cross-discipline interfaces
-        cross_discipline_interfaces = 0
-        for interface in self.state.interfaces:
-            from_team = self.state.get_team(interface.from_entity)
-            to_team = self.state.get_team(interface.to_entity)
-            if from_team and to_team and from_team.discipline != to_team.discipline:
-                cross_discipline_interfaces += 1
+        cross_discipline_interfaces = self._count_cross_discipline_interfaces()
 
         if cross_discipline_interfaces > total_interfaces * 0.3:
             integration_score += 30
@@ -223,8 +310,8 @@ class FramesAnalytics:
         NDA Dimension: Coupling Degradation
         Weakening relationships over time
         """
-        fragile_interfaces = sum(1 for i in self.state.interfaces if i.bond_type == 'fragile-temporary')
-        institutional_interfaces = sum(1 for i in self.state.interfaces if 'institutional' in i.bond_type)
+        fragile_interfaces = self._count_bond_type(equals='fragile-temporary')
+        institutional_interfaces = self._count_bond_type(contains='institutional')
         outgoing_teams = sum(1 for t in self.state.teams if t.lifecycle == 'outgoing')
 
         coupling_score = 0
@@ -265,20 +352,15 @@ class FramesAnalytics:
         risk = 0
 
         if failure_type == 'documentation':
-            codified_interfaces = sum(1 for i in self.state.interfaces if 'codified' in i.bond_type)
+            codified_interfaces = self._count_bond_type(contains='codified')
             risk = 100 - (codified_interfaces / max(len(self.state.interfaces), 1) * 100)
 
         elif failure_type == 'communication':
-            cross_team_interfaces = 0
-            for interface in self.state.interfaces:
-                from_team = self.state.get_team(interface.from_entity)
-                to_team = self.state.get_team(interface.to_entity)
-                if from_team and to_team and from_team.discipline != to_team.discipline:
-                    cross_team_interfaces += 1
+            cross_team_interfaces = self._count_cross_discipline_interfaces()
             risk = 100 - (cross_team_interfaces / max(len(self.state.teams), 1) * 50)
 
         elif failure_type == 'rationale':
-            institutional_interfaces = sum(1 for i in self.state.interfaces if 'institutional' in i.bond_type)
+            institutional_interfaces = self._count_bond_type(contains='institutional')
             risk = institutional_interfaces / max(len(self.state.interfaces), 1) * 100
 
         elif failure_type == 'handoff':
@@ -0,0 +1,465 @@
+"""
+Metric and dimension registry for the FRAMES analytics dashboard
+Each metric names its source table and aggregate; each source lists the
+dimensions it can be grouped by and the filters it understands. Queries for
+/api/analytics/data are generated from a request against this registry, and
+metrics that share a source and grouping are computed in one scan.
+Student and team metrics read the rollup tables (see rollups.py) whenever
+the requested grouping and filters are available there. `timeRange` is a
+range predicate on each source's timestamp column.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, case, cast, func, select
+
+from db_models import (
+    FacultyModel, Outcome, ProjectModel, StudentModel, StudentRollup, TeamModel, TeamRollup, parse_timestamp,
+)
+
+
+class AnalyticsError(ValueError):
+    """The request names an unknown metric, dimension or filter, or an unsupported combination"""
+
+
+class Source:
+    """
+    A table metrics aggregate over, with its groupable columns and filters.
+    `time_column` is what `timeRange` restricts; `rollup` is a
+    pre-aggregated Source over the same rows, used when it has every
+    dimension and filter a request needs (rollups have no time column).
+    """
+
+    def __init__(self, name: str, model, dimensions: Dict, filters: Dict, where: Sequence = (),
+                 time_column=None, rollup: Optional['Source'] = None):
+        self.name = name
+        self.model = model
+        self.table = model.__tablename__
+        self.dimensions = dimensions  # dimension -> column
+        self.filters = filters  # filter key -> callable(value) returning a predicate
+        self.where = tuple(where)
+        self.time_column = time_column
+        self.rollup = rollup
+
+
+class Metric:
+    """
+    One aggregate over a source, and the equivalent over its rollup.
+    `group_by` fixes the grouping (the metric is a preset breakdown);
+    `keys` renames the dimension keys of its rows.
+    """
+
+    def __init__(self, name: str, label: str, description: str, source: Source, aggregate,
+                 rollup_aggregate=None, total_label: Optional[str] = None, group_by: Tuple[str, ...] = (),
+                 keys: Tuple[str, ...] = (), digits: Optional[int] = None, title_labels: bool = False):
+        self.name = name
+        self.label = label
+        self.description = description
+        self.source = source
+        self.aggregate = aggregate
+        self.rollup_aggregate = rollup_aggregate
+        self.total_label = total_label or label
+        self.group_by = group_by
+        self.keys = keys or group_by
+        self.digits = digits
+        self.title_labels = title_labels
+
+    def value(self, raw):
+        if self.digits is not None:
+            return round(float(raw or 0), self.digits)
+        return raw or 0
+
+
+def _equals(column):
+    return lambda value: column == value
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+
+DIMENSIONS = {
+    'university': 'University',
+    'project': 'Project',
+    'team': 'Team',
+    'status': 'Student Status',
+    'expertise_area': 'Expertise Area',
+    'discipline': 'Team Discipline',
+    'role': 'Faculty Role',
+    'type': 'Project Type',
+    'outcome_type': 'Outcome Type',
+}
+
+FILTERS = [
+    {'value': 'university_id', 'label': 'Filter by University', 'type': 'select'},
+    {'value': 'project_id', 'label': 'Filter by Project', 'type': 'select'},
+    {'value': 'team_id', 'label': 'Filter by Team', 'type': 'select'},
+    {'value': 'status', 'label': 'Filter by Status', 'type': 'select', 'options': ['incoming', 'established', 'outgoing']},
+    {'value': 'expertise_area', 'label': 'Filter by Expertise', 'type': 'select'},
+    {'value': 'discipline', 'label': 'Filter by Discipline', 'type': 'select'},
+    {'value': 'role', 'label': 'Filter by Role', 'type': 'select'},
+    {'value': 'type', 'label': 'Filter by Project Type', 'type': 'select'},
+    {'value': 'outcome_type', 'label': 'Filter by Outcome Type', 'type': 'select',
+     'options': ['mission_success', 'program_success']},
+]
+
+# Rollups store '' for NULL grouping values, which labels the same way
+STUDENT_ROLLUPS = Source(
+    'student_rollups', StudentRollup,
+    dimensions={
+        'university': StudentRollup.university_id,
+        'team': StudentRollup.team_id,
+        'status': StudentRollup.status,
+        'expertise_area': StudentRollup.expertise_area,
+    },
+    filters={
+        'university_id': _equals(StudentRollup.university_id),
+        'project_id': lambda value: StudentRollup.team_id.in_(
+            select(TeamModel.id).where(TeamModel.project_id == value)
+        ),
+        'team_id': _equals(StudentRollup.team_id),
+        'status': _equals(StudentRollup.status),
+        'expertise_area': _equals(StudentRollup.expertise_area),
+    },
+)
+
+TEAM_ROLLUPS = Source(
+    'team_rollups', TeamRollup,
+    dimensions={
+        'university': TeamRollup.university_id,
+        'project': TeamRollup.project_id,
+        'discipline': TeamRollup.discipline,
+    },
+    filters={
+        'university_id': _equals(TeamRollup.university_id),
+        'project_id': _equals(TeamRollup.project_id),
+        'discipline': _equals(TeamRollup.discipline),
+    },
+)
+
+STUDENTS = Source(
+    'students', StudentModel,
+    dimensions={
+        'university': StudentModel.university_id,
+        'team': StudentModel.team_id,
+        'status': StudentModel.status,
+        'expertise_area': StudentModel.expertise_area,
+    },
+    filters={
+        'university_id': _equals(StudentModel.university_id),
+        'project_id': lambda value: StudentModel.team_id.in_(
+            select(TeamModel.id).where(TeamModel.project_id == value)
+        ),
+        'team_id': _equals(StudentModel.team_id),
+        'status': _equals(StudentModel.status),
+        'expertise_area': _equals(StudentModel.expertise_area),
+    },
+    # Graduated students stay in the table for history but are not counted
+    where=(StudentModel.active == True,),
+    time_column=StudentModel.created_at,
+    rollup=STUDENT_ROLLUPS,
+)
+
+GRADUATES = Source(
+    'graduates', StudentModel,
+    dimensions={
+        'university': StudentModel.university_id,
+        'team': StudentModel.team_id,
+        'expertise_area': StudentModel.expertise_area,
+    },
+    filters={
+        'university_id': _equals(StudentModel.university_id),
+        'project_id': lambda value: StudentModel.team_id.in_(
+            select(TeamModel.id).where(TeamModel.project_id == value)
+        ),
+        'team_id': _equals(StudentModel.team_id),
+        'expertise_area': _equals(StudentModel.expertise_area),
+    },
+    where=(StudentModel.active == False, StudentModel.graduated_at.isnot(None)),
+    time_column=StudentModel.graduated_at,
+)
+
+TEAMS = Source(
+    'teams', TeamModel,
+    dimensions={
+        'university': TeamModel.university_id,
+        'project': TeamModel.project_id,
+        'discipline': TeamModel.discipline,
+    },
+    filters={
+        'university_id': _equals(TeamModel.university_id),
+        'project_id': _equals(TeamModel.project_id),
+        'team_id': _equals(TeamModel.id),
+        'discipline': _equals(TeamModel.discipline),
+    },
+    time_column=TeamModel.created_at,
+    rollup=TEAM_ROLLUPS,
+)
+
+FACULTY = Source(
+    'faculty', FacultyModel,
+    dimensions={
+        'university': FacultyModel.university_id,
+        'role': FacultyModel.role,
+    },
+    filters={
+        'university_id': _equals(FacultyModel.university_id),
+        'role': _equals(FacultyModel.role),
+    },
+    time_column=FacultyModel.created_at,
+)
+
+PROJECTS = Source(
+    'projects', ProjectModel,
+    dimensions={
+        'university': ProjectModel.university_id,
+        'type': ProjectModel.type,
+    },
+    filters={
+        'university_id': _equals(ProjectModel.university_id),
+        'project_id': _equals(ProjectModel.id),
+        'type': _equals(ProjectModel.type),
+    },
+    time_column=ProjectModel.created_at,
+)
+
+OUTCOMES = Source(
+    'outcomes', Outcome,
+    dimensions={
+        'university': Outcome.university_id,
+        'project': Outcome.project_id,
+        'outcome_type': Outcome.outcome_type,
+    },
+    filters={
+        'university_id': _equals(Outcome.university_id),
+        'project_id': _equals(Outcome.project_id),
+        'outcome_type': _equals(Outcome.outcome_type),
+    },
+    time_column=Outcome.recorded_at,
+)
+
+_ROLLUP_STUDENTS = func.sum(StudentRollup.student_count)
+_ROLLUP_AVG_TERMS = (
+    cast(func.sum(StudentRollup.terms_remaining_sum), Float) / func.nullif(func.sum(StudentRollup.student_count), 0)
+)
+
+METRICS = {metric.name: metric for metric in (
+    Metric('student_count', 'Student Count', 'Total number of students',
+           STUDENTS, func.count(StudentModel.id), _ROLLUP_STUDENTS, total_label='Total Students'),
+    Metric('avg_terms_remaining', 'Average Terms to Graduation', 'Average terms remaining until graduation',
+           STUDENTS, func.avg(StudentModel.terms_remaining), _ROLLUP_AVG_TERMS,
+           total_label='Average Terms Remaining', digits=2),
+    Metric('status_distribution', 'Student Status Distribution', 'Breakdown by incoming/established/outgoing',
+           STUDENTS, func.count(StudentModel.id), _ROLLUP_STUDENTS, group_by=('status',), title_labels=True),
+    Metric('team_count', 'Team Count', 'Total number of teams',
+           TEAMS, func.count(TeamModel.id), func.sum(TeamRollup.team_count), total_label='Total Teams'),
+    Metric('faculty_count', 'Faculty/Mentor Count', 'Total number of faculty and mentors',
+           FACULTY, func.count(FacultyModel.id), total_label='Total Faculty/Mentors'),
+    Metric('project_count', 'Project Count', 'Total number of projects',
+           PROJECTS, func.count(ProjectModel.id), total_label='Total Projects'),
+    Metric('students_by_status_and_expertise', 'Students by Status & Expertise',
+           'Cross-tabulation of status and expertise area',
+           STUDENTS, func.count(StudentModel.id), _ROLLUP_STUDENTS,
+           group_by=('status', 'expertise_area'), keys=('status', 'expertise')),
+    Metric('graduated_count', 'Graduated Students', 'Students who graduated (time range: graduation date)',
+           GRADUATES, func.count(StudentModel.id), total_label='Total Graduated'),
+    Metric('outcome_count', 'Outcome Count', 'Recorded mission/program outcomes',
+           OUTCOMES, func.count(Outcome.id), total_label='Total Outcomes'),
+    Metric('success_rate', 'Success Rate (%)', 'Share of recorded outcomes that succeeded',
+           OUTCOMES, 100.0 * func.avg(case((Outcome.success == True, 1.0), else_=0.0)),
+           total_label='Success Rate (%)', digits=2),
+)}
+
+_FILTER_KEYS = {f['value'] for f in FILTERS}
+
+
+def describe() -> Dict:
+    """Metrics, dimensions and filters for /api/analytics/dimensions"""
+    return {
+        'metrics': [
+            {'value': m.name, 'label': m.label, 'description': m.description}
+            for m in METRICS.values()
+        ],
+        'dimensions': [
+            {
+                'value': dimension, 'label': label,
+                'applicableTo': [
+                    m.name for m in METRICS.values()
+                    if not m.group_by and dimension in m.source.dimensions
+                ],
+            }
+            for dimension, label in DIMENSIONS.items()
+        ],
+        'filters': FILTERS,
+    }
+
+
+# ----------------------------------------------------------------------
+# Requests
+# ----------------------------------------------------------------------
+
+class AnalyticsQuery:
+    """
+    A validated /api/analytics/data request. Accepts `metric` (one name) or
+    `metrics` (a list), `groupBy` (a dimension or a list of dimensions),
+    `filters` and `timeRange`; `key` is the same for requests that mean the
+    same thing.
+    """
+
+    def __init__(self, data: Dict):
+        if not isinstance(data, dict):
+            raise AnalyticsError('Expected a JSON object')
+
+        self.single = 'metrics' not in data
+        names = [data.get('metric') or 'student_count'] if self.single else data['metrics']
+        if isinstance(names, str):
+            names = [names]
+        if not isinstance(names, list) or not names:
+            raise AnalyticsError('"metrics" must be a non-empty list of metric names')
+        unknown = [name for name in names if name not in METRICS]
+        if unknown:
+            raise AnalyticsError(f"Unknown metric: {', '.join(map(str, unknown))}")
+        self.metrics = [METRICS[name] for name in dict.fromkeys(names)]
+
+        self.group_by_raw = data.get('groupBy')
+        group_by = self.group_by_raw or ()
+        self.group_by = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+        for metric in self.metrics:
+            if metric.group_by:
+                # Preset breakdowns keep their own grouping next to other metrics
+                if self.single and self.group_by and self.group_by != metric.group_by:
+                    raise AnalyticsError(
+                        f"{metric.name} is always grouped by {', '.join(metric.group_by)}"
+                    )
+                continue
+            for dimension in self.group_by:
+                if dimension not in metric.source.dimensions:
+                    raise AnalyticsError(f'{metric.name} cannot be grouped by {dimension}')
+
+        filters = data.get('filters') or {}
+        if not isinstance(filters, dict):
+            raise AnalyticsError('"filters" must be an object')
+        unknown = sorted(set(filters) - _FILTER_KEYS)
+        if unknown:
+            raise AnalyticsError(f"Unknown filter: {', '.join(unknown)}")
+        # Empty values mean "no filter", as the dashboard's "All" options send them
+        self.filters = {key: str(value) for key, value in sorted(filters.items()) if value not in (None, '')}
+        self.start, self.end = _time_range(data.get('timeRange'))
+
+    @property
+    def tables(self) -> List[str]:
+        """Tables whose versions key the cached result, including any rollup it may read"""
+        tables = {m.source.table for m in self.metrics}
+        tables.update(m.source.rollup.table for m in self.metrics if m.source.rollup is not None)
+        if 'project_id' in self.filters and STUDENTS.table in tables:
+            tables.add(TEAMS.table)
+        return sorted(tables)
+
+    @property
+    def key(self) -> str:
+        return json.dumps({
+            'metrics': [m.name for m in self.metrics], 'single': self.single,
+            'groupBy': self.group_by, 'filters': self.filters,
+            'timeRange': [b.isoformat() if b else None for b in (self.start, self.end)],
+        }, separators=(',', ':'))
+
+    def _source_for(self, metric: Metric, grouping: Tuple[str, ...]) -> Source:
+        """The metric's rollup if it can answer this grouping and these filters"""
+        source, rollup = metric.source, metric.source.rollup
+        if rollup is None or metric.rollup_aggregate is None:
+            return source
+        if self.start or self.end:
+            return source
+        if any(d not in rollup.dimensions for d in grouping):
+            return source
+        if any(key in source.filters and key not in rollup.filters for key in self.filters):
+            return source
+        return rollup
+
+    def _scans(self) -> Dict[Tuple[Source, Tuple[str, ...]], List[Metric]]:
+        scans = {}
+        for metric in self.metrics:
+            grouping = metric.group_by or self.group_by
+            scans.setdefault((self._source_for(metric, grouping), grouping), []).append(metric)
+        return scans
+
+    def _rows(self, session, source: Source, grouping: Tuple[str, ...], metrics: List[Metric]):
+        columns = [source.dimensions[d] for d in grouping]
+        aggregates = [m.aggregate if source is m.source else m.rollup_aggregate for m in metrics]
+        stmt = select(*columns, *(agg.label(m.name) for agg, m in zip(aggregates, metrics)))
+        predicates = list(source.where)
+        predicates += [source.filters[key](value) for key, value in self.filters.items() if key in source.filters]
+        if source.time_column is not None:
+            if self.start:
+                predicates.append(source.time_column >= self.start)
+            if self.end:
+                predicates.append(source.time_column < self.end)
+        if predicates:
+            stmt = stmt.where(*predicates)
+        if columns:
+            stmt = stmt.group_by(*columns).order_by(*columns)
+        return session.execute(stmt).all()
+
+    def run(self, session) -> Dict:
+        """Response body; one SELECT per (source, grouping) pair"""
+        data = {}
+        for (source, grouping), metrics in self._scans().items():
+            rows = self._rows(session, source, grouping, metrics)
+            width = len(grouping)
+            for index, metric in enumerate(metrics):
+                column = width + index
+                if not grouping:
+                    value = rows[0][column] if rows else None
+                    data[metric.name] = [{'label': metric.total_label, 'value': metric.value(value)}]
+                elif width == 1:
+                    data[metric.name] = [
+                        {'label': _label(row[0], metric.title_labels), 'value': metric.value(row[column])}
+                        for row in rows
+                    ]
+                else:
+                    keys = metric.keys if metric.group_by else grouping
+                    data[metric.name] = [
+                        {**{key: _label(row[i], metric.title_labels) for i, key in enumerate(keys)},
+                         'value': metric.value(row[column])}
+                        for row in rows
+                    ]
+
+        if self.single:
+            name = self.metrics[0].name
+            return {'metric': name, 'groupBy': self.group_by_raw, 'data': data[name]}
+        return {
+            'metrics': [m.name for m in self.metrics], 'groupBy': self.group_by_raw,
+            'data': {m.name: data[m.name] for m in self.metrics},
+        }
+
+
+def _time_range(raw) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """(start inclusive, end exclusive); a date-only end includes that whole day"""
+    if not raw:
+        return None, None
+    if not isinstance(raw, dict):
+        raise AnalyticsError('"timeRange" must be an object with "start" and/or "end"')
+    bounds = []
+    for name in ('start', 'end'):
+        value = raw.get(name)
+        if value in (None, ''):
+            bounds.append(None)
+            continue
+        try:
+            bound = parse_timestamp(str(value))
+        except ValueError:
+            raise AnalyticsError(f'timeRange.{name} must be an ISO date or timestamp')
+        if name == 'end' and len(str(value).strip()) == 10:
+            bound += timedelta(days=1)
+        bounds.append(bound)
+    start, end = bounds
+    if start and end and start >= end:
+        raise AnalyticsError('timeRange.start must be before timeRange.end')
+    return start, end
+
+
+def _label(value, title: bool = False) -> str:
+    label = str(value or 'Unknown')
+    return label.title() if title else label
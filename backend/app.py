@@ -4,6 +4,9 @@ from flask_cors import CORS
 from datetime import datetime
 import os
 import json
+import atexit
+import threading
+import uuid
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -11,7 +14,26 @@ load_dotenv()
 
 from models import SystemState, Team, Faculty, Project, Interface
 from analytics import FramesAnalytics
-from flask import make_response
+from state_journal import JournaledStateStore
+from pagination import PaginationError, paginate, pagination_requested
+from fieldsets import FieldsetError, parse_fields, project_fields
+from sandbox_store import (
+    DiffError, LRUCache, apply_diff, compact_diff, compute_diff, diff_size, merge_diff,
+    validate_diff, validate_state,
+)
+from versioning import compute_etag, conditional, install_version_hooks
+from response_cache import ResponseCache
+from json_provider import init_json
+from compression import cached_json_response, init_compression
+from bulk import BulkError, INTERFACES, STUDENTS, TEAMS, parse_bulk_request, run_bulk
+from audit import AuditWriter
+from metrics import init_metrics
+from query_budget import init_query_budget, query_budget
+from events import feed, install_event_hooks
+from batch import BatchError, parse_batch_request, run_batch
+from rollups import ensure_rollups, install_rollup_hooks
+from analytics_registry import AnalyticsError, AnalyticsQuery, describe as describe_analytics
+from flask import g, make_response
 import traceback
 from backend.database import db
 
@@ -19,6 +41,10 @@ app = Flask(__name__,
             static_folder='../frontend/static',
             template_folder='../frontend/templates')
 CORS(app)  # Enable CORS for frontend-backend communication
+init_metrics(app)  # first, so its timer wraps the other request hooks
+init_query_budget(app)  # logs N+1 patterns and routes over their @query_budget
+init_json(app)  # orjson when installed, stdlib otherwise
+init_compression(app)  # gzip/brotli for large API responses
 
 # Configure SQLAlchemy (simple SQLite for dev; switch URI via env for Postgres later)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
@@ -27,6 +53,13 @@ if not app.config['SQLALCHEMY_DATABASE_URI']:
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
+# Every write bumps per-table/per-university versions used for ETags
+install_version_hooks(db)
+# Committed writes are published on /api/events
+install_event_hooks(db, app)
+# Student/team analytics rollups follow every write
+install_rollup_hooks(db)
+
 # Global system state (in production, use database)
 system_state = SystemState()
 
@@ -92,56 +125,67 @@ def get_network_data():
     
     return jsonify(sample_data)
 
-# Data persistence file
+# Data persistence files: binary snapshot, plus the legacy JSON file it replaces
+SNAPSHOT_FILE = os.environ.get('FRAMES_STATE_FILE', 'frames_data.snapshot')
 DATA_FILE = 'frames_data.json'
 
+# Mutations are appended to a journal next to the snapshot and folded into
+# a fresh snapshot in the background once the journal grows large
+state_store = JournaledStateStore(SNAPSHOT_FILE)
+atexit.register(state_store.close)
+
+_state_loaded = False
+_state_lock = threading.Lock()
+
 
 def load_data():
-    """Load data from file if exists"""
-    if os.path.exists(DATA_FILE):
-        try:
-            system_state.load_from_file(DATA_FILE)
-            print(f"Loaded data from {DATA_FILE}")
-        except Exception as e:
-            print(f"Error loading data: {e}")
+    """Load the snapshot (or legacy JSON file) and replay the mutation journal"""
+    try:
+        replayed = state_store.load(system_state, fallback_path=DATA_FILE)
+        print(f"Loaded data from {SNAPSHOT_FILE} ({replayed} journal records replayed)")
+    except Exception as e:
+        print(f"Error loading data: {e}")
+
+
+def get_system_state():
+    """Return the live system state, loading it from disk on first use"""
+    global _state_loaded
+    if not _state_loaded:
+        with _state_lock:
+            if not _state_loaded:
+                load_data()
+                _state_loaded = True
+    return system_state
 
 
 def save_data():
-    """Save data to file"""
+    """Checkpoint the whole state to the snapshot and clear the journal"""
     try:
-        system_state.save_to_file(DATA_FILE)
+        state_store.checkpoint(system_state)
     except Exception as e:
         print(f"Error saving data: {e}")
 
 
-def _log_audit(actor, action, entity_type, entity_id, before, after, meta=None):
-    """Append an audit log row to the DB (best-effort)."""
+# Audit records are queued and written in batches by a background thread
+audit_writer = AuditWriter(app)
+atexit.register(audit_writer.close)
+
+
+def _log_audit(actor, action, entity_type, entity_id, before, after, meta=None, university_id=None):
+    """Queue an audit log row (best-effort; never blocks the request on the DB)."""
     try:
-        # lazy import to avoid circular issues during startup edits
-        from db_models import AuditLog
-        from app import db
-        import json
-
-        a = AuditLog(
-            actor=(actor or 'system'),
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            payload_before=json.dumps(before) if before is not None else None,
-            payload_after=json.dumps(after) if after is not None else None,
-            meta=meta,
-        )
-        with app.app_context():
-            db.session.add(a)
-            db.session.commit()
+        payload = after or before
+        if university_id is None and isinstance(payload, dict):
+            university_id = payload.get('university_id') or payload.get('from_university')
+        audit_writer.record(actor, action, entity_type, entity_id, before, after,
+                            meta=meta, university_id=university_id)
     except Exception:
         # Audit should not block normal flow; log errors to stdout
-        import traceback
         print('Audit log error:', traceback.format_exc())
 
 
-# Load data on startup
-load_data()
+# System state is loaded lazily on first use (see get_system_state) so
+# importing the app stays fast regardless of the size of the state file
 
 # Ensure database tables exist (use app_context to be compatible across Flask versions)
 def ensure_tables():
@@ -233,11 +277,32 @@ def serve_static(path):
     return send_from_directory('../frontend/static', path)
 
 
+# ============================================================================
+# API ENDPOINTS - Shared list handling
+# ============================================================================
+
+def _list_response(query, model):
+    """
+    Serialize a list query, honoring `fields=` (column projection) and
+    `limit`/`cursor` (keyset pagination on the primary key).
+    """
+    serialize = lambda row: row.to_dict()
+    fields = parse_fields(request.args)
+    if fields:
+        query, serialize = project_fields(query, model, fields)
+
+    if pagination_requested(request.args):
+        return jsonify(paginate(query, model.id, request.args, serialize=serialize))
+
+    return jsonify([serialize(row) for row in query.all()])
+
+
 # ============================================================================
 # API ENDPOINTS - Teams
 # ============================================================================
 
 @app.route('/api/teams', methods=['GET'])
+@conditional('teams', scope_arg='university_id')
 def get_teams():
     """Get all teams - optionally filtered by university"""
     from db_models import TeamModel
@@ -245,12 +310,13 @@ def get_teams():
     try:
         university_id = request.args.get('university_id')
 
+        query = TeamModel.query
         if university_id:
-            teams = TeamModel.query.filter_by(university_id=university_id).all()
-        else:
-            teams = TeamModel.query.all()
+            query = query.filter_by(university_id=university_id)
 
-        return jsonify([t.to_dict() for t in teams])
+        return _list_response(query, TeamModel)
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -388,6 +454,7 @@ def delete_team(team_id):
 # ============================================================================
 
 @app.route('/api/students', methods=['GET'])
+@conditional('students', scope_arg='university_id')
 def get_students():
     """Get all students, optionally filtered by university, team, or project"""
     from db_models import StudentModel
@@ -409,8 +476,9 @@ def get_students():
         if active_only:
             query = query.filter_by(active=True)
 
-        students = query.all()
-        return jsonify([s.to_dict() for s in students])
+        return _list_response(query, StudentModel)
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -499,36 +567,114 @@ def update_student(student_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/university/<university_id>/advance-term', methods=['POST'])
-def advance_term(university_id):
-    """Advance all students in a university by one term"""
+def _advance_term(university_ids=None):
+    """
+    Advance active students (optionally of some universities) by one term
+    with three set-based UPDATEs: decrement, graduate at <= 0, recompute status.
+    Returns (graduated, updated) row counts. Does not commit.
+    """
     from db_models import StudentModel
+    from sqlalchemy import update
 
-    try:
-        students = StudentModel.query.filter_by(university_id=university_id, active=True).all()
+    scope = [StudentModel.active == True]
+    if university_ids is not None:
+        scope.append(StudentModel.university_id.in_(university_ids))
 
-        graduated_count = 0
-        updated_count = 0
+    def run(statement):
+        # The rollups of these universities are rebuilt once, before commit
+        options = {'synchronize_session': False, 'rollup_universities': university_ids}
+        return db.session.execute(statement.execution_options(**options)).rowcount
 
-        for student in students:
-            student.terms_remaining -= 1
+    run(update(StudentModel).where(*scope)
+        .values(terms_remaining=StudentModel.terms_remaining - 1))
+    graduated = run(update(StudentModel).where(*scope, StudentModel.terms_remaining <= 0)
+                    .values(active=False, graduated_at=datetime.now().isoformat()))
+    updated = run(update(StudentModel).where(*scope)
+                  .values(status=StudentModel.status_case(StudentModel.terms_remaining)))
+    return graduated, updated
 
-            if student.terms_remaining <= 0:
-                student.active = False
-                student.graduated_at = datetime.now().isoformat()
-                graduated_count += 1
-            else:
-                student.status = student.calculate_status()
-                updated_count += 1
 
-        db.session.commit()
+def _preview_advance_term(university_ids=None):
+    """
+    What _advance_term would do, from one aggregate query:
+    {university_id: {'graduating': n, 'advancing': n, 'status_after': {status: n}}}
+    """
+    from db_models import StudentModel
+    from sqlalchemy import func
+
+    next_terms = StudentModel.terms_remaining - 1
+    outcome = db.case((next_terms <= 0, 'graduated'), else_=StudentModel.status_case(next_terms))
+
+    query = db.session.query(StudentModel.university_id, outcome, func.count()) \
+        .filter(StudentModel.active == True)
+    if university_ids is not None:
+        query = query.filter(StudentModel.university_id.in_(university_ids))
+
+    preview = {}
+    for university_id, result, count in query.group_by(StudentModel.university_id, outcome).all():
+        entry = preview.setdefault(university_id, {'graduating': 0, 'advancing': 0, 'status_after': {}})
+        if result == 'graduated':
+            entry['graduating'] += count
+        else:
+            entry['advancing'] += count
+            entry['status_after'][result] = count
+    return preview
+
 
+def _advance_term_response(university_ids=None):
+    """Shared body of the advance-term endpoints (`dry_run` via query or JSON)"""
+    data = request.get_json(silent=True) or {}
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true' or bool(data.get('dry_run'))
+
+    if dry_run:
+        preview = _preview_advance_term(university_ids)
+        graduated = sum(p['graduating'] for p in preview.values())
+        updated = sum(p['advancing'] for p in preview.values())
         return jsonify({
             'success': True,
-            'graduated': graduated_count,
-            'updated': updated_count,
-            'message': f'{updated_count} students advanced, {graduated_count} graduated'
+            'dry_run': True,
+            'graduated': graduated,
+            'updated': updated,
+            'by_university': preview,
+            'message': f'{updated} students would advance, {graduated} would graduate'
         })
+
+    graduated, updated = _advance_term(university_ids)
+    db.session.commit()
+    return jsonify({
+        'success': True,
+        'graduated': graduated,
+        'updated': updated,
+        'message': f'{updated} students advanced, {graduated} graduated'
+    })
+
+
+@app.route('/api/university/<university_id>/advance-term', methods=['POST'])
+def advance_term(university_id):
+    """Advance all students in a university by one term"""
+    try:
+        return _advance_term_response([university_id])
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/advance-term', methods=['POST'])
+def advance_term_all():
+    """
+    Advance students of every university (or of `university_ids` in the JSON
+    body) by one term in a single transaction. Researchers only.
+    """
+    is_researcher = request.headers.get('X-Is-Researcher', 'false').lower() == 'true'
+    if not is_researcher:
+        return jsonify({'error': 'Only researchers can advance all universities'}), 403
+
+    try:
+        data = request.get_json(silent=True) or {}
+        university_ids = data.get('university_ids')
+        if university_ids is not None and not isinstance(university_ids, list):
+            return jsonify({'error': 'university_ids must be a list'}), 400
+        return _advance_term_response(university_ids)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -539,6 +685,7 @@ def advance_term(university_id):
 # ============================================================================
 
 @app.route('/api/faculty', methods=['GET'])
+@conditional('faculty', scope_arg='university_id')
 def get_faculty():
     """Get all faculty - optionally filtered by university"""
     from db_models import FacultyModel
@@ -546,12 +693,13 @@ def get_faculty():
     try:
         university_id = request.args.get('university_id')
 
+        query = FacultyModel.query
         if university_id:
-            faculty = FacultyModel.query.filter_by(university_id=university_id).all()
-        else:
-            faculty = FacultyModel.query.all()
+            query = query.filter_by(university_id=university_id)
 
-        return jsonify([f.to_dict() for f in faculty])
+        return _list_response(query, FacultyModel)
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -633,6 +781,7 @@ def delete_faculty(faculty_id):
 # ============================================================================
 
 @app.route('/api/projects', methods=['GET'])
+@conditional('projects', scope_arg='university_id')
 def get_projects():
     """Get all projects - optionally filtered by university"""
     from db_models import ProjectModel
@@ -640,12 +789,13 @@ def get_projects():
     try:
         university_id = request.args.get('university_id')
 
+        query = ProjectModel.query
         if university_id:
-            projects = ProjectModel.query.filter_by(university_id=university_id).all()
-        else:
-            projects = ProjectModel.query.all()
+            query = query.filter_by(university_id=university_id)
 
-        return jsonify([p.to_dict() for p in projects])
+        return _list_response(query, ProjectModel)
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -735,6 +885,7 @@ def delete_project(project_id):
 # ============================================================================
 
 @app.route('/api/interfaces', methods=['GET'])
+@conditional('interfaces', scope_arg='university_id')
 def get_interfaces():
     """Get all interfaces - optionally filtered by university or cross-university"""
     from db_models import InterfaceModel
@@ -758,8 +909,9 @@ def get_interfaces():
         elif cross_university and cross_university.lower() == 'false':
             query = query.filter_by(is_cross_university=False)
 
-        interfaces = query.all()
-        return jsonify([i.to_dict() for i in interfaces])
+        return _list_response(query, InterfaceModel)
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -784,15 +936,8 @@ def create_interface():
         to_entity = data.get('to_entity', '')
 
         # Parse universities from entity IDs
-        if '_' in from_entity:
-            from_uni = from_entity.split('_')[0]
-        else:
-            from_uni = actor_university
-
-        if '_' in to_entity:
-            to_uni = to_entity.split('_')[0]
-        else:
-            to_uni = actor_university
+        from_uni = InterfaceModel.university_of(from_entity, actor_university)
+        to_uni = InterfaceModel.university_of(to_entity, actor_university)
 
         # Set university fields
         data['from_university'] = from_uni
@@ -853,6 +998,168 @@ def delete_interface(interface_id):
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================================================
+# API ENDPOINTS - Bulk writes
+# ============================================================================
+
+def _bulk_response(spec):
+    """
+    Create/update many rows of one entity type in a single transaction.
+    Rows with an existing `id` are updated, the rest created. With
+    `atomic=true` any invalid row aborts the whole request (422).
+    """
+    actor_university = request.headers.get('X-University-ID', 'CalPolyPomona')
+    is_researcher = request.headers.get('X-Is-Researcher', 'false').lower() == 'true'
+
+    try:
+        rows, atomic = parse_bulk_request(request)
+        summary = run_bulk(spec, rows, actor_university, is_researcher, atomic=atomic)
+    except BulkError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    summary['atomic'] = atomic
+    if atomic and summary['failed']:
+        db.session.rollback()
+        summary['committed'] = False
+        return jsonify(summary), 422
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    summary['committed'] = True
+
+    # Audit: one record for the whole batch
+    try:
+        written = [r for r in summary['results'] if r['status'] != 'error']
+        _log_audit(actor_university, 'bulk_upsert', spec.entity_type, None, None, {
+            'created': [r['id'] for r in written if r['status'] == 'created'],
+            'updated': [r['id'] for r in written if r['status'] == 'updated'],
+            'failed': summary['failed'],
+        }, meta={'atomic': atomic, 'rows': len(summary['results'])}, university_id=actor_university)
+    except Exception:
+        pass
+
+    return jsonify(summary)
+
+
+@app.route('/api/students/bulk', methods=['POST'])
+def bulk_students():
+    """Create or update students from a JSON array or CSV upload"""
+    return _bulk_response(STUDENTS)
+
+
+@app.route('/api/teams/bulk', methods=['POST'])
+def bulk_teams():
+    """Create or update teams from a JSON array or CSV upload"""
+    return _bulk_response(TEAMS)
+
+
+@app.route('/api/interfaces/bulk', methods=['POST'])
+def bulk_interfaces():
+    """Create or update interfaces from a JSON array or CSV upload"""
+    return _bulk_response(INTERFACES)
+
+
+# ============================================================================
+# API ENDPOINTS - Audit
+# ============================================================================
+
+@app.route('/api/audit', methods=['GET'])
+@query_budget(2)
+@conditional('audit_logs')
+def get_audit_log():
+    """
+    Audit records, newest first, always keyset-paginated.
+    Filters: entity_type, entity_id, university_id, actor, action,
+    since/until (ISO timestamps, inclusive/exclusive).
+    """
+    from db_models import AuditLog, parse_timestamp
+
+    try:
+        query = AuditLog.query
+        for name in ('entity_type', 'entity_id', 'university_id', 'actor', 'action'):
+            value = request.args.get(name)
+            if value:
+                query = query.filter(getattr(AuditLog, name) == value)
+
+        for name, compare in (('since', AuditLog.timestamp.__ge__), ('until', AuditLog.timestamp.__lt__)):
+            value = request.args.get(name)
+            if value:
+                try:
+                    bound = parse_timestamp(value)
+                except ValueError:
+                    return jsonify({'error': f'{name} must be an ISO timestamp'}), 400
+                query = query.filter(compare(bound))
+
+        serialize = lambda row: row.to_dict()
+        fields = parse_fields(request.args)
+        if fields:
+            query, serialize = project_fields(query, AuditLog, fields)
+
+        return jsonify(paginate(query, AuditLog.id, request.args, descending=True, serialize=serialize))
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/audit/stats', methods=['GET'])
+def get_audit_stats():
+    """Audit writer counters: queued, written, dropped, failed, pending"""
+    return jsonify(audit_writer.stats())
+
+
+# ============================================================================
+# API ENDPOINTS - Batch
+# ============================================================================
+
+@app.route('/api/batch', methods=['POST'])
+def batch_requests():
+    """
+    Run several GET requests in one round trip:
+    {"requests": [{"id": "teams", "path": "/api/teams"}, "/api/universities"],
+     "concurrent": false}
+    Items share the caller's X-University-ID / X-Is-Researcher headers.
+    """
+    try:
+        items, concurrent = parse_batch_request(request.get_json(silent=True))
+        body = run_batch(app, items, concurrent=concurrent)
+        return app.response_class(body, mimetype=app.json.mimetype)
+    except BatchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================================================
+# API ENDPOINTS - Change feed
+# ============================================================================
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """
+    Server-Sent Events stream of committed changes to teams, students,
+    interfaces, factors and models. Optional filters: types (comma-separated),
+    university_id. Resumes from the Last-Event-ID header (or last_event_id).
+    """
+    types = request.args.get('types')
+    stream = feed.stream(
+        last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id'),
+        types={t.strip() for t in types.split(',') if t.strip()} if types else None,
+        university=request.args.get('university_id'),
+    )
+    return app.response_class(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # keep nginx from buffering the stream
+    })
+
+
 # ============================================================================
 # API ENDPOINTS - Analytics
 # ============================================================================
@@ -860,31 +1167,38 @@ def delete_interface(interface_id):
 @app.route('/api/analytics/statistics', methods=['GET'])
 def get_statistics():
     """Get system statistics"""
-    analytics = FramesAnalytics(system_state)
+    analytics = FramesAnalytics(get_system_state())
     return jsonify(analytics.calculate_statistics())
 
 
 @app.route('/api/analytics/nda-diagnostic', methods=['GET'])
 def get_nda_diagnostic():
     """Get NDA diagnostic analysis"""
-    analytics = FramesAnalytics(system_state)
+    analytics = FramesAnalytics(get_system_state())
     return jsonify(analytics.get_nda_diagnostic_analysis())
 
 
 @app.route('/api/analytics/backward-tracing', methods=['GET'])
 def get_backward_tracing():
     """Get backward tracing analysis"""
-    analytics = FramesAnalytics(system_state)
+    analytics = FramesAnalytics(get_system_state())
     return jsonify(analytics.get_backward_tracing_analysis())
 
 
 @app.route('/api/analytics/team-lifecycle', methods=['GET'])
 def get_team_lifecycle():
     """Get team lifecycle analysis"""
-    analytics = FramesAnalytics(system_state)
+    analytics = FramesAnalytics(get_system_state())
     return jsonify(analytics.analyze_team_lifecycle())
 
 
+@app.route('/api/analytics/energy-histogram', methods=['GET'])
+def get_energy_histogram():
+    """Get the distribution of interface energy loss"""
+    analytics = FramesAnalytics(get_system_state())
+    return jsonify(analytics.energy_loss_histogram())
+
+
 # ============================================================================
 # API ENDPOINTS - System State
 # ============================================================================
@@ -892,14 +1206,16 @@ def get_team_lifecycle():
 @app.route('/api/state', methods=['GET'])
 def get_state():
     """Get complete system state"""
-    return jsonify(system_state.to_dict())
+    return jsonify(get_system_state().to_dict())
 
 
 @app.route('/api/state', methods=['POST'])
 def set_state():
     """Set complete system state (for load/import)"""
+    global _state_loaded
     data = request.json
     system_state.from_dict(data)
+    _state_loaded = True
     save_data()
     return jsonify({'success': True})
 
@@ -907,8 +1223,9 @@ def set_state():
 @app.route('/api/state/reset', methods=['POST'])
 def reset_state():
     """Reset system to empty state"""
-    global system_state
+    global system_state, _state_loaded
     system_state = SystemState()
+    _state_loaded = True
     save_data()
     return jsonify({'success': True})
 
@@ -916,23 +1233,60 @@ def reset_state():
 # ============================================================================
 # API ENDPOINTS - Sandboxes
 # ============================================================================
+# A sandbox stores a reference to an immutable StateSnapshot plus a compact
+# diff of the entities it changed (see sandbox_store.py). Copying live state
+# reuses one snapshot per live state version, saves store only the changes,
+# and materialized states are cached per sandbox revision.
 
 def _now_ts():
     return datetime.now().isoformat()
 
 
+class StateSnapshot(db.Model):
+    """Immutable serialized system state shared by any number of sandboxes"""
+    __tablename__ = 'state_snapshots'
+    id = db.Column(db.String, primary_key=True)
+    data = db.Column(db.Text, nullable=False)  # JSON string of state
+    created_at = db.Column(db.String, default=_now_ts)
+
+
 class Sandbox(db.Model):
     __tablename__ = 'sandboxes'
     id = db.Column(db.String, primary_key=True)
     university_id = db.Column(db.String, index=True, nullable=False)
     name = db.Column(db.String, nullable=False)
-    data = db.Column(db.Text)  # JSON string of state
+    data = db.Column(db.Text)  # Legacy: full JSON state for sandboxes saved before snapshots existed
+    base_snapshot_id = db.Column(db.String, nullable=True, index=True)  # StateSnapshot.id
+    diff = db.Column(db.Text)  # JSON entity diff against the base snapshot
     created_at = db.Column(db.String, default=_now_ts)
     updated_at = db.Column(db.String, default=_now_ts, onupdate=_now_ts)
 
+    def get_diff(self):
+        try:
+            return json.loads(self.diff) if self.diff else {}
+        except Exception:
+            return {}
+
+    def materialize(self):
+        """Full state for this sandbox (cached per base snapshot + revision)"""
+        key = (self.id, self.base_snapshot_id, self.updated_at)
+        state = _materialized_cache.get(key)
+        if state is None:
+            state = apply_diff(_load_snapshot_data(self), self.get_diff())
+            _materialized_cache.put(key, state)
+        return state
+
+    def summary(self):
+        """Small description of the sandbox used for audit records"""
+        return {
+            'name': self.name,
+            'university_id': self.university_id,
+            'base_snapshot_id': self.base_snapshot_id,
+        }
+
     def to_dict(self):
         try:
-            payload = json.loads(self.data) if self.data else {}
+            payload = self.materialize()
         except Exception:
             payload = {}
         return {
@@ -940,18 +1294,74 @@ class Sandbox(db.Model):
             'university_id': self.university_id,
             'name': self.name,
             'data': payload,
+            'base_snapshot_id': self.base_snapshot_id,
+            'changed_entities': diff_size(self.get_diff()),
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
 
 
+# Parsed snapshots are immutable, so they can be cached by ID
+_snapshot_cache = LRUCache(maxsize=16)
+_materialized_cache = LRUCache(maxsize=64)
+# (id(state object), state version) -> snapshot ID for the current live state
+_live_snapshot = {'key': None, 'id': None}
+
+
+def _load_snapshot_data(sandbox):
+    """Base state for a sandbox: its snapshot, or the legacy full-state blob"""
+    if not sandbox.base_snapshot_id:
+        return json.loads(sandbox.data) if sandbox.data else {}
+    data = _snapshot_cache.get(sandbox.base_snapshot_id)
+    if data is None:
+        snapshot = StateSnapshot.query.get(sandbox.base_snapshot_id)
+        data = json.loads(snapshot.data) if snapshot and snapshot.data else {}
+        _snapshot_cache.put(sandbox.base_snapshot_id, data)
+    return data
+
+
+def _create_snapshot(data):
+    snapshot_id = f"snapshot_{uuid.uuid4().hex[:16]}"
+    db.session.add(StateSnapshot(id=snapshot_id, data=json.dumps(data), created_at=_now_ts()))
+    _snapshot_cache.put(snapshot_id, data)
+    return snapshot_id
+
+
+def _release_snapshot(snapshot_id, sandbox_id):
+    """Delete a snapshot once no other sandbox is based on it"""
+    if not snapshot_id:
+        return
+    in_use = Sandbox.query.filter(
+        Sandbox.base_snapshot_id == snapshot_id, Sandbox.id != sandbox_id
+    ).first()
+    if in_use is None:
+        StateSnapshot.query.filter_by(id=snapshot_id).delete()
+        _snapshot_cache.discard(snapshot_id)
+
+
+def _live_snapshot_id():
+    """Snapshot of the live state, serialized once per live state version"""
+    state = get_system_state()
+    key = (id(state), state.version)
+    if _live_snapshot['key'] == key and StateSnapshot.query.get(_live_snapshot['id']) is not None:
+        return _live_snapshot['id']
+    snapshot_id = _create_snapshot(state.to_dict())
+    _live_snapshot.update(key=key, id=snapshot_id)
+    return snapshot_id
+
+
 @app.route('/api/sandboxes', methods=['GET'])
 def list_sandboxes():
     university_id = request.args.get('university_id')
+    query = Sandbox.query
     if university_id:
-        rows = Sandbox.query.filter_by(university_id=university_id).all()
-    else:
-        rows = Sandbox.query.all()
+        query = query.filter_by(university_id=university_id)
+    if pagination_requested(request.args):
+        try:
+            return jsonify(paginate(query, Sandbox.id, request.args))
+        except PaginationError as e:
+            return jsonify({'error': str(e)}), 400
+    rows = query.all()
     return jsonify([r.to_dict() for r in rows])
 
 
@@ -962,22 +1372,23 @@ def create_sandbox():
         data['id'] = f"sandbox_{int(datetime.now().timestamp() * 1000)}"
     if 'university_id' not in data:
         return jsonify({'error': 'university_id is required'}), 400
+    try:
+        validate_state(data.get('data') or {})
+    except DiffError as e:
+        return jsonify({'error': str(e)}), 400
     sandbox = Sandbox(
         id=data['id'],
         university_id=data['university_id'],
         name=data.get('name', 'Play Sandbox'),
-        data=json.dumps(data.get('data', {})),
+        base_snapshot_id=_create_snapshot(data.get('data') or {}),
+        diff=None,
         created_at=_now_ts(),
         updated_at=_now_ts()
     )
     db.session.add(sandbox)
     db.session.commit()
     try:
-        _log_audit(request.headers.get('X-Actor', 'system'), 'create', 'sandbox', sandbox.id, None, {
-            'name': sandbox.name,
-            'university_id': sandbox.university_id,
-            'data': json.loads(sandbox.data) if sandbox.data else {}
-        })
+        _log_audit(request.headers.get('X-Actor', 'system'), 'create', 'sandbox', sandbox.id, None, sandbox.summary())
     except Exception:
         pass
     return jsonify(sandbox.to_dict()), 201
@@ -993,27 +1404,47 @@ def get_sandbox(sandbox_id):
 
 @app.route('/api/sandboxes/<sandbox_id>', methods=['PUT'])
 def update_sandbox(sandbox_id):
+    """
+    Update a sandbox. Send either `diff` (entity changes to merge into the
+    sandbox) or `data` (a full state, stored as a diff against the base).
+    """
     s = Sandbox.query.get(sandbox_id)
     if not s:
         return jsonify({'error': 'Sandbox not found'}), 404
     data = request.json or {}
+    try:
+        if 'diff' in data:
+            validate_diff(data.get('diff') or {})
+        elif 'data' in data:
+            validate_state(data.get('data') or {})
+    except DiffError as e:
+        return jsonify({'error': str(e)}), 400
+
+    before = s.summary()
     s.name = data.get('name', s.name)
     s.university_id = data.get('university_id', s.university_id)
-    if 'data' in data:
-        s.data = json.dumps(data.get('data') or {})
-    before = {
-        'name': s.name,
-        'university_id': s.university_id,
-        'data': json.loads(s.data) if s.data else {}
-    }
+
+    change = None
+    if 'diff' in data:
+        change = compact_diff(data.get('diff') or {})
+        s.diff = json.dumps(merge_diff(s.get_diff(), change))
+    elif 'data' in data:
+        target = data.get('data') or {}
+        change = compute_diff(s.materialize(), target)
+        base = _load_snapshot_data(s)
+        if not s.base_snapshot_id:
+            # Move legacy full-state sandboxes onto a snapshot base
+            s.base_snapshot_id = _create_snapshot(base)
+            s.data = None
+        s.diff = json.dumps(compute_diff(base, target))
+
     s.updated_at = _now_ts()
     db.session.commit()
     try:
-        _log_audit(request.headers.get('X-Actor', 'system'), 'update', 'sandbox', sandbox_id, before, {
-            'name': s.name,
-            'university_id': s.university_id,
-            'data': json.loads(s.data) if s.data else {}
-        })
+        after = s.summary()
+        if change is not None:
+            after['changes'] = change
+        _log_audit(request.headers.get('X-Actor', 'system'), 'update', 'sandbox', sandbox_id, before, after)
     except Exception:
         pass
     return jsonify(s.to_dict())
@@ -1024,11 +1455,9 @@ def delete_sandbox(sandbox_id):
     s = Sandbox.query.get(sandbox_id)
     if not s:
         return jsonify({'error': 'Sandbox not found'}), 404
-    before = {
-        'name': s.name,
-        'university_id': s.university_id,
-        'data': json.loads(s.data) if s.data else {}
-    }
+    before = s.summary()
+    before['diff'] = s.get_diff()
+    _release_snapshot(s.base_snapshot_id, s.id)
     db.session.delete(s)
     db.session.commit()
     try:
@@ -1043,7 +1472,12 @@ def copy_live_to_sandbox(sandbox_id):
     s = Sandbox.query.get(sandbox_id)
     if not s:
         return jsonify({'error': 'Sandbox not found'}), 404
-    s.data = json.dumps(system_state.to_dict())
+    previous_snapshot_id = s.base_snapshot_id
+    s.base_snapshot_id = _live_snapshot_id()
+    if previous_snapshot_id != s.base_snapshot_id:
+        _release_snapshot(previous_snapshot_id, s.id)
+    s.diff = None
+    s.data = None
     s.updated_at = _now_ts()
     db.session.commit()
     return jsonify(s.to_dict())
@@ -1054,6 +1488,8 @@ try:
     with app.app_context():
         db.create_all()
         print('Database tables ensured (db.create_all) after model definitions.')
+        with db.engine.begin() as conn:
+            ensure_rollups(conn)
 except Exception as e:
     print('Could not create DB tables after model definitions:', e)
 
@@ -1187,6 +1623,7 @@ def load_sample_data():
 # ============================================================================
 
 @app.route('/api/universities', methods=['GET'])
+@conditional('universities')
 def get_universities():
     """Get all universities"""
     from db_models import University
@@ -1199,6 +1636,7 @@ def get_universities():
 
 
 @app.route('/api/universities/<university_id>', methods=['GET'])
+@conditional('universities', scope_arg='university_id')
 def get_university(university_id):
     """Get a specific university"""
     from db_models import University
@@ -1217,6 +1655,7 @@ def get_university(university_id):
 # ============================================================================
 
 @app.route('/api/outcomes', methods=['GET'])
+@conditional('outcomes', scope_arg='university_id')
 def get_outcomes():
     """Get outcomes - optionally filtered by university"""
     from db_models import Outcome
@@ -1224,12 +1663,13 @@ def get_outcomes():
     try:
         university_id = request.args.get('university_id')
 
+        query = Outcome.query
         if university_id:
-            outcomes = Outcome.query.filter_by(university_id=university_id).all()
-        else:
-            outcomes = Outcome.query.all()
+            query = query.filter_by(university_id=university_id)
 
-        return jsonify([outcome.to_dict() for outcome in outcomes])
+        return _list_response(query, Outcome)
+    except (PaginationError, FieldsetError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1270,101 +1710,149 @@ def create_outcome():
 # API ENDPOINTS - Comparative Dashboard
 # ============================================================================
 
+# Tables the comparative payload is built from; their versions key the cache
+COMPARATIVE_TABLES = ('universities', 'teams', 'faculty', 'projects', 'interfaces')
+comparative_cache = ResponseCache()
+
+
 @app.route('/api/dashboard/comparative', methods=['GET'])
+@query_budget(6)
+@conditional(*COMPARATIVE_TABLES)
 def get_comparative_dashboard():
     """
     Return aggregated data for all universities for side-by-side comparison.
 
     This is the main endpoint for the collaborative learning dashboard where
     all 8 universities can see each other's data to learn from patterns.
+    The serialized payload is cached until one of COMPARATIVE_TABLES is written.
     """
-    from db_models import University, TeamModel, FacultyModel, ProjectModel, InterfaceModel
-
     try:
-        # Get all active universities
-        universities = University.query.filter_by(active=True).all()
+        # Versions read once by @conditional, so the ETag and the body match
+        version = g.get('table_version') or compute_etag(db.session, COMPARATIVE_TABLES)
+        return cached_json_response(
+            comparative_cache, 'dashboard/comparative', version,
+            lambda: app.json.response(_build_comparative_dashboard()).get_data(),
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        result = {
-            'universities': {},
-            'cross_university_interfaces': [],
-            'proves_project': None,
-            'aggregate_metrics': {}
-        }
 
-        # Aggregate totals across all universities
-        total_teams = 0
-        total_faculty = 0
-        total_projects = 0
-        total_interfaces = 0
-
-        # Build data for each university
-        for uni in universities:
-            uni_id = uni.id
-
-            # Get all entities for this university
-            teams = TeamModel.query.filter_by(university_id=uni_id).all()
-            faculty = FacultyModel.query.filter_by(university_id=uni_id).all()
-            projects = ProjectModel.query.filter_by(university_id=uni_id).all()
-
-            # Get interfaces involving this university (both from and to)
-            interfaces = InterfaceModel.query.filter(
-                (InterfaceModel.from_university == uni_id) |
-                (InterfaceModel.to_university == uni_id)
-            ).all()
-
-            # Count internal vs cross-university interfaces
-            internal_interfaces = [i for i in interfaces if not i.is_cross_university]
-            cross_interfaces = [i for i in interfaces if i.is_cross_university]
-
-            result['universities'][uni_id] = {
-                'info': uni.to_dict(),
-                'teams': [t.to_dict() for t in teams],
-                'faculty': [f.to_dict() for f in faculty],
-                'projects': [p.to_dict() for p in projects],
-                'interfaces': {
-                    'internal': [i.to_dict() for i in internal_interfaces],
-                    'cross_university': [i.to_dict() for i in cross_interfaces],
-                },
-                'metrics': {
-                    'team_count': len(teams),
-                    'faculty_count': len(faculty),
-                    'project_count': len(projects),
-                    'interface_count': len(interfaces),
-                    'cross_university_interface_count': len(cross_interfaces),
-                }
-            }
+def _group_by_university(rows, university_ids):
+    """{university_id: [rows]} for the given universities, keeping row order"""
+    groups = {uni_id: [] for uni_id in university_ids}
+    for row in rows:
+        if row.university_id in groups:
+            groups[row.university_id].append(row)
+    return groups
 
-            # Aggregate totals
-            total_teams += len(teams)
-            total_faculty += len(faculty)
-            total_projects += len(projects)
-            total_interfaces += len(interfaces)
 
-        # Get PROVES shared project
-        proves = ProjectModel.query.filter_by(id='PROVES').first()
-        if proves:
-            result['proves_project'] = proves.to_dict()
-
-        # Get all cross-university interfaces
-        all_cross_interfaces = InterfaceModel.query.filter_by(is_cross_university=True).all()
-        result['cross_university_interfaces'] = [i.to_dict() for i in all_cross_interfaces]
-
-        # Aggregate metrics
-        result['aggregate_metrics'] = {
-            'university_count': len(universities),
-            'total_teams': total_teams,
-            'total_faculty': total_faculty,
-            'total_projects': total_projects,
-            'total_interfaces': total_interfaces,
-            'cross_university_interfaces': len(all_cross_interfaces),
+def _build_comparative_dashboard():
+    """
+    Comparative dashboard payload (uncached).
+    Each table is read once for all active universities and grouped in
+    memory, so the query count does not grow with the number of universities.
+    """
+    from db_models import University, TeamModel, FacultyModel, ProjectModel, InterfaceModel
+
+    # Get all active universities
+    universities = University.query.filter_by(active=True).all()
+    uni_ids = [uni.id for uni in universities]
+
+    teams_by_uni = _group_by_university(
+        TeamModel.query.filter(TeamModel.university_id.in_(uni_ids)).all(), uni_ids)
+    faculty_by_uni = _group_by_university(
+        FacultyModel.query.filter(FacultyModel.university_id.in_(uni_ids)).all(), uni_ids)
+
+    # Projects of active universities plus the shared PROVES project in one query
+    projects = ProjectModel.query.filter(
+        ProjectModel.university_id.in_(uni_ids) | (ProjectModel.id == 'PROVES')
+    ).all()
+    projects_by_uni = _group_by_university(projects, uni_ids)
+    proves = next((p for p in projects if p.id == 'PROVES'), None)
+
+    # Interfaces touching an active university, plus every cross-university one
+    interfaces = InterfaceModel.query.filter(
+        InterfaceModel.from_university.in_(uni_ids) |
+        InterfaceModel.to_university.in_(uni_ids) |
+        (InterfaceModel.is_cross_university == True)
+    ).all()
+
+    # Serialize each interface once; the same dict is reused wherever it appears
+    interfaces_by_uni = {uni_id: [] for uni_id in uni_ids}
+    all_cross_interfaces = []
+    for interface in interfaces:
+        serialized = (interface, interface.to_dict())
+        for uni_id in {interface.from_university, interface.to_university}:
+            if uni_id in interfaces_by_uni:
+                interfaces_by_uni[uni_id].append(serialized)
+        if interface.is_cross_university:
+            all_cross_interfaces.append(serialized[1])
+
+    result = {
+        'universities': {},
+        'cross_university_interfaces': all_cross_interfaces,
+        'proves_project': proves.to_dict() if proves else None,
+        'aggregate_metrics': {}
+    }
+
+    # Aggregate totals across all universities
+    total_teams = 0
+    total_faculty = 0
+    total_projects = 0
+    total_interfaces = 0
+
+    # Build data for each university
+    for uni in universities:
+        uni_id = uni.id
+        teams = teams_by_uni[uni_id]
+        faculty = faculty_by_uni[uni_id]
+        projects = projects_by_uni[uni_id]
+        interfaces = interfaces_by_uni[uni_id]
+
+        # Split internal vs cross-university interfaces
+        internal_interfaces = [d for i, d in interfaces if not i.is_cross_university]
+        cross_interfaces = [d for i, d in interfaces if i.is_cross_university]
+
+        result['universities'][uni_id] = {
+            'info': uni.to_dict(),
+            'teams': [t.to_dict() for t in teams],
+            'faculty': [f.to_dict() for f in faculty],
+            'projects': [p.to_dict() for p in projects],
+            'interfaces': {
+                'internal': internal_interfaces,
+                'cross_university': cross_interfaces,
+            },
+            'metrics': {
+                'team_count': len(teams),
+                'faculty_count': len(faculty),
+                'project_count': len(projects),
+                'interface_count': len(interfaces),
+                'cross_university_interface_count': len(cross_interfaces),
+            }
         }
 
-        return jsonify(result)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        # Aggregate totals
+        total_teams += len(teams)
+        total_faculty += len(faculty)
+        total_projects += len(projects)
+        total_interfaces += len(interfaces)
+
+    # Aggregate metrics
+    result['aggregate_metrics'] = {
+        'university_count': len(universities),
+        'total_teams': total_teams,
+        'total_faculty': total_faculty,
+        'total_projects': total_projects,
+        'total_interfaces': total_interfaces,
+        'cross_university_interfaces': len(all_cross_interfaces),
+    }
+
+    return result
 
 
 @app.route('/api/dashboard/proves', methods=['GET'])
+@query_budget(4)
+@conditional('projects', 'teams', 'interfaces')
 def get_proves_dashboard():
     """Get PROVES collaborative project details with all university participation"""
     from db_models import ProjectModel, TeamModel, InterfaceModel
@@ -1403,6 +1891,10 @@ def get_proves_dashboard():
 # API ENDPOINTS - Analytics (Dynamic Dashboard)
 # ============================================================================
 
+# Cached /api/analytics/data payloads, keyed by the normalized request
+analytics_cache = ResponseCache(maxsize=384)  # raw body plus up to two encodings per query
+
+
 @app.route('/api/analytics/data', methods=['POST'])
 def get_analytics_data():
     """
@@ -1410,8 +1902,9 @@ def get_analytics_data():
 
     Request body:
     {
-        "metric": "student_count" | "team_count" | "faculty_count" | "avg_terms_remaining" | "expertise_distribution",
-        "groupBy": "university" | "project" | "team" | "expertise_area" | "status" | "role",
+        "metric": "student_count" | "team_count" | "faculty_count" | "avg_terms_remaining" | ...,
+        "metrics": ["student_count", "avg_terms_remaining"],  (instead of "metric")
+        "groupBy": "university" | "project" | "team" | "expertise_area" | "status" | "role" | [...],
         "filters": {
             "university_id": "CalPolyPomona",
             "project_id": "PROVES",
@@ -1424,264 +1917,30 @@ def get_analytics_data():
             "end": "2024-12-31"
         }
     }
-    """
-    from db_models import StudentModel, TeamModel, FacultyModel, ProjectModel
-    from sqlalchemy import func
 
+    Queries are generated from the registry in analytics_registry.py;
+    metrics over the same table are computed in one scan. Results are
+    cached until one of the tables they read is written.
+    """
     try:
-        data = request.json
-        metric = data.get('metric', 'student_count')
-        group_by = data.get('groupBy')
-        filters = data.get('filters', {})
-
-        result = []
-
-        # ==== STUDENT METRICS ====
-        if metric == 'student_count':
-            query = db.session.query(
-                StudentModel.university_id if group_by == 'university' else
-                StudentModel.team_id if group_by == 'team' else
-                StudentModel.expertise_area if group_by == 'expertise_area' else
-                StudentModel.status if group_by == 'status' else
-                func.count().label('value'),
-                func.count(StudentModel.id).label('count')
-            )
-
-            # Apply filters
-            if filters.get('university_id'):
-                query = query.filter(StudentModel.university_id == filters['university_id'])
-            if filters.get('team_id'):
-                query = query.filter(StudentModel.team_id == filters['team_id'])
-            if filters.get('status'):
-                query = query.filter(StudentModel.status == filters['status'])
-            if filters.get('expertise_area'):
-                query = query.filter(StudentModel.expertise_area == filters['expertise_area'])
-
-            # Group by dimension
-            if group_by:
-                if group_by == 'university':
-                    query = query.group_by(StudentModel.university_id)
-                elif group_by == 'team':
-                    query = query.group_by(StudentModel.team_id)
-                elif group_by == 'expertise_area':
-                    query = query.group_by(StudentModel.expertise_area)
-                elif group_by == 'status':
-                    query = query.group_by(StudentModel.status)
-
-                results = query.all()
-                result = [{'label': str(r[0] or 'Unknown'), 'value': r[1]} for r in results]
-            else:
-                # Total count without grouping
-                count = query.filter(StudentModel.active == True).count()
-                result = [{'label': 'Total Students', 'value': count}]
-
-        elif metric == 'avg_terms_remaining':
-            query = db.session.query(
-                StudentModel.university_id if group_by == 'university' else
-                StudentModel.team_id if group_by == 'team' else
-                StudentModel.status if group_by == 'status' else
-                func.avg(StudentModel.terms_remaining).label('avg_terms'),
-                func.avg(StudentModel.terms_remaining).label('value')
-            )
-
-            # Apply filters
-            if filters.get('university_id'):
-                query = query.filter(StudentModel.university_id == filters['university_id'])
-            if filters.get('team_id'):
-                query = query.filter(StudentModel.team_id == filters['team_id'])
-            if filters.get('status'):
-                query = query.filter(StudentModel.status == filters['status'])
-
-            query = query.filter(StudentModel.active == True)
-
-            # Group by dimension
-            if group_by:
-                if group_by == 'university':
-                    query = query.group_by(StudentModel.university_id)
-                elif group_by == 'team':
-                    query = query.group_by(StudentModel.team_id)
-                elif group_by == 'status':
-                    query = query.group_by(StudentModel.status)
-
-                results = query.all()
-                result = [{'label': str(r[0] or 'Unknown'), 'value': round(float(r[1] or 0), 2)} for r in results]
-            else:
-                avg = query.scalar() or 0
-                result = [{'label': 'Average Terms Remaining', 'value': round(float(avg), 2)}]
-
-        elif metric == 'status_distribution':
-            query = db.session.query(
-                StudentModel.status,
-                func.count(StudentModel.id).label('count')
-            ).filter(StudentModel.active == True)
-
-            # Apply filters
-            if filters.get('university_id'):
-                query = query.filter(StudentModel.university_id == filters['university_id'])
-            if filters.get('team_id'):
-                query = query.filter(StudentModel.team_id == filters['team_id'])
-
-            query = query.group_by(StudentModel.status)
-            results = query.all()
-
-            result = [{'label': str(r[0] or 'Unknown').title(), 'value': r[1]} for r in results]
-
-        # ==== TEAM METRICS ====
-        elif metric == 'team_count':
-            query = db.session.query(
-                TeamModel.university_id if group_by == 'university' else
-                TeamModel.project_id if group_by == 'project' else
-                TeamModel.discipline if group_by == 'discipline' else
-                func.count().label('value'),
-                func.count(TeamModel.id).label('count')
-            )
-
-            # Apply filters
-            if filters.get('university_id'):
-                query = query.filter(TeamModel.university_id == filters['university_id'])
-            if filters.get('project_id'):
-                query = query.filter(TeamModel.project_id == filters['project_id'])
-            if filters.get('discipline'):
-                query = query.filter(TeamModel.discipline == filters['discipline'])
-
-            # Group by dimension
-            if group_by:
-                if group_by == 'university':
-                    query = query.group_by(TeamModel.university_id)
-                elif group_by == 'project':
-                    query = query.group_by(TeamModel.project_id)
-                elif group_by == 'discipline':
-                    query = query.group_by(TeamModel.discipline)
-
-                results = query.all()
-                result = [{'label': str(r[0] or 'Unknown'), 'value': r[1]} for r in results]
-            else:
-                count = query.count()
-                result = [{'label': 'Total Teams', 'value': count}]
-
-        # ==== FACULTY METRICS ====
-        elif metric == 'faculty_count':
-            query = db.session.query(
-                FacultyModel.university_id if group_by == 'university' else
-                FacultyModel.role if group_by == 'role' else
-                func.count().label('value'),
-                func.count(FacultyModel.id).label('count')
-            )
-
-            # Apply filters
-            if filters.get('university_id'):
-                query = query.filter(FacultyModel.university_id == filters['university_id'])
-            if filters.get('role'):
-                query = query.filter(FacultyModel.role == filters['role'])
-
-            # Group by dimension
-            if group_by:
-                if group_by == 'university':
-                    query = query.group_by(FacultyModel.university_id)
-                elif group_by == 'role':
-                    query = query.group_by(FacultyModel.role)
-
-                results = query.all()
-                result = [{'label': str(r[0] or 'Unknown'), 'value': r[1]} for r in results]
-            else:
-                count = query.count()
-                result = [{'label': 'Total Faculty/Mentors', 'value': count}]
-
-        # ==== PROJECT METRICS ====
-        elif metric == 'project_count':
-            query = db.session.query(
-                ProjectModel.university_id if group_by == 'university' else
-                ProjectModel.type if group_by == 'type' else
-                func.count().label('value'),
-                func.count(ProjectModel.id).label('count')
-            )
-
-            # Apply filters
-            if filters.get('university_id'):
-                query = query.filter(ProjectModel.university_id == filters['university_id'])
-            if filters.get('type'):
-                query = query.filter(ProjectModel.type == filters['type'])
-
-            # Group by dimension
-            if group_by:
-                if group_by == 'university':
-                    query = query.group_by(ProjectModel.university_id)
-                elif group_by == 'type':
-                    query = query.group_by(ProjectModel.type)
-
-                results = query.all()
-                result = [{'label': str(r[0] or 'Unknown'), 'value': r[1]} for r in results]
-            else:
-                count = query.count()
-                result = [{'label': 'Total Projects', 'value': count}]
-
-        # ==== CROSS-TABULATION (Two dimensions) ====
-        elif metric == 'students_by_status_and_expertise':
-            query = db.session.query(
-                StudentModel.status,
-                StudentModel.expertise_area,
-                func.count(StudentModel.id).label('count')
-            ).filter(StudentModel.active == True)
-
-            if filters.get('university_id'):
-                query = query.filter(StudentModel.university_id == filters['university_id'])
-
-            query = query.group_by(StudentModel.status, StudentModel.expertise_area)
-            results = query.all()
-
-            # Format for grouped bar chart or heatmap
-            result = [
-                {
-                    'status': str(r[0] or 'Unknown'),
-                    'expertise': str(r[1] or 'Unknown'),
-                    'value': r[2]
-                }
-                for r in results
-            ]
-
-        return jsonify({
-            'metric': metric,
-            'groupBy': group_by,
-            'data': result
-        })
+        query = AnalyticsQuery(request.get_json(silent=True) or {})
+    except AnalyticsError as e:
+        return jsonify({'error': str(e)}), 400
 
+    try:
+        version = compute_etag(db.session, query.tables)
+        return cached_json_response(
+            analytics_cache, f'analytics/data:{query.key}', version,
+            lambda: app.json.response(query.run(db.session)).get_data(),
+        )
     except Exception as e:
-        import traceback
-        return jsonify({'error': str(e), 'trace': traceback.format_exc()}), 500
+        return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/analytics/dimensions', methods=['GET'])
 def get_analytics_dimensions():
     """Return available dimensions and metrics for the analytics dashboard"""
-    return jsonify({
-        'metrics': [
-            {'value': 'student_count', 'label': 'Student Count', 'description': 'Total number of students'},
-            {'value': 'avg_terms_remaining', 'label': 'Average Terms to Graduation', 'description': 'Average terms remaining until graduation'},
-            {'value': 'status_distribution', 'label': 'Student Status Distribution', 'description': 'Breakdown by incoming/established/outgoing'},
-            {'value': 'team_count', 'label': 'Team Count', 'description': 'Total number of teams'},
-            {'value': 'faculty_count', 'label': 'Faculty/Mentor Count', 'description': 'Total number of faculty and mentors'},
-            {'value': 'project_count', 'label': 'Project Count', 'description': 'Total number of projects'},
-            {'value': 'students_by_status_and_expertise', 'label': 'Students by Status & Expertise', 'description': 'Cross-tabulation of status and expertise area'}
-        ],
-        'dimensions': [
-            {'value': 'university', 'label': 'University', 'applicableTo': ['student_count', 'avg_terms_remaining', 'team_count', 'faculty_count', 'project_count']},
-            {'value': 'project', 'label': 'Project', 'applicableTo': ['team_count']},
-            {'value': 'team', 'label': 'Team', 'applicableTo': ['student_count', 'avg_terms_remaining']},
-            {'value': 'status', 'label': 'Student Status', 'applicableTo': ['student_count', 'avg_terms_remaining']},
-            {'value': 'expertise_area', 'label': 'Expertise Area', 'applicableTo': ['student_count']},
-            {'value': 'discipline', 'label': 'Team Discipline', 'applicableTo': ['team_count']},
-            {'value': 'role', 'label': 'Faculty Role', 'applicableTo': ['faculty_count']},
-            {'value': 'type', 'label': 'Project Type', 'applicableTo': ['project_count']}
-        ],
-        'filters': [
-            {'value': 'university_id', 'label': 'Filter by University', 'type': 'select'},
-            {'value': 'project_id', 'label': 'Filter by Project', 'type': 'select'},
-            {'value': 'team_id', 'label': 'Filter by Team', 'type': 'select'},
-            {'value': 'status', 'label': 'Filter by Status', 'type': 'select', 'options': ['incoming', 'established', 'outgoing']},
-            {'value': 'expertise_area', 'label': 'Filter by Expertise', 'type': 'select'},
-            {'value': 'role', 'label': 'Filter by Role', 'type': 'select'}
-        ]
-    })
+    return jsonify(describe_analytics())
 
 
 # ============================================================================
@@ -1705,24 +1964,14 @@ def university_dashboard():
 # --- Risk Factor Management ---
 
 @app.route('/api/research/factors', methods=['GET'])
+@query_budget(3)
+@conditional('risk_factors', 'factor_values')
 def get_risk_factors():
     """Get all risk factors with their values"""
     try:
-        from db_models import RiskFactor, FactorValue
+        from factor_catalog import get_catalog
 
-        factors = RiskFactor.query.filter_by(active=True).all()
-        result = []
-
-        for factor in factors:
-            factor_data = factor.to_dict()
-
-            # Get factor values
-            values = FactorValue.query.filter_by(factor_id=factor.id).order_by(FactorValue.sort_order).all()
-            factor_data['values'] = [v.to_dict() for v in values]
-
-            result.append(factor_data)
-
-        return jsonify(result)
+        return jsonify(get_catalog(db.session).active())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1732,6 +1981,7 @@ def create_risk_factor():
     """Create a new risk factor"""
     try:
         from db_models import RiskFactor, FactorValue
+        from factor_catalog import invalidate
 
         data = request.json
 
@@ -1761,6 +2011,7 @@ def create_risk_factor():
             db.session.add(factor_value)
 
         db.session.commit()
+        invalidate()
 
         return jsonify({'success': True, 'factor_id': factor.id})
     except Exception as e:
@@ -1773,6 +2024,7 @@ def update_risk_factor(factor_id):
     """Update an existing risk factor"""
     try:
         from db_models import RiskFactor
+        from factor_catalog import invalidate
 
         factor = RiskFactor.query.get_or_404(factor_id)
         data = request.json
@@ -1790,6 +2042,7 @@ def update_risk_factor(factor_id):
             factor.active = data['active']
 
         db.session.commit()
+        invalidate()
 
         return jsonify({'success': True})
     except Exception as e:
@@ -1800,36 +2053,63 @@ def update_risk_factor(factor_id):
 # --- Factor Model Management ---
 
 @app.route('/api/research/models', methods=['GET'])
+@query_budget(4)
+@conditional('factor_models', 'model_factors', 'risk_factors')
 def get_factor_models():
-    """Get all factor models"""
+    """
+    Get all factor models with their weighted factors.
+    `include_factors=false` returns the models alone; `limit`/`cursor`
+    paginate by model id.
+    """
     try:
         from db_models import FactorModel, ModelFactor, RiskFactor
 
-        models = FactorModel.query.all()
-        result = []
-
-        for model in models:
-            model_data = model.to_dict()
+        include_factors = request.args.get('include_factors', 'true').lower() != 'false'
 
-            # Get model factors with weights
-            model_factors = db.session.query(ModelFactor, RiskFactor).join(
-                RiskFactor, ModelFactor.factor_id == RiskFactor.id
-            ).filter(ModelFactor.model_id == model.id).all()
-
-            model_data['factors'] = [
-                {
-                    'factor_id': rf.id,
-                    'factor_name': rf.factor_name,
-                    'display_name': rf.display_name,
-                    'weight': mf.weight,
-                    'enabled': mf.enabled
-                }
-                for mf, rf in model_factors
-            ]
-
-            result.append(model_data)
+        def factor_data(mf, rf):
+            return {
+                'factor_id': rf.id,
+                'factor_name': rf.factor_name,
+                'display_name': rf.display_name,
+                'weight': mf.weight,
+                'enabled': mf.enabled
+            }
 
-        return jsonify(result)
+        if pagination_requested(request.args):
+            page = paginate(FactorModel.query, FactorModel.id, request.args)
+            if include_factors:
+                # One join for the whole page instead of one per model
+                by_model = {model['id']: model for model in page['items']}
+                for model in page['items']:
+                    model['factors'] = []
+                model_factors = db.session.query(ModelFactor, RiskFactor).join(
+                    RiskFactor, ModelFactor.factor_id == RiskFactor.id
+                ).filter(ModelFactor.model_id.in_(list(by_model))).order_by(ModelFactor.id)
+                for mf, rf in model_factors:
+                    by_model[mf.model_id]['factors'].append(factor_data(mf, rf))
+            return jsonify(page)
+
+        if not include_factors:
+            return jsonify([model.to_dict() for model in FactorModel.query.order_by(FactorModel.id)])
+
+        # Every model with its factors in one outer join, grouped in memory
+        rows = db.session.query(FactorModel, ModelFactor, RiskFactor).outerjoin(
+            ModelFactor, ModelFactor.model_id == FactorModel.id
+        ).outerjoin(
+            RiskFactor, ModelFactor.factor_id == RiskFactor.id
+        ).order_by(FactorModel.id, ModelFactor.id)
+
+        result = {}
+        for model, mf, rf in rows:
+            model_data = result.get(model.id)
+            if model_data is None:
+                model_data = result[model.id] = {**model.to_dict(), 'factors': []}
+            if mf is not None and rf is not None:
+                model_data['factors'].append(factor_data(mf, rf))
+
+        return jsonify(list(result.values()))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1927,25 +2207,28 @@ def update_model_factor_weight(model_id, factor_id):
 @app.route('/api/research/energy/interface/<interface_id>', methods=['GET'])
 def calculate_interface_energy(interface_id):
     """Calculate energy loss for a specific interface"""
-    try:
-        from energy_engine import EnergyCalculationEngine
+    from energy_engine import EnergyCalculationEngine, UnknownModelError
 
+    try:
         model_id = request.args.get('model_id', type=int)
 
         engine = EnergyCalculationEngine(model_id=model_id)
         result = engine.calculate_interface_energy_loss(interface_id, model_id)
 
         return jsonify(result)
+    except UnknownModelError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/research/energy/network', methods=['GET'])
+@query_budget(4)
 def calculate_network_energy():
     """Calculate energy loss for entire network or specific university"""
-    try:
-        from energy_engine import EnergyCalculationEngine
+    from energy_engine import EnergyCalculationEngine, UnknownModelError
 
+    try:
         university_id = request.args.get('university_id')
         model_id = request.args.get('model_id', type=int)
 
@@ -1953,6 +2236,8 @@ def calculate_network_energy():
         result = engine.calculate_network_energy(university_id, model_id)
 
         return jsonify(result)
+    except UnknownModelError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2020,29 +2305,36 @@ def migrate_legacy_interfaces():
 # --- Model Comparison & Validation ---
 
 @app.route('/api/research/compare-models', methods=['POST'])
+@query_budget(5)
 def compare_models():
     """
     Compare multiple models by calculating energy loss across the same dataset.
     Used for model validation and selection.
     """
-    try:
-        from energy_engine import EnergyCalculationEngine
+    from energy_engine import EnergyCalculationEngine, UnknownModelError
 
+    try:
         data = request.json
         model_ids = data.get('model_ids', [])
         university_id = data.get('university_id')
 
-        results = []
+        if not isinstance(model_ids, list):
+            return jsonify({'error': 'model_ids must be a list'}), 400
+        try:
+            model_ids = [int(model_id) if model_id else None for model_id in model_ids]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'model_ids must be integers'}), 400
 
-        for model_id in model_ids:
-            engine = EnergyCalculationEngine(model_id=model_id)
-            network_result = engine.calculate_network_energy(university_id, model_id)
-            results.append(network_result)
+        # Interfaces and factor assignments are loaded once for all models
+        engine = EnergyCalculationEngine()
+        results = engine.compare_network_energy(model_ids, university_id) if model_ids else []
 
         return jsonify({
             'success': True,
             'comparisons': results
         })
+    except UnknownModelError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,182 @@
+"""
+Asynchronous audit log writer for FRAMES
+Requests enqueue audit records and return; a background thread serializes
+and inserts them in batches, so request latency no longer includes an
+audit commit. Records still queued at shutdown are flushed by `close()`.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from backend.database import db
+
+
+DEFAULT_BATCH_SIZE = int(os.environ.get('FRAMES_AUDIT_BATCH_SIZE', 200))
+DEFAULT_FLUSH_INTERVAL = float(os.environ.get('FRAMES_AUDIT_FLUSH_SECONDS', 1.0))
+DEFAULT_MAX_QUEUE = int(os.environ.get('FRAMES_AUDIT_MAX_QUEUE', 10000))
+
+
+def _dumps(payload) -> Optional[str]:
+    if payload is None:
+        return None
+    return json.dumps(payload, default=str)
+
+
+class AuditWriter:
+    """
+    Batched, best-effort audit writer.
+
+    - record() never blocks: when the queue is full the record is dropped
+      and counted in stats()['dropped'].
+    - A batch is written when `batch_size` records are waiting or
+      `flush_interval` seconds have passed since the first of them.
+    - A failed batch is counted in stats()['failed'] and not retried.
+    - sync=True (FRAMES_AUDIT_SYNC=1) writes each record immediately,
+      which keeps tests and scripts deterministic.
+    """
+
+    def __init__(self, app, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_queue: int = DEFAULT_MAX_QUEUE, sync: Optional[bool] = None):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.sync = os.environ.get('FRAMES_AUDIT_SYNC') == '1' if sync is None else sync
+        self._stats = {'queued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+        self._stats_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Also called after a fork: the parent's queue and thread do not carry over
+        self._queue = queue.Queue(self.max_queue)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._pid = os.getpid()
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self._stats[key] += n
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def record(self, actor, action, entity_type, entity_id, before=None, after=None,
+               meta=None, university_id=None):
+        row = {
+            'actor': actor or 'system',
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': None if entity_id is None else str(entity_id),
+            'university_id': university_id,
+            # Serialized on the writer thread, not in the request
+            'payload_before': before,
+            'payload_after': after,
+            'timestamp': datetime.now().isoformat(),
+            'meta': meta,
+        }
+        if self.sync:
+            self._write([row])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            self._count('queued')
+        except queue.Full:
+            self._count('dropped')
+
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self._reset()
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name='frames-audit-writer', daemon=True
+                    )
+                    self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Writer side
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _drain(self) -> List[Dict]:
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def _write(self, rows: List[Dict]):
+        from db_models import AuditLog
+
+        try:
+            for row in rows:
+                row['payload_before'] = _dumps(row['payload_before'])
+                row['payload_after'] = _dumps(row['payload_after'])
+            # Own app context, so the batch commits in its own session
+            with self.app.app_context():
+                try:
+                    db.session.execute(insert(AuditLog), rows)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+            self._count('written', len(rows))
+            self._count('batches')
+        except Exception:
+            self._count('failed', len(rows))
+            print('Audit log error:', traceback.format_exc())
+
+    def flush(self):
+        """Write everything queued so far on the calling thread"""
+        rows = self._drain()
+        for start in range(0, len(rows), self.batch_size):
+            self._write(rows[start:start + self.batch_size])
+
+    def close(self, timeout: float = 5.0):
+        """Stop the writer thread and flush what is left (registered atexit)"""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            result = dict(self._stats)
+        result['pending'] = self._queue.qsize()
+        result['mode'] = 'sync' if self.sync else 'async'
+        return result
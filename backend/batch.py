@@ -0,0 +1,109 @@
+"""
+Batched GET requests for FRAMES
+POST /api/batch runs several internal GET requests in one HTTP round trip.
+Sequential batches share the outer request's app context, so every item
+uses the same DB session; concurrent batches give each worker thread its
+own context and session. JSON bodies are spliced into the reply as-is,
+without being decoded and re-encoded.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from flask import request
+
+
+MAX_REQUESTS = 25
+MAX_WORKERS = 4
+
+# Forwarded from the batch request to every item unless the item overrides them
+FORWARDED_HEADERS = ('X-University-ID', 'X-Is-Researcher', 'Accept-Language', 'Authorization')
+ITEM_HEADERS = ('If-None-Match',)
+# Never batched: recursion, and a stream that does not end
+EXCLUDED_PATHS = ('/api/batch', '/api/events')
+
+
+class BatchError(ValueError):
+    """The batch request itself is malformed"""
+
+
+def parse_batch_request(data) -> Tuple[List[Dict], bool]:
+    """
+    Return (items, concurrent). Accepts a JSON array of items or
+    `{"requests": [...], "concurrent": true}`; an item is a path string or
+    `{"id": "...", "path": "/api/...", "headers": {"If-None-Match": "..."}}`.
+    """
+    concurrent = False
+    if isinstance(data, dict):
+        concurrent = bool(data.get('concurrent'))
+        data = data.get('requests')
+    if not isinstance(data, list) or not data:
+        raise BatchError('Expected a non-empty JSON array of requests (or {"requests": [...]})')
+    if len(data) > MAX_REQUESTS:
+        raise BatchError(f'At most {MAX_REQUESTS} requests per batch')
+
+    items = []
+    for index, raw in enumerate(data):
+        if isinstance(raw, str):
+            raw = {'path': raw}
+        if not isinstance(raw, dict) or not isinstance(raw.get('path'), str):
+            raise BatchError(f'Request {index}: expected a path or an object with "path"')
+        method = str(raw.get('method', 'GET')).upper()
+        if method != 'GET':
+            raise BatchError(f'Request {index}: only GET requests can be batched')
+        path = raw['path']
+        if not path.startswith('/api/') or path.split('?', 1)[0].rstrip('/') in EXCLUDED_PATHS:
+            raise BatchError(f'Request {index}: {path} cannot be batched')
+        headers = raw.get('headers') or {}
+        items.append({
+            'id': raw.get('id', index),
+            'path': path,
+            'headers': {name: headers[name] for name in ITEM_HEADERS if name in headers},
+        })
+    return items, concurrent
+
+
+def _dispatch(app, item: Dict, headers: Dict) -> bytes:
+    """Run one GET through routing and the view (no before/after_request hooks)"""
+    with app.test_request_context(item['path'], method='GET', headers={**headers, **item['headers']}):
+        routing_error = request.routing_exception
+        if routing_error is not None:
+            # Unknown path: report it as such rather than through the catch-all handler
+            rv = (app.json.response({'error': routing_error.description}), getattr(routing_error, 'code', 404))
+        else:
+            try:
+                rv = app.dispatch_request()
+            except Exception as e:
+                rv = app.handle_user_exception(e)
+        response = app.make_response(rv)
+
+    head = {'id': item['id'], 'status': response.status_code}
+    if response.headers.get('ETag'):
+        head['etag'] = response.headers['ETag']
+    encoded = app.json.dumps(head)
+
+    data = response.get_data()
+    if response.status_code == 304 or not data:
+        body = b'null'
+    elif response.is_json:
+        body = data
+    else:
+        body = app.json.dumps(data.decode('utf-8', 'replace')).encode('utf-8')
+    return encoded[:-1].encode('utf-8') + b',"body":' + body + b'}'
+
+
+def _dispatch_in_context(app, item: Dict, headers: Dict) -> bytes:
+    # Own app context, hence own session (removed when the context ends)
+    with app.app_context():
+        return _dispatch(app, item, headers)
+
+
+def run_batch(app, items: List[Dict], concurrent: bool = False) -> bytes:
+    """JSON body `{"responses": [...]}` with one entry per item, in request order"""
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    if concurrent and len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(items))) as pool:
+            parts = list(pool.map(lambda item: _dispatch_in_context(app, item, headers), items))
+    else:
+        parts = [_dispatch(app, item, headers) for item in items]
+    return b'{"responses":[' + b','.join(parts) + b']}'
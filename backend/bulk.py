@@ -0,0 +1,334 @@
+"""
+Bulk create/update for FRAMES entities
+Rows arrive as a JSON array or a CSV stream and are validated in chunks.
+Each chunk is written with one batched INSERT and one batched UPDATE, all
+inside the caller's transaction, so the caller decides whether to commit.
+"""
+
+import csv
+import io
+import json
+import uuid
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import Boolean, Float, Integer, JSON, insert, select, update
+
+from backend.database import db
+from db_models import InterfaceModel, StudentModel, TeamModel, Timestamp, parse_timestamp
+
+
+CHUNK_SIZE = 500
+MAX_ROWS = 50000
+
+_TRUE = {'true', '1', 'yes', 'y', 't'}
+_FALSE = {'false', '0', 'no', 'n', 'f'}
+
+
+class BulkError(ValueError):
+    """The request as a whole is malformed"""
+
+
+class RowError(ValueError):
+    """A single row failed validation"""
+
+
+# ----------------------------------------------------------------------
+# Request parsing
+# ----------------------------------------------------------------------
+
+def parse_bulk_request(request) -> Tuple[Iterable, bool]:
+    """
+    Return (rows, atomic). Accepts `text/csv` (read as a stream), a JSON
+    array of objects, or `{"rows": [...], "atomic": true}`.
+    """
+    atomic = request.args.get('atomic', 'false').lower() == 'true'
+
+    if request.mimetype == 'text/csv':
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+        return csv.DictReader(stream), atomic
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        atomic = atomic or bool(data.get('atomic'))
+        data = data.get('rows')
+    if not isinstance(data, list):
+        raise BulkError('Expected a JSON array of rows (or {"rows": [...]}) or text/csv')
+    return data, atomic
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[List[Tuple[int, object]]]:
+    numbered = enumerate(rows)
+    while True:
+        chunk = list(islice(numbered, size))
+        if not chunk:
+            return
+        if chunk[-1][0] >= MAX_ROWS:
+            raise BulkError(f'At most {MAX_ROWS} rows per request')
+        yield chunk
+
+
+# ----------------------------------------------------------------------
+# Value coercion
+# ----------------------------------------------------------------------
+
+def _coerce(column, value):
+    """
+    Convert a CSV/JSON value to the column's Python type. Anything that
+    cannot be stored as that type is a RowError, so it never reaches the
+    batched INSERT/UPDATE.
+    """
+    if value is None:
+        return None
+    column_type = column.type
+    try:
+        if isinstance(column_type, JSON):
+            return json.loads(value) if isinstance(value, str) else value
+        if isinstance(value, (dict, list)):
+            raise ValueError(value)
+        if isinstance(column_type, Timestamp):
+            return parse_timestamp(value).isoformat()
+        if isinstance(column_type, Boolean):
+            if isinstance(value, bool):
+                return value
+            lowered = str(value).strip().lower() if isinstance(value, (str, int)) else None
+            if lowered in _TRUE:
+                return True
+            if lowered in _FALSE:
+                return False
+            raise ValueError(value)
+        if isinstance(value, bool):
+            raise ValueError(value)  # JSON true/false for a number or string column
+        if isinstance(column_type, Integer):
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError(value)
+            return int(value)
+        if isinstance(column_type, Float):
+            return float(value)
+        if isinstance(value, (int, float)):
+            return str(value)
+        if not isinstance(value, str):
+            raise ValueError(value)
+        return value
+    except (TypeError, ValueError):
+        raise RowError(f"Invalid value for {column.key}: {value!r}")
+
+def _column_default(column):
+    default = column.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    if default.is_scalar:
+        return default.arg
+    return None
+
+
+# ----------------------------------------------------------------------
+# Entity specs
+# ----------------------------------------------------------------------
+
+class BulkSpec:
+    """How rows of one entity type are validated and completed"""
+
+    model = None
+    entity_type = None
+    id_prefix = None
+    required = ()
+    lookup_columns = ('id',)  # loaded for rows that already exist
+
+    def columns(self):
+        return {c.key: c for c in self.model.__table__.columns}
+
+    def coerce(self, raw) -> Dict:
+        if not isinstance(raw, dict):
+            raise RowError('Row must be an object')
+        columns = self.columns()
+        aliases = getattr(self.model, 'api_aliases', {})
+        values = {}
+        for key, value in raw.items():
+            if isinstance(value, str) and not value.strip():
+                continue  # empty CSV cell: leave the field unset/unchanged
+            name = aliases.get(key, key)
+            if name not in columns:
+                raise RowError(f'Unknown field: {key}')
+            values[name] = _coerce(columns[name], value)
+        return values
+
+    def load_existing(self, ids: List[str]) -> Dict:
+        if not ids:
+            return {}
+        table = self.model.__table__
+        rows = db.session.execute(
+            select(*(table.c[name] for name in self.lookup_columns)).where(table.c.id.in_(ids))
+        ).all()
+        return {row.id: row for row in rows}
+
+    def _complete(self, values: Dict) -> Dict:
+        """Full column set with model defaults, so a chunk inserts as one batch"""
+        row = {}
+        for name, column in self.columns().items():
+            row[name] = values[name] if values.get(name) is not None else _column_default(column)
+        return row
+
+    def prepare_insert(self, values: Dict, actor: str, is_researcher: bool) -> Dict:
+        missing = [name for name in self.required if values.get(name) in (None, '')]
+        if missing:
+            raise RowError(f"Missing required field(s): {', '.join(missing)}")
+        if not values.get('id'):
+            values['id'] = f'{self.id_prefix}_{uuid.uuid4().hex[:12]}'
+        return self._complete(values)
+
+    def prepare_update(self, values: Dict, current, actor: str, is_researcher: bool) -> Dict:
+        return values
+
+
+class StudentBulkSpec(BulkSpec):
+    model = StudentModel
+    entity_type = 'student'
+    id_prefix = 'student'
+    required = ('university_id', 'name')
+    lookup_columns = ('id', 'university_id')
+
+    @staticmethod
+    def _check_terms(values):
+        terms = values.get('terms_remaining')
+        if terms is not None and terms < 0:
+            raise RowError('terms_remaining must be >= 0')
+
+    def prepare_insert(self, values, actor, is_researcher):
+        self._check_terms(values)
+        row = super().prepare_insert(values, actor, is_researcher)
+        if not values.get('status'):
+            row['status'] = StudentModel.status_for(row['terms_remaining'])
+        return row
+
+    def prepare_update(self, values, current, actor, is_researcher):
+        self._check_terms(values)
+        if values.get('terms_remaining') is not None:
+            values['status'] = StudentModel.status_for(values['terms_remaining'])
+        return values
+
+
+class TeamBulkSpec(BulkSpec):
+    model = TeamModel
+    entity_type = 'team'
+    id_prefix = 'team'
+    required = ('name', 'project_id')
+    lookup_columns = ('id', 'university_id')
+
+    def prepare_insert(self, values, actor, is_researcher):
+        if not values.get('university_id'):
+            values['university_id'] = actor
+        if not is_researcher and values['university_id'] != actor:
+            raise RowError('Can only create teams for your own university')
+        return super().prepare_insert(values, actor, is_researcher)
+
+    def prepare_update(self, values, current, actor, is_researcher):
+        if not is_researcher and (
+            current.university_id != actor or values.get('university_id', actor) != actor
+        ):
+            raise RowError('Can only update teams from your own university')
+        return values
+
+
+class InterfaceBulkSpec(BulkSpec):
+    model = InterfaceModel
+    entity_type = 'interface'
+    id_prefix = 'interface'
+    required = ('from_entity', 'to_entity')
+    lookup_columns = ('id', 'from_entity', 'to_entity', 'from_university', 'to_university')
+
+    @staticmethod
+    def _set_universities(values, from_entity, to_entity, actor):
+        values['from_university'] = InterfaceModel.university_of(from_entity, actor)
+        values['to_university'] = InterfaceModel.university_of(to_entity, actor)
+        values['is_cross_university'] = values['from_university'] != values['to_university']
+
+    def prepare_insert(self, values, actor, is_researcher):
+        self._set_universities(values, values.get('from_entity'), values.get('to_entity'), actor)
+        if not is_researcher and actor not in (values['from_university'], values['to_university']):
+            raise RowError('Can only create interfaces involving your own university')
+        return super().prepare_insert(values, actor, is_researcher)
+
+    def prepare_update(self, values, current, actor, is_researcher):
+        if not is_researcher and actor not in (current.from_university, current.to_university):
+            raise RowError('Can only update interfaces involving your own university')
+        if 'from_entity' in values or 'to_entity' in values:
+            self._set_universities(
+                values,
+                values.get('from_entity') or current.from_entity,
+                values.get('to_entity') or current.to_entity,
+                actor,
+            )
+        return values
+
+
+STUDENTS = StudentBulkSpec()
+TEAMS = TeamBulkSpec()
+INTERFACES = InterfaceBulkSpec()
+
+
+# ----------------------------------------------------------------------
+# Execution
+# ----------------------------------------------------------------------
+
+def run_bulk(spec: BulkSpec, rows: Iterable, actor: str, is_researcher: bool,
+             atomic: bool = False, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Validate and write `rows` in the current session transaction.
+    Rows whose id already exists are updated, the rest inserted. With
+    `atomic`, nothing is written once a row fails (the caller rolls back).
+
+    Returns {'created', 'updated', 'failed', 'results': [{row, id, status[, error]}]}
+    """
+    summary = {'created': 0, 'updated': 0, 'failed': 0, 'results': []}
+    seen = set()
+
+    for chunk in _chunks(rows, chunk_size):
+        # Coerce first, so only well-typed ids reach the lookup query
+        coerced = []
+        for index, raw in chunk:
+            try:
+                values = spec.coerce(raw)
+                coerced.append((index, values.get('id'), values, None))
+            except RowError as e:
+                coerced.append((index, raw.get('id') if isinstance(raw, dict) else None, None, e))
+        existing = spec.load_existing([
+            entity_id for _, entity_id, values, _ in coerced if values is not None and entity_id
+        ])
+        inserts, updates = [], []
+
+        for index, entity_id, values, error in coerced:
+            try:
+                if error is not None:
+                    raise error
+                if entity_id is not None and entity_id in seen:
+                    raise RowError('Duplicate id in request')
+                current = existing.get(entity_id)
+                if current is None:
+                    values = spec.prepare_insert(values, actor, is_researcher)
+                    inserts.append(values)
+                    status = 'created'
+                else:
+                    values = spec.prepare_update(values, current, actor, is_researcher)
+                    if len(values) > 1:
+                        updates.append(values)
+                    status = 'updated'
+            except RowError as e:
+                summary['failed'] += 1
+                summary['results'].append({'row': index, 'id': entity_id, 'status': 'error', 'error': str(e)})
+                continue
+
+            seen.add(values['id'])
+            summary[status] += 1
+            summary['results'].append({'row': index, 'id': values['id'], 'status': status})
+
+        if atomic and summary['failed']:
+            continue  # keep validating for the report, but write nothing more
+        if inserts:
+            db.session.execute(insert(spec.model), inserts)
+        if updates:
+            db.session.execute(update(spec.model), updates)
+
+    return summary
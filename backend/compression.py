@@ -0,0 +1,96 @@
+"""
+Negotiated response compression for FRAMES
+Large API responses are gzip- or brotli-encoded according to the
+client's Accept-Encoding. Small bodies, streams and static files are left
+untouched.
+"""
+
+import gzip
+import os
+from typing import Callable
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+
+DEFAULT_MIN_SIZE = int(os.environ.get('FRAMES_COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # good ratio at dynamic-response speeds
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript')
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def init_compression(app, min_size: int = DEFAULT_MIN_SIZE):
+    """Compress eligible responses of `app` (disable with FRAMES_COMPRESS=0)"""
+    if os.environ.get('FRAMES_COMPRESS', '1') == '0':
+        return
+    app.extensions['frames_compression'] = {'min_size': min_size}
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough          # send_file / static files
+            or response.is_streamed              # SSE and other generators
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if (response.content_length or 0) < min_size:
+            return response
+        encoding = _choose_encoding()
+        if encoding is None:
+            return response
+
+        response.set_data(_compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+def cached_json_response(cache, name: str, version: str, build: Callable[[], bytes]):
+    """
+    JSON response for a ResponseCache payload, already encoded for the
+    client. The compressed bytes are cached per encoding next to the raw
+    ones (same version), so a cache hit costs no serialization or
+    compression; the after_request hook skips responses that carry a
+    Content-Encoding.
+    """
+    app = current_app
+    body = cache.get_or_build(name, version, build)
+    response = app.response_class(body, mimetype=app.json.mimetype)
+
+    settings = app.extensions.get('frames_compression')
+    if settings is None:
+        return response
+    response.vary.add('Accept-Encoding')
+    if len(body) < settings['min_size']:
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(cache.get_or_build(f'{name}|{encoding}', version, lambda: _compress(body, encoding)))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,164 @@
+"""
+Shared fixtures for the FRAMES backend tests.
+
+The tests write data, so they only run against a scratch SQLite database:
+leave DATABASE_URL unset (including in .env) and one is created in a temp
+dir. `seeded` empties every table and loads the small dataset below; the
+write counters in table_versions are bumped instead of reset, so response
+caches keyed on them never serve a previous test's payload.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+from dotenv import load_dotenv
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+for path in (ROOT, os.path.join(ROOT, 'backend')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+load_dotenv()
+SCRATCH_DB = None
+if not os.environ.get('DATABASE_URL'):
+    SCRATCH_DB = os.path.join(tempfile.mkdtemp(prefix='frames-test-'), 'frames.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+
+UNIVERSITIES = ('U0', 'U1', 'U2')
+DISCIPLINES = ('software', 'electrical', None)
+EXPERTISE = ('Software', 'Electrical', None)
+BOND_TYPES = ('codified-strong', 'codified-moderate', 'institutional-weak', 'fragile-temporary')
+BASE_TIME = datetime(2023, 1, 1, 9, 0)
+
+
+@pytest.fixture(scope='session')
+def app():
+    if SCRATCH_DB is None:
+        pytest.skip('needs a scratch database (DATABASE_URL unset)')
+    from backend.app import app
+    from backend.database import db
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    # Run in the query budget's pytest mode whatever the environment says
+    monkeypatch.delenv('FRAMES_QUERY_BUDGET', raising=False)
+    monkeypatch.setitem(app.config, 'QUERY_BUDGET', None)
+    return app.test_client()
+
+
+def reset_database(app):
+    """Delete every row except the write counters, then bump all of those"""
+    from sqlalchemy import delete, update
+    from backend.database import db
+    from db_models import TableVersion
+
+    versions = TableVersion.__table__
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            if table is not versions:
+                db.session.execute(delete(table))
+        db.session.execute(update(versions).values(version=versions.c.version + 1))
+        db.session.commit()
+
+
+def seed_database(app):
+    """
+    Three active universities and an inactive one, each with two projects
+    of two teams; five students per team with 1-5 terms remaining, plus a
+    graduated student per team; faculty, interfaces and outcomes.
+    """
+    from backend.database import db
+    from db_models import (
+        FacultyModel, InterfaceModel, Outcome, ProjectModel, StudentModel, TeamModel, University,
+    )
+
+    with app.app_context():
+        db.session.add(ProjectModel(id='PROVES', name='PROVES', is_collaborative=True))
+        teams = []
+        for u, university_id in enumerate(UNIVERSITIES + ('U3',)):
+            db.session.add(University(id=university_id, name=f'University {u}', is_lead=u == 0,
+                                      active=university_id != 'U3'))
+            for f in range(2):
+                db.session.add(FacultyModel(id=f'{university_id}_f{f}', university_id=university_id,
+                                            name=f'Faculty {f}', role='advisor' if f else 'lead',
+                                            created_at=(BASE_TIME + timedelta(days=40 * f + u)).isoformat()))
+            for p in range(2):
+                project_id = f'{university_id}_p{p}'
+                db.session.add(ProjectModel(id=project_id, university_id=university_id, name=f'Project {p}',
+                                            created_at=(BASE_TIME + timedelta(days=30 * p)).isoformat()))
+                for t in range(2):
+                    team_id = f'{project_id}_t{t}'
+                    teams.append((university_id, team_id))
+                    db.session.add(TeamModel(
+                        id=team_id, university_id=university_id, project_id=project_id, name=f'Team {t}',
+                        discipline=DISCIPLINES[(p + t + u) % 3],
+                        created_at=(BASE_TIME + timedelta(days=100 * p + 10 * t + u)).isoformat(),
+                    ))
+                    for s in range(5):
+                        terms = (s + t + u) % 5 + 1
+                        db.session.add(StudentModel(
+                            id=f'{team_id}_s{s}', university_id=university_id, name=f'Student {s}',
+                            team_id=team_id, terms_remaining=terms,
+                            status=StudentModel.status_for(terms) if s % 2 else None,
+                            expertise_area=EXPERTISE[(s + u) % 3],
+                            created_at=(BASE_TIME + timedelta(days=45 * s + 7 * t + u)).isoformat(),
+                        ))
+                    db.session.add(StudentModel(
+                        id=f'{team_id}_alum', university_id=university_id, name='Alum', team_id=team_id,
+                        terms_remaining=0, status='outgoing', active=False,
+                        expertise_area=EXPERTISE[t % 3],
+                        created_at=BASE_TIME.isoformat(),
+                        graduated_at=(BASE_TIME + timedelta(days=200 * p + 90 * t + u)).isoformat(),
+                    ))
+            for year in (2023, 2024):
+                for kind in ('mission_success', 'program_success'):
+                    db.session.add(Outcome(
+                        university_id=university_id, project_id=f'{university_id}_p0', outcome_type=kind,
+                        success=(year + u + len(kind)) % 2 == 0, cohort_year=year,
+                        recorded_at=datetime(year, 5 + u, 1).isoformat(),
+                    ))
+        for k in range(24):
+            (from_university, a), (to_university, b) = teams[k % len(teams)], teams[(5 * k + 3) % len(teams)]
+            db.session.add(InterfaceModel(
+                id=f'if{k:02d}', from_entity=a, to_entity=b, interface_type='team-to-team',
+                bond_type=BOND_TYPES[k % len(BOND_TYPES)], energy_loss=(7 * k) % 60,
+                from_university=from_university, to_university=to_university,
+                is_cross_university=from_university != to_university,
+            ))
+        db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def empty_database(app):
+    """Call to empty the database (for module-scoped fixtures with their own data)"""
+    return lambda: reset_database(app)
+
+
+@pytest.fixture
+def seeded(app):
+    reset_database(app)
+    seed_database(app)
+    return app
+
+
+@pytest.fixture
+def rollup_drift(app):
+    """Call for {source table: rows where a rollup differs from a GROUP BY over its source}"""
+    from backend.database import db
+    from rollups import ROLLUPS
+
+    def drift():
+        with app.app_context():
+            conn = db.session.connection()
+            drifted = {name: rollup.check(conn) for name, rollup in ROLLUPS.items()}
+            return {name: rows for name, rows in drifted.items() if rows}
+    return drift
@@ -8,6 +8,36 @@ from datetime import datetime
 from backend.database import db
 
 
+def parse_timestamp(value) -> datetime:
+    """Naive local datetime for an ISO 8601 string or datetime (ValueError if malformed)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    if not isinstance(value, datetime):
+        raise ValueError(f'Not a timestamp: {value!r}')
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class Timestamp(db.TypeDecorator):
+    """
+    Native DATETIME/TIMESTAMP column that reads and writes ISO 8601 strings,
+    so range predicates use the column's index while payloads keep the
+    format the string columns had. Aware values are stored as local time,
+    like the naive datetime.now() defaults.
+    """
+    impl = db.DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or value == '':
+            return None
+        return parse_timestamp(value)
+
+    def process_result_value(self, value, dialect):
+        return value.isoformat() if value is not None else None
+
+
 class TeamModel(db.Model):
     __tablename__ = 'teams'
     id = db.Column(db.String, primary_key=True)
@@ -16,9 +46,15 @@ class TeamModel(db.Model):
     discipline = db.Column(db.String, nullable=True)
     name = db.Column(db.String, nullable=False)
     description = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
+    created_at = db.Column(Timestamp, default=lambda: datetime.now().isoformat(), index=True)
     meta = db.Column(db.JSON, nullable=True)
 
+    # University columns whose values scope this table's write versions (ETags)
+    version_scopes = ('university_id',)
+
+    # (entity type, id attribute) published on the /api/events change feed
+    change_event = ('team', 'id')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -39,9 +75,11 @@ class FacultyModel(db.Model):
     name = db.Column(db.String, nullable=False)
     role = db.Column(db.String, nullable=True)
     description = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
+    created_at = db.Column(Timestamp, default=lambda: datetime.now().isoformat(), index=True)
     meta = db.Column(db.JSON, nullable=True)
 
+    version_scopes = ('university_id',)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -63,9 +101,11 @@ class ProjectModel(db.Model):
     is_collaborative = db.Column(db.Boolean, default=False)  # TRUE for PROVES
     duration = db.Column(db.Integer, nullable=True)
     description = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
+    created_at = db.Column(Timestamp, default=lambda: datetime.now().isoformat(), index=True)
     meta = db.Column(db.JSON, nullable=True)
 
+    version_scopes = ('university_id',)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -95,6 +135,27 @@ class InterfaceModel(db.Model):
     created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
+    # API field names that differ from column names (used by sparse fieldsets)
+    api_aliases = {
+        'from': 'from_entity',
+        'to': 'to_entity',
+        'interfaceType': 'interface_type',
+        'bondType': 'bond_type',
+        'energyLoss': 'energy_loss',
+    }
+
+    # An interface belongs to both universities it connects
+    version_scopes = ('from_university', 'to_university')
+
+    change_event = ('interface', 'id')
+
+    @staticmethod
+    def university_of(entity_id, default):
+        """University prefix of an entity ID (format: UniversityID_entity_name)"""
+        if entity_id and '_' in entity_id:
+            return entity_id.split('_')[0]
+        return default
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -120,6 +181,9 @@ class University(db.Model):
     meta = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
 
+    # Universities version under their own id
+    version_scopes = ('id',)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -140,9 +204,11 @@ class Outcome(db.Model):
     success = db.Column(db.Boolean, nullable=False)
     cohort_year = db.Column(db.Integer, nullable=True)
     notes = db.Column(db.Text, nullable=True)
-    recorded_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
+    recorded_at = db.Column(Timestamp, default=lambda: datetime.now().isoformat(), index=True)
     meta = db.Column(db.JSON, nullable=True)
 
+    version_scopes = ('university_id',)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -171,19 +237,43 @@ class StudentModel(db.Model):
     status = db.Column(db.String, nullable=True)  # Auto-calculated: incoming/established/outgoing
     is_lead = db.Column(db.Boolean, default=False)  # Team lead designation
     active = db.Column(db.Boolean, default=True)  # False when graduated
-    created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
-    graduated_at = db.Column(db.String, nullable=True)  # Set when terms_remaining hits 0
+    created_at = db.Column(Timestamp, default=lambda: datetime.now().isoformat(), index=True)
+    graduated_at = db.Column(Timestamp, nullable=True, index=True)  # Set when terms_remaining hits 0
     meta = db.Column(db.JSON, nullable=True)
 
-    def calculate_status(self):
-        """Auto-calculate student status based on terms remaining"""
-        if self.terms_remaining >= 4:
+    version_scopes = ('university_id',)
+
+    change_event = ('student', 'id')
+
+    # API fields computed from several columns (used by sparse fieldsets)
+    api_derived_fields = {
+        'status': (('status', 'terms_remaining'),
+                   lambda row: row.status or StudentModel.status_for(row.terms_remaining)),
+    }
+
+    @staticmethod
+    def status_for(terms_remaining):
+        """Student status for a given number of terms remaining"""
+        if terms_remaining >= 4:
             return 'incoming'
-        elif self.terms_remaining >= 2:
+        elif terms_remaining >= 2:
             return 'established'
         else:
             return 'outgoing'
 
+    @staticmethod
+    def status_case(terms_remaining):
+        """SQL CASE equivalent of status_for(), for set-based updates"""
+        return db.case(
+            (terms_remaining >= 4, 'incoming'),
+            (terms_remaining >= 2, 'established'),
+            else_='outgoing',
+        )
+
+    def calculate_status(self):
+        """Auto-calculate student status based on terms remaining"""
+        return self.status_for(self.terms_remaining)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -204,6 +294,13 @@ class StudentModel(db.Model):
 
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
+    # Back the /api/audit filters; trailing id keeps newest-first keyset pages index-ordered
+    __table_args__ = (
+        db.Index('ix_audit_logs_entity', 'entity_type', 'entity_id', 'id'),
+        db.Index('ix_audit_logs_university', 'university_id', 'id'),
+        db.Index('ix_audit_logs_actor', 'actor', 'id'),
+        db.Index('ix_audit_logs_timestamp', 'timestamp'),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     actor = db.Column(db.String, nullable=False, default='system')
     action = db.Column(db.String, nullable=False)
@@ -212,7 +309,7 @@ class AuditLog(db.Model):
     university_id = db.Column(db.String, nullable=True)
     payload_before = db.Column(db.Text, nullable=True)
     payload_after = db.Column(db.Text, nullable=True)
-    timestamp = db.Column(db.String, default=lambda: datetime.now().isoformat())
+    timestamp = db.Column(Timestamp, default=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
     def to_dict(self):
@@ -230,6 +327,42 @@ class AuditLog(db.Model):
         }
 
 
+class TableVersion(db.Model):
+    """
+    Write counter per table and university scope ('*' = the whole table).
+    Bumped in the writing transaction (see versioning.py) and used to build
+    ETags for conditional GETs.
+    """
+    __tablename__ = 'table_versions'
+    table_name = db.Column(db.String, primary_key=True)
+    scope = db.Column(db.String, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class StudentRollup(db.Model):
+    """
+    Active students counted per (university, team, status, expertise area).
+    Maintained in the writing transaction (see rollups.py); '' stands in for
+    NULL so the grouping columns can form the primary key.
+    """
+    __tablename__ = 'student_rollups'
+    university_id = db.Column(db.String, primary_key=True)
+    team_id = db.Column(db.String, primary_key=True)
+    status = db.Column(db.String, primary_key=True)
+    expertise_area = db.Column(db.String, primary_key=True)
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+    terms_remaining_sum = db.Column(db.Integer, nullable=False, default=0)
+
+
+class TeamRollup(db.Model):
+    """Teams counted per (university, project, discipline); see StudentRollup"""
+    __tablename__ = 'team_rollups'
+    university_id = db.Column(db.String, primary_key=True)
+    project_id = db.Column(db.String, primary_key=True)
+    discipline = db.Column(db.String, primary_key=True)
+    team_count = db.Column(db.Integer, nullable=False, default=0)
+
+
 class RiskFactor(db.Model):
     """
     Configurable risk factors for energy loss calculation.
@@ -254,6 +387,8 @@ class RiskFactor(db.Model):
     updated_at = db.Column(db.String, default=lambda: datetime.now().isoformat(), onupdate=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
+    change_event = ('factor', 'id')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -293,6 +428,8 @@ class FactorValue(db.Model):
     created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
+    change_event = ('factor', 'factor_id')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -331,6 +468,8 @@ class FactorModel(db.Model):
     updated_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
+    change_event = ('model', 'id')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -368,6 +507,8 @@ class ModelFactor(db.Model):
     created_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
+    change_event = ('model', 'model_id')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -388,7 +529,7 @@ class InterfaceFactorValue(db.Model):
     __tablename__ = 'interface_factor_values'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    interface_id = db.Column(db.String, db.ForeignKey('interfaces.id'), nullable=False)
+    interface_id = db.Column(db.String, db.ForeignKey('interfaces.id'), nullable=False, index=True)
     factor_id = db.Column(db.Integer, db.ForeignKey('risk_factors.id'), nullable=False)
     factor_value_id = db.Column(db.Integer, db.ForeignKey('factor_values.id'), nullable=False)
 
@@ -396,6 +537,8 @@ class InterfaceFactorValue(db.Model):
     assigned_at = db.Column(db.String, default=lambda: datetime.now().isoformat())
     meta = db.Column(db.JSON, nullable=True)
 
+    change_event = ('interface', 'interface_id')
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -3,12 +3,18 @@ Energy Loss Calculation Engine for FRAMES
 Flexible, research-driven system for calculating knowledge transfer risk
 """
 
+from collections import defaultdict
 from typing import Dict, List, Optional, Tuple
-from database import db
+from backend.database import db
 from db_models import (
     InterfaceModel, RiskFactor, FactorValue, FactorModel,
     ModelFactor, InterfaceFactorValue
 )
+from factor_catalog import FactorCatalog, get_catalog
+
+
+class UnknownModelError(ValueError):
+    """Raised when a requested model_id does not exist"""
 
 
 class EnergyCalculationEngine:
@@ -29,7 +35,13 @@ class EnergyCalculationEngine:
         """
         self.model_id = model_id
         self.model = None
-        self.factors_cache = None
+        self.factors_cache: Optional[FactorCatalog] = None
+
+    def catalog(self) -> FactorCatalog:
+        """The risk factor catalog, read once per engine (see factor_catalog.py)"""
+        if self.factors_cache is None:
+            self.factors_cache = get_catalog(db.session)
+        return self.factors_cache
 
     def get_active_model(self) -> Optional[FactorModel]:
         """Get the currently active model, or create a default if none exists."""
@@ -129,10 +141,10 @@ class EnergyCalculationEngine:
             },
         ]
 
+        existing = self.catalog().by_name
         for factor_def in baseline_factors:
             # Check if factor already exists
-            existing = RiskFactor.query.filter_by(factor_name=factor_def['factor_name']).first()
-            if existing:
+            if factor_def['factor_name'] in existing:
                 continue
 
             # Create the factor
@@ -159,6 +171,8 @@ class EnergyCalculationEngine:
                 )
                 db.session.add(factor_value)
 
+        self.factors_cache = None
+
     def calculate_interface_energy_loss(
         self,
         interface_id: str,
@@ -186,30 +200,59 @@ class EnergyCalculationEngine:
             'risk_level': str ('low', 'moderate', 'high', 'critical')
         }
         """
-        # Get the model
-        model = self.get_active_model() if not model_id else FactorModel.query.get(model_id)
+        model = self._resolve_model(model_id)
         if not model:
             raise ValueError("No model available for energy calculation")
 
         # Get interface factor values
-        interface_factors = db.session.query(
+        interface_factors = self._interface_factors_query().filter(
+            InterfaceFactorValue.interface_id == interface_id
+        ).all()
+
+        return self._score_interface(interface_id, model, interface_factors, self._model_weights(model))
+
+    def _resolve_model(self, model_id: Optional[int]) -> Optional[FactorModel]:
+        if not model_id:
+            return self.get_active_model()
+        model = FactorModel.query.get(model_id)
+        if model is None:
+            raise UnknownModelError(f"Model {model_id} not found")
+        return model
+
+    @staticmethod
+    def _interface_factors_query():
+        return db.session.query(
             InterfaceFactorValue, RiskFactor, FactorValue
         ).join(
             RiskFactor, InterfaceFactorValue.factor_id == RiskFactor.id
         ).join(
             FactorValue, InterfaceFactorValue.factor_value_id == FactorValue.id
-        ).filter(
-            InterfaceFactorValue.interface_id == interface_id
-        ).all()
+        )
 
-        # Get model weights for factors
-        model_factors = db.session.query(ModelFactor).filter_by(
-            model_id=model.id,
-            enabled=True
+    @staticmethod
+    def _model_weights(model: FactorModel) -> Dict[int, float]:
+        """Weights of the model's enabled factors"""
+        return EnergyCalculationEngine._weights_by_model([model.id])[model.id]
+
+    @staticmethod
+    def _weights_by_model(model_ids: List[int]) -> Dict[int, Dict[int, float]]:
+        """Weights of each model's enabled factors, in one query"""
+        weights = {model_id: {} for model_id in model_ids}
+        model_factors = db.session.query(ModelFactor).filter(
+            ModelFactor.model_id.in_(list(weights)),
+            ModelFactor.enabled == True
         ).all()
+        for mf in model_factors:
+            weights[mf.model_id][mf.factor_id] = mf.weight
+        return weights
 
-        weights_map = {mf.factor_id: mf.weight for mf in model_factors}
-
+    @staticmethod
+    def _score_interface(
+        interface_id: str,
+        model: FactorModel,
+        interface_factors: List[Tuple],
+        weights_map: Dict[int, float]
+    ) -> Dict:
         # Calculate weighted energy loss
         total_loss = 0.0
         factors_applied = []
@@ -266,9 +309,27 @@ class EnergyCalculationEngine:
         Calculate energy loss for all interfaces in a network (or specific university).
 
         Returns aggregated statistics and per-interface results.
+        Raises UnknownModelError if model_id does not exist.
+        """
+        return self.compare_network_energy([model_id], university_id)[0]
+
+    def compare_network_energy(
+        self,
+        model_ids: List[Optional[int]],
+        university_id: Optional[str] = None
+    ) -> List[Dict]:
         """
+        calculate_network_energy() for each model over the same interfaces.
+
+        Models, weights and factor assignments are each loaded in one query
+        for all models and interfaces, so the cost does not grow with either.
+        """
+        # Models are resolved first: creating a baseline model commits,
+        # which would expire loaded rows.
+        models = self._resolve_models(model_ids)
+
         # Query interfaces
-        query = InterfaceModel.query
+        query = db.session.query(InterfaceModel.id)
         if university_id:
             query = query.filter(
                 (InterfaceModel.from_university == university_id) |
@@ -277,18 +338,56 @@ class EnergyCalculationEngine:
 
         interfaces = query.all()
 
+        factors_by_interface = defaultdict(list)
+        weights_by_model = {}
+        if interfaces:
+            weights_by_model = self._weights_by_model([model.id for model in models])
+            for row in self._interface_factors_query().filter(
+                InterfaceFactorValue.interface_id.in_(query.scalar_subquery())
+            ).order_by(InterfaceFactorValue.id):
+                factors_by_interface[row[0].interface_id].append(row)
+
+        return [
+            self._network_result(
+                university_id, model, interfaces, factors_by_interface, weights_by_model.get(model.id, {})
+            )
+            for model in models
+        ]
+
+    def _resolve_models(self, model_ids: List[Optional[int]]) -> List[FactorModel]:
+        """Models for the given ids in order; a falsy id means the active model"""
+        if not all(model_ids):
+            active = self.get_active_model()
+        ids = [int(model_id) for model_id in model_ids if model_id]
+        found = {model.id: model for model in FactorModel.query.filter(FactorModel.id.in_(ids))} if ids else {}
+        models = []
+        for model_id in model_ids:
+            if not model_id:
+                models.append(active)
+                continue
+            model = found.get(int(model_id))
+            if model is None:
+                raise UnknownModelError(f"Model {model_id} not found")
+            models.append(model)
+        return models
+
+    def _network_result(
+        self,
+        university_id: Optional[str],
+        model: FactorModel,
+        interfaces: List,
+        factors_by_interface: Dict[str, List[Tuple]],
+        weights_map: Dict[int, float]
+    ) -> Dict:
         results = []
         total_loss = 0.0
 
         for interface in interfaces:
-            try:
-                loss_calc = self.calculate_interface_energy_loss(interface.id, model_id)
-                results.append(loss_calc)
-                total_loss += loss_calc['total_energy_loss']
-            except Exception as e:
-                # Skip interfaces without factor assignments
-                print(f"Warning: Could not calculate energy for interface {interface.id}: {e}")
-                continue
+            loss_calc = self._score_interface(
+                interface.id, model, factors_by_interface[interface.id], weights_map
+            )
+            results.append(loss_calc)
+            total_loss += loss_calc['total_energy_loss']
 
         avg_loss = total_loss / len(results) if results else 0.0
 
@@ -320,15 +419,18 @@ class EnergyCalculationEngine:
             ...
         ]
         """
+        # Reject the whole set before touching the existing assignments
+        pairs = self.catalog().validate_assignments(factor_assignments)
+
         # Clear existing assignments for this interface
         InterfaceFactorValue.query.filter_by(interface_id=interface_id).delete()
 
         # Add new assignments
-        for assignment in factor_assignments:
+        for factor_id, factor_value_id in pairs:
             ifv = InterfaceFactorValue(
                 interface_id=interface_id,
-                factor_id=assignment['factor_id'],
-                factor_value_id=assignment['factor_value_id']
+                factor_id=factor_id,
+                factor_value_id=factor_value_id
             )
             db.session.add(ifv)
 
@@ -355,59 +457,32 @@ class EnergyCalculationEngine:
 
         assignments = []
 
-        # Get factors
-        knowledge_type_factor = RiskFactor.query.filter_by(factor_name='knowledge_type').first()
-        bond_strength_factor = RiskFactor.query.filter_by(factor_name='bond_strength').first()
-        temporal_factor = RiskFactor.query.filter_by(factor_name='temporal_alignment').first()
-
-        if not knowledge_type_factor or not bond_strength_factor:
+        catalog = self.catalog()
+        if 'knowledge_type' not in catalog.by_name or 'bond_strength' not in catalog.by_name:
             return False
 
+        def assign(factor_name: str, value_name: str):
+            value = catalog.value(factor_name, value_name)
+            if value and catalog.by_name[factor_name]['active']:
+                assignments.append({'factor_id': value['factor_id'], 'factor_value_id': value['id']})
+
         # Map knowledge type
         if 'codified' in bond_type:
-            kt_value = FactorValue.query.filter_by(
-                factor_id=knowledge_type_factor.id,
-                value_name='codified'
-            ).first()
-            if kt_value:
-                assignments.append({'factor_id': knowledge_type_factor.id, 'factor_value_id': kt_value.id})
+            assign('knowledge_type', 'codified')
         elif 'institutional' in bond_type or 'fragile' in bond_type:
-            kt_value = FactorValue.query.filter_by(
-                factor_id=knowledge_type_factor.id,
-                value_name='institutional'
-            ).first()
-            if kt_value:
-                assignments.append({'factor_id': knowledge_type_factor.id, 'factor_value_id': kt_value.id})
+            assign('knowledge_type', 'institutional')
 
         # Map bond strength
         if 'strong' in bond_type:
-            bs_value = FactorValue.query.filter_by(
-                factor_id=bond_strength_factor.id,
-                value_name='strong'
-            ).first()
+            assign('bond_strength', 'strong')
         elif 'moderate' in bond_type:
-            bs_value = FactorValue.query.filter_by(
-                factor_id=bond_strength_factor.id,
-                value_name='moderate'
-            ).first()
+            assign('bond_strength', 'moderate')
         else:  # weak, fragile, etc.
-            bs_value = FactorValue.query.filter_by(
-                factor_id=bond_strength_factor.id,
-                value_name='weak'
-            ).first()
-
-        if bs_value:
-            assignments.append({'factor_id': bond_strength_factor.id, 'factor_value_id': bs_value.id})
+            assign('bond_strength', 'weak')
 
         # Fragile bonds also have temporal misalignment
         if 'fragile' in bond_type or 'temporary' in bond_type:
-            if temporal_factor:
-                temp_value = FactorValue.query.filter_by(
-                    factor_id=temporal_factor.id,
-                    value_name='misaligned'
-                ).first()
-                if temp_value:
-                    assignments.append({'factor_id': temporal_factor.id, 'factor_value_id': temp_value.id})
+            assign('temporal_alignment', 'misaligned')
 
         # Assign the factors
         return self.assign_factor_values_to_interface(interface_id, assignments)
@@ -0,0 +1,345 @@
+"""
+Change feed for FRAMES live dashboards
+Writes to models that declare `change_event` are collected at flush time
+and published after commit as compact notifications (type, op, id,
+universities, version) on /api/events (Server-Sent Events). Rolled-back
+writes are never published.
+
+All subscribers of a process read one shared ring buffer; each event is
+encoded once, so fan-out cost does not grow with payload size. Writes
+made by other worker processes are picked up by polling `table_versions`
+while anyone is subscribed, and published without an entity id.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+
+from db_models import TableVersion
+from versioning import ALL
+
+
+DEFAULT_BUFFER = int(os.environ.get('FRAMES_EVENTS_BUFFER', 1000))
+HEARTBEAT_SECONDS = float(os.environ.get('FRAMES_EVENTS_HEARTBEAT_SECONDS', 15))
+POLL_SECONDS = float(os.environ.get('FRAMES_EVENTS_POLL_SECONDS', 2))
+
+# Above this many changes in one commit, publish one event per (type, university)
+MAX_EVENTS_PER_COMMIT = 200
+
+_PENDING = 'change_events'
+
+_WATCHED: Dict[str, str] = {}  # table name -> entity type, filled on first poll
+
+
+class ChangeFeed:
+    """
+    In-process broadcast buffer. Event ids are '<boot>-<seq>' so a client
+    reconnecting with a Last-Event-ID from another process or an older
+    boot is told to `reset` (refetch) instead of silently missing events.
+    """
+
+    def __init__(self, size: int = DEFAULT_BUFFER):
+        self.boot = format(int(time.time() * 1000), 'x')
+        self._events = deque(maxlen=size)  # (seq, event, encoded)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._subscribers = 0
+        self._known: Dict[Tuple[str, str], int] = {}  # table versions already published
+        self._polled = False
+        self._poller = None
+        self.app = None
+
+    @property
+    def subscribers(self) -> int:
+        return self._subscribers
+
+    def publish(self, events: Iterable[Dict]):
+        with self._cond:
+            for payload in events:
+                self._seq += 1
+                payload = dict(payload, seq=self._seq)
+                encoded = f'id: {self.boot}-{self._seq}\nevent: change\ndata: {json.dumps(payload, default=str)}\n\n'
+                self._events.append((self._seq, payload, encoded))
+            self._cond.notify_all()
+
+    def note_versions(self, versions: Dict[Tuple[str, str], int]):
+        """Record versions published locally so the poller does not repeat them"""
+        with self._cond:
+            for key, version in versions.items():
+                if version > self._known.get(key, 0):
+                    self._known[key] = version
+
+    def _after(self, seq: int) -> List[Tuple[int, Dict, str]]:
+        # Walk back from the newest event: subscribers are usually only a few behind
+        batch = []
+        for item in reversed(self._events):
+            if item[0] <= seq:
+                break
+            batch.append(item)
+        batch.reverse()
+        return batch
+
+    def _cursor(self, last_event_id: Optional[str]) -> Tuple[int, bool]:
+        """(seq to resume after, whether the client must refetch everything)"""
+        if not last_event_id:
+            return self._seq, False
+        boot, _, seq = last_event_id.partition('-')
+        if boot != self.boot or not seq.isdigit() or int(seq) > self._seq:
+            return self._seq, True
+        seq = int(seq)
+        first = self._events[0][0] if self._events else self._seq + 1
+        return seq, seq + 1 < first  # events after `seq` already evicted
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def stream(self, last_event_id: Optional[str] = None, types: Optional[Set[str]] = None,
+               university: Optional[str] = None, heartbeat: float = HEARTBEAT_SECONDS) -> Iterator[str]:
+        """SSE text for one subscriber; runs until the client disconnects"""
+        with self._cond:
+            cursor, reset = self._cursor(last_event_id)
+            self._subscribers += 1
+        self._ensure_poller()
+        try:
+            yield 'retry: 3000\n\n'
+            if reset:
+                yield f'id: {self.boot}-{cursor}\nevent: reset\ndata: {{}}\n\n'
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq > cursor, timeout=heartbeat)
+                    batch = self._after(cursor)
+                if not batch:
+                    yield ': heartbeat\n\n'
+                    continue
+                if batch[0][0] > cursor + 1:
+                    # Fell behind the ring buffer: events were lost, refetch
+                    yield f'id: {self.boot}-{batch[0][0] - 1}\nevent: reset\ndata: {{}}\n\n'
+                cursor = batch[-1][0]
+                chunk = ''.join(
+                    encoded for _, payload, encoded in batch
+                    if (types is None or payload['type'] in types)
+                    and (university is None or not payload['universities'] or university in payload['universities'])
+                )
+                if chunk:
+                    yield chunk
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    # ------------------------------------------------------------------
+    # Cross-process changes
+    # ------------------------------------------------------------------
+
+    def _ensure_poller(self):
+        if self.app is None or POLL_SECONDS <= 0:
+            return
+        with self._cond:
+            if self._poller is not None and self._poller.is_alive():
+                return
+            self._poller = threading.Thread(target=self._poll, name='frames-events-poller', daemon=True)
+            self._poller.start()
+
+    def _poll(self):
+        from backend.database import db
+
+        tables = sorted(_watched_tables())
+        while True:
+            # Decide to stop and clear the handle under one lock, so a
+            # subscriber arriving meanwhile either keeps this thread polling
+            # or finds no poller and starts a new one
+            with self._cond:
+                if not self._subscribers:
+                    self._poller = None
+                    self._polled = False  # changes made while nobody listened are not replayed
+                    return
+            try:
+                with self.app.app_context():
+                    rows = db.session.execute(
+                        TableVersion.__table__.select().where(TableVersion.table_name.in_(tables))
+                    ).all()
+                self._publish_remote({(row.table_name, row.scope): row.version for row in rows})
+            except Exception as e:
+                print(f"Change feed poll failed: {e}")
+            time.sleep(POLL_SECONDS)
+
+    def _publish_remote(self, versions: Dict[Tuple[str, str], int]):
+        with self._cond:
+            if not self._polled:
+                # First poll: everything up to now is history
+                self._polled = True
+                self._known.update(versions)
+                return
+            changed = {key: v for key, v in versions.items() if v > self._known.get(key, 0)}
+            self._known.update(changed)
+        events = []
+        for (table_name, scope), version in sorted(changed.items()):
+            scoped = any(t == table_name and s != ALL for t, s in changed)
+            if scope == ALL and scoped:
+                continue  # already reported per university
+            events.append({
+                'type': _WATCHED[table_name], 'op': 'changed', 'id': None,
+                'universities': [] if scope == ALL else [scope],
+                'version': versions.get((table_name, ALL), version),
+            })
+        if events:
+            self.publish(events)
+
+
+feed = ChangeFeed()
+
+
+def _watched_tables() -> Set[str]:
+    if not _WATCHED:
+        from backend.database import db
+        for mapper in db.Model.registry.mappers:
+            spec = getattr(mapper.class_, 'change_event', None)
+            if spec:
+                _WATCHED[mapper.local_table.name] = spec[0]
+    return set(_WATCHED)
+
+
+# ----------------------------------------------------------------------
+# Session hooks
+# ----------------------------------------------------------------------
+
+def _universities(model, values) -> List[str]:
+    seen = []
+    for attr in getattr(model, 'version_scopes', ()):
+        value = values(attr)
+        if value is not None and str(value) not in seen:
+            seen.append(str(value))
+    return seen
+
+
+def _pending(session) -> List[Dict]:
+    return session.info.setdefault(_PENDING, [])
+
+
+def _after_flush(session, flush_context):
+    if not feed.subscribers:
+        return
+    pending = None
+    for op, objects in (('created', session.new), ('updated', session.dirty), ('deleted', session.deleted)):
+        for obj in objects:
+            spec = getattr(type(obj), 'change_event', None)
+            if spec is None or (op == 'updated' and not session.is_modified(obj)):
+                continue
+            if pending is None:
+                pending = _pending(session)
+            entity_type, id_attr = spec
+            pending.append({
+                'type': entity_type,
+                'op': op if id_attr == 'id' else 'updated',  # a child row changed its parent
+                'id': getattr(obj, id_attr),
+                'universities': _universities(type(obj), lambda attr: getattr(obj, attr)),
+                'table': obj.__tablename__,
+            })
+
+
+def _on_orm_execute(orm_execute_state):
+    """Bulk inserts/updates by primary key report their rows; set-based statements the table"""
+    state = orm_execute_state
+    if not feed.subscribers or not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    spec = getattr(mapper.class_, 'change_event', None) if mapper is not None else None
+    if spec is None:
+        return
+    entity_type, id_attr = spec
+    table_name = mapper.local_table.name
+    if id_attr != 'id':
+        op = 'updated'
+    else:
+        op = 'created' if state.is_insert else 'deleted' if state.is_delete else 'updated'
+    rows = state.parameters
+    if isinstance(rows, dict):
+        rows = [rows] if rows else []
+    pending = _pending(state.session)
+    if rows and all(row.get(id_attr) is not None for row in rows):
+        for row in rows:
+            pending.append({
+                'type': entity_type, 'op': op, 'id': row[id_attr],
+                'universities': _universities(mapper.class_, row.get), 'table': table_name,
+            })
+    else:
+        pending.append({'type': entity_type, 'op': op, 'id': None, 'universities': [], 'table': table_name})
+
+
+def _merge(events: List[Dict]) -> List[Dict]:
+    """One event per entity per commit (a factor and its values, repeated set-based updates)"""
+    merged = {}
+    for e in events:
+        key = (e['type'], e['id']) if e['id'] is not None else (e['type'], None, tuple(e['universities']))
+        first = merged.setdefault(key, e)
+        if first is e:
+            continue
+        if e['op'] == 'deleted':
+            first['op'] = 'deleted'
+        first['universities'] += [u for u in e['universities'] if u not in first['universities']]
+    return list(merged.values())
+
+
+def _collapse(events: List[Dict]) -> List[Dict]:
+    """One id-less event per (type, university) for very large commits"""
+    groups = {}
+    for e in events:
+        for university in e['universities'] or [None]:
+            groups.setdefault((e['type'], e['table'], university), None)
+    return [
+        {'type': t, 'op': 'changed', 'id': None, 'universities': [u] if u else [], 'table': table}
+        for t, table, u in sorted(groups, key=lambda k: (k[0], k[1], k[2] or ''))
+    ]
+
+
+def _after_commit(session):
+    events = session.info.pop(_PENDING, None)
+    if not events or not feed.subscribers:
+        return
+
+    # Versions this commit announces, so the poller does not repeat them;
+    # a table-wide event covers every university of its table
+    tables = {e['table'] for e in events}
+    table_wide = {e['table'] for e in events if e['id'] is None and not e['universities']}
+    announced = {(e['table'], u) for e in events for u in e['universities']}
+
+    events = _merge(events)
+    if len(events) > MAX_EVENTS_PER_COMMIT:
+        events = _collapse(events)
+
+    try:
+        with session.get_bind().connect() as conn:
+            rows = conn.execute(
+                TableVersion.__table__.select().where(TableVersion.table_name.in_(tables))
+            ).all()
+        versions = {(row.table_name, row.scope): row.version for row in rows}
+    except Exception as e:
+        print(f"Change feed version lookup failed: {e}")
+        versions = {}
+
+    feed.note_versions({
+        key: version for key, version in versions.items()
+        if key[1] == ALL or key[0] in table_wide or key in announced
+    })
+    feed.publish(
+        {key: value for key, value in e.items() if key != 'table'} | {'version': versions.get((e['table'], ALL))}
+        for e in events
+    )
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING, None)
+
+
+def install_event_hooks(db, app=None):
+    """Collect model changes on the app's session and publish them after commit (idempotent)"""
+    feed.app = app or feed.app
+    for name, fn in (('after_flush', _after_flush), ('do_orm_execute', _on_orm_execute),
+                     ('after_commit', _after_commit), ('after_rollback', _after_rollback)):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,121 @@
+"""
+Risk factor catalog for FRAMES
+Risk factors and their values change rarely but are read on every research
+dashboard load, by the energy engine and when validating factor
+assignments. The catalog is read with one joined query into plain dicts and
+kept in process, keyed by the `risk_factors`/`factor_values` table versions
+so a write from any worker replaces it; the factor endpoints also
+invalidate it after committing.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db_models import FactorValue, RiskFactor
+from versioning import compute_etag
+
+
+TABLES = ('risk_factors', 'factor_values')
+
+
+class FactorCatalogError(ValueError):
+    """Factor assignment naming an unknown or inactive factor, or another factor's value"""
+
+
+class FactorCatalog:
+    """
+    Every risk factor (active or not) as `to_dict()` plus its `values`,
+    ordered by sort_order. Treat the dicts as read-only: they are shared by
+    all requests until the catalog changes.
+    """
+
+    def __init__(self, factors: List[Dict], version: Optional[str] = None):
+        self.version = version
+        self.factors = factors
+        self.by_id = {factor['id']: factor for factor in factors}
+        self.by_name = {factor['factor_name']: factor for factor in factors}
+        self.values = {value['id']: value for factor in factors for value in factor['values']}
+        self._values_by_name = {
+            (factor['factor_name'], value['value_name']): value
+            for factor in factors for value in factor['values']
+        }
+
+    @classmethod
+    def load(cls, session, version: Optional[str] = None) -> 'FactorCatalog':
+        rows = (
+            session.query(RiskFactor, FactorValue)
+            .outerjoin(FactorValue, FactorValue.factor_id == RiskFactor.id)
+            .order_by(RiskFactor.id, FactorValue.sort_order, FactorValue.id)
+            .all()
+        )
+        factors = {}
+        for factor, value in rows:
+            entry = factors.get(factor.id)
+            if entry is None:
+                entry = factors[factor.id] = {**factor.to_dict(), 'values': []}
+            if value is not None:
+                entry['values'].append(value.to_dict())
+        return cls(list(factors.values()), version)
+
+    def active(self) -> List[Dict]:
+        return [factor for factor in self.factors if factor['active']]
+
+    def value(self, factor_name: str, value_name: str) -> Optional[Dict]:
+        """The value dict for a factor/value name pair, or None"""
+        return self._values_by_name.get((factor_name, value_name))
+
+    def validate_assignments(self, assignments: Iterable[Dict]) -> List[Tuple[int, int]]:
+        """
+        (factor_id, factor_value_id) pairs for an interface's assignments.
+        Each must name an active factor, at most once, and one of its values.
+        """
+        pairs, seen = [], set()
+        for assignment in assignments:
+            if not isinstance(assignment, dict):
+                raise FactorCatalogError('each factor assignment must be an object')
+            try:
+                factor_id = int(assignment['factor_id'])
+                value_id = int(assignment['factor_value_id'])
+            except KeyError as e:
+                raise FactorCatalogError(f'factor assignment is missing {e.args[0]}')
+            except (TypeError, ValueError):
+                raise FactorCatalogError('factor_id and factor_value_id must be integers')
+
+            factor = self.by_id.get(factor_id)
+            if factor is None or not factor['active']:
+                raise FactorCatalogError(f'unknown or inactive risk factor {factor_id}')
+            value = self.values.get(value_id)
+            if value is None or value['factor_id'] != factor_id:
+                raise FactorCatalogError(
+                    f"factor value {value_id} is not a value of {factor['factor_name']}"
+                )
+            if factor_id in seen:
+                raise FactorCatalogError(f"{factor['factor_name']} is assigned more than once")
+            seen.add(factor_id)
+            pairs.append((factor_id, value_id))
+        return pairs
+
+
+_current: Optional[FactorCatalog] = None
+_lock = threading.Lock()
+
+
+def get_catalog(session) -> FactorCatalog:
+    """The cached catalog, reloaded when either table has been written since"""
+    global _current
+    version = compute_etag(session, TABLES)
+    catalog = _current
+    if catalog is not None and catalog.version == version:
+        return catalog
+    with _lock:
+        # Another thread may have reloaded it while we waited
+        catalog = _current
+        if catalog is None or catalog.version != version:
+            catalog = _current = FactorCatalog.load(session, version)
+        return catalog
+
+
+def invalidate():
+    """Drop the cached catalog (after committing a factor change)"""
+    global _current
+    _current = None
@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets for FRAMES list endpoints
+`?fields=id,name` selects only the matching columns (no ORM objects, no
+decoding of unrequested JSON columns) and serializes rows with the same
+keys `to_dict()` would produce.
+"""
+
+from typing import Callable, List, Mapping, Optional, Tuple
+
+
+class FieldsetError(ValueError):
+    """Raised when `fields=` names a field the model does not expose"""
+
+
+def parse_fields(args: Mapping) -> Optional[List[str]]:
+    """Requested field names, or None when the full representation is wanted"""
+    raw = args.get('fields')
+    if not raw:
+        return None
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+    return fields or None
+
+
+def _field_sources(model):
+    """API field name -> column names needed to produce it"""
+    columns = [c.key for c in model.__table__.columns]
+    sources = {name: (name,) for name in columns}
+    for api_name, column in getattr(model, 'api_aliases', {}).items():
+        sources.pop(column, None)
+        sources[api_name] = (column,)
+    for api_name, (needed, _) in getattr(model, 'api_derived_fields', {}).items():
+        sources[api_name] = tuple(needed)
+    return sources
+
+
+def project_fields(query, model, fields: List[str]) -> Tuple[object, Callable]:
+    """
+    Restrict `query` to the columns behind `fields` (the primary key is
+    always included, for pagination) and return (query, serialize).
+    """
+    sources = _field_sources(model)
+    unknown = [f for f in fields if f not in sources]
+    if unknown:
+        raise FieldsetError(f"Unknown field(s): {', '.join(unknown)}")
+
+    if 'id' not in fields:
+        fields = ['id'] + fields
+
+    columns = []
+    for name in fields:
+        for column in sources[name]:
+            if column not in columns:
+                columns.append(column)
+
+    aliases = getattr(model, 'api_aliases', {})
+    derived = getattr(model, 'api_derived_fields', {})
+    getters = []
+    for name in fields:
+        if name in derived:
+            getters.append((name, derived[name][1]))
+        else:
+            column = aliases.get(name, name)
+            getters.append((name, lambda row, column=column: getattr(row, column)))
+
+    def serialize(row):
+        return {name: getter(row) for name, getter in getters}
+
+    projected = query.with_entities(*(getattr(model, column) for column in columns))
+    return projected, serialize
@@ -0,0 +1,266 @@
+"""
+Columnar interface storage for FRAMES
+Keeps interface endpoints, bond types and energy loss in NumPy arrays so
+very large simulated networks can be analysed with array operations.
+
+NumPy is only required when a SystemState is created with columnar=True.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from models import Interface, _intern
+
+
+class _Vocabulary:
+    """Maps repeated string values to small integer codes"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[Optional[str]] = []
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(_intern(value))
+        return code
+
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        return self.codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ColumnarInterfaceStore:
+    """
+    Drop-in replacement for the `SystemState.interfaces` list.
+
+    Rows are stored column-wise; `Interface` objects are only built when the
+    store is iterated or indexed, so analytics can work on the raw arrays.
+    """
+
+    is_columnar = True
+
+    def __init__(self, capacity: int = 1024):
+        if np is None:
+            raise RuntimeError('NumPy is required for the columnar interface store')
+
+        self.entities = _Vocabulary()
+        self.bond_types = _Vocabulary()
+        self.interface_types = _Vocabulary()
+        self.ids: List[str] = []
+        self.created_at: List[str] = []
+
+        capacity = max(capacity, 16)
+        self._from = np.empty(capacity, dtype=np.int32)
+        self._to = np.empty(capacity, dtype=np.int32)
+        self._interface_type = np.empty(capacity, dtype=np.int16)
+        self._bond_type = np.empty(capacity, dtype=np.int16)
+        # float64 so a missing energy_loss can be kept as NaN
+        self._energy_loss = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+    # ------------------------------------------------------------------
+    # Column views
+    # ------------------------------------------------------------------
+
+    @property
+    def from_codes(self):
+        return self._from[:self._size]
+
+    @property
+    def to_codes(self):
+        return self._to[:self._size]
+
+    @property
+    def interface_type_codes(self):
+        return self._interface_type[:self._size]
+
+    @property
+    def bond_type_codes(self):
+        return self._bond_type[:self._size]
+
+    @property
+    def energy_loss(self):
+        return self._energy_loss[:self._size]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _grow(self, needed: int):
+        capacity = len(self._from)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('_from', '_to', '_interface_type', '_bond_type', '_energy_loss'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def append_row(self, interface_id: str, from_entity: str, to_entity: str,
+                   interface_type: Optional[str], bond_type: Optional[str],
+                   energy_loss, created_at: Optional[str] = None):
+        """Append a single interface without building an `Interface` object"""
+        self._grow(self._size + 1)
+        i = self._size
+        self._from[i] = self.entities.encode(from_entity)
+        self._to[i] = self.entities.encode(to_entity)
+        self._interface_type[i] = self.interface_types.encode(interface_type)
+        self._bond_type[i] = self.bond_types.encode(bond_type)
+        self._energy_loss[i] = np.nan if energy_loss is None else energy_loss
+        self.ids.append(interface_id)
+        self.created_at.append(created_at or datetime.now().isoformat())
+        self._size += 1
+
+    def append(self, interface: Interface):
+        """List-compatible append of an `Interface` object"""
+        self.append_row(
+            interface.id, interface.from_entity, interface.to_entity,
+            interface.interface_type, interface.bond_type,
+            interface.energy_loss, interface.created_at
+        )
+
+    def extend_dicts(self, rows: Iterable[Dict]):
+        """Append interfaces from their `to_dict()`/JSON form"""
+        for data in rows:
+            self.append_row(
+                data['id'],
+                data.get('from', data.get('from_entity')),
+                data.get('to', data.get('to_entity')),
+                data.get('interfaceType', data.get('interface_type')),
+                data.get('bondType', data.get('bond_type')),
+                data.get('energyLoss', data.get('energy_loss')),
+                data.get('created_at')
+            )
+
+    def copy(self) -> 'ColumnarInterfaceStore':
+        """Independent copy of the columns (vocabularies are copied as well)"""
+        clone = ColumnarInterfaceStore(capacity=self._size)
+        for vocab in ('entities', 'bond_types', 'interface_types'):
+            source, target = getattr(self, vocab), getattr(clone, vocab)
+            target.codes = dict(source.codes)
+            target.values = list(source.values)
+        clone.ids = list(self.ids)
+        clone.created_at = list(self.created_at)
+        for name in ('_from', '_to', '_interface_type', '_bond_type', '_energy_loss'):
+            setattr(clone, name, getattr(self, name)[:max(self._size, 16)].copy())
+        clone._size = self._size
+        return clone
+
+    def _keep(self, keep):
+        """Compact the store down to the rows selected by a boolean mask"""
+        n = int(keep.sum())
+        if n == self._size:
+            return
+        for name in ('_from', '_to', '_interface_type', '_bond_type', '_energy_loss'):
+            column = getattr(self, name)
+            column[:n] = column[:self._size][keep]
+        kept = keep.tolist()
+        self.ids = [v for v, k in zip(self.ids, kept) if k]
+        self.created_at = [v for v, k in zip(self.created_at, kept) if k]
+        self._size = n
+
+    def remove_entity(self, entity_id: str):
+        """Remove every interface touching an entity"""
+        code = self.entities.lookup(entity_id)
+        if code is None:
+            return
+        self._keep((self.from_codes != code) & (self.to_codes != code))
+
+    def remove_id(self, interface_id: str):
+        """Remove interfaces by ID"""
+        keep = np.fromiter((i != interface_id for i in self.ids), dtype=bool, count=self._size)
+        self._keep(keep)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def energy_value(self, i: int):
+        """Energy loss of row `i` in its `Interface.energy_loss` form (None when missing)"""
+        value = float(self._energy_loss[i])
+        if np.isnan(value):
+            return None
+        return int(value) if value.is_integer() else value
+
+    def _row(self, i: int) -> Interface:
+        return Interface(
+            id=self.ids[i],
+            from_entity=self.entities.values[self._from[i]],
+            to_entity=self.entities.values[self._to[i]],
+            interface_type=self.interface_types.values[self._interface_type[i]],
+            bond_type=self.bond_types.values[self._bond_type[i]],
+            energy_loss=self.energy_value(i),
+            created_at=self.created_at[i]
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Interface]:
+        for i in range(self._size):
+            yield self._row(i)
+
+    def __getitem__(self, index: int) -> Interface:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('interface index out of range')
+        return self._row(index)
+
+    def to_dicts(self) -> List[Dict]:
+        """Serialize straight from the columns, matching `Interface.to_dict()`"""
+        entities = self.entities.values
+        interface_types = self.interface_types.values
+        bond_types = self.bond_types.values
+        return [
+            {
+                'id': self.ids[i],
+                'from': entities[self._from[i]],
+                'to': entities[self._to[i]],
+                'interfaceType': interface_types[self._interface_type[i]],
+                'bondType': bond_types[self._bond_type[i]],
+                'energyLoss': self.energy_value(i),
+                'created_at': self.created_at[i]
+            }
+            for i in range(self._size)
+        ]
+
+    # ------------------------------------------------------------------
+    # Vectorized helpers used by FramesAnalytics
+    # ------------------------------------------------------------------
+
+    def bond_type_mask(self, substring: str = None, equals: str = None):
+        """Boolean row mask for bond types containing `substring` or equal to `equals`"""
+        matching = [
+            code for code, value in enumerate(self.bond_types.values)
+            if value is not None and (
+                (substring is not None and substring in value) or
+                (equals is not None and value == equals)
+            )
+        ]
+        return np.isin(self.bond_type_codes, matching)
+
+    def entity_attribute_codes(self, attributes: Dict[str, str]):
+        """
+        Map entity codes to codes of a per-entity attribute (e.g. team discipline).
+        Returns (from_attr, to_attr) arrays with -1 where the entity has no attribute.
+        """
+        lookup = np.full(len(self.entities), -1, dtype=np.int32)
+        attr_codes: Dict[str, int] = {}
+        for entity_id, value in attributes.items():
+            code = self.entities.lookup(entity_id)
+            if code is not None:
+                lookup[code] = attr_codes.setdefault(value, len(attr_codes))
+        return lookup[self.from_codes], lookup[self.to_codes]
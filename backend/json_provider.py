@@ -0,0 +1,72 @@
+"""
+JSON provider for FRAMES
+Uses orjson when it is installed and falls back to Flask's standard-library
+provider otherwise. Output keeps Flask's conventions (sorted keys, dates as
+HTTP dates, compact unless debugging) so switching providers does not
+change payloads beyond whitespace and non-ASCII escaping.
+"""
+
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson encoding/decoding on the hot paths"""
+
+    def _orjson_options(self) -> int:
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            # Let Flask's default() format dates and dataclasses as it always has
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def _dump_bytes(self, obj) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options())
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Explicit formatting arguments (indent, separators, ...) need the stdlib
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dump_bytes(obj).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is None or pretty:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = self._dump_bytes(obj)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """
+    Install the JSON provider selected by FRAMES_JSON ('fast' by default,
+    'stdlib' to force the standard-library encoder).
+    """
+    if os.environ.get('FRAMES_JSON', 'fast').lower() == 'stdlib':
+        return app.json
+    app.json = FastJSONProvider(app)
+    return app.json
@@ -0,0 +1,205 @@
+"""
+Request and SQL metrics for FRAMES
+Per-route latency histograms, response status counts and per-request SQL
+statement counts/time, exposed at /api/_metrics as Prometheus text or a
+JSON summary. Metrics are per process; with several workers, scrape each.
+Set FRAMES_METRICS=0 to register no hooks at all.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RouteStats:
+    __slots__ = ('buckets', 'count', 'total', 'max', 'statuses', 'sql_count', 'sql_time')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.statuses: Dict[int, int] = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile (seconds) by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if seen + n >= rank and n:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+        self.started = time.time()
+
+    def observe(self, route: str, method: str, status: int, seconds: float,
+                sql_count: int, sql_time: float):
+        with self._lock:
+            stats = self.routes.get((route, method))
+            if stats is None:
+                stats = self.routes[(route, method)] = RouteStats()
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.sql_count += sql_count
+            stats.sql_time += sql_time
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+            self.started = time.time()
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, str], RouteStats]]:
+        with self._lock:
+            return sorted(self.routes.items())
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def prometheus(self) -> str:
+        lines = [
+            '# HELP frames_http_request_duration_seconds Request latency by route',
+            '# TYPE frames_http_request_duration_seconds histogram',
+        ]
+        routes = self._snapshot()
+        for (route, method), stats in routes:
+            labels = f'route="{_escape(route)}",method="{method}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + (float('inf'),), stats.buckets):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'frames_http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'frames_http_request_duration_seconds_sum{{{labels}}} {stats.total:.6f}')
+            lines.append(f'frames_http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+        lines += ['# HELP frames_http_responses_total Responses by route and status',
+                  '# TYPE frames_http_responses_total counter']
+        for (route, method), stats in routes:
+            for status, n in sorted(stats.statuses.items()):
+                lines.append(
+                    f'frames_http_responses_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {n}')
+
+        lines += ['# HELP frames_sql_queries_total SQL statements executed while serving a route',
+                  '# TYPE frames_sql_queries_total counter']
+        for (route, method), stats in routes:
+            lines.append(f'frames_sql_queries_total{{route="{_escape(route)}",method="{method}"}} {stats.sql_count}')
+
+        lines += ['# HELP frames_sql_duration_seconds_total Time spent in SQL statements while serving a route',
+                  '# TYPE frames_sql_duration_seconds_total counter']
+        for (route, method), stats in routes:
+            lines.append(
+                f'frames_sql_duration_seconds_total{{route="{_escape(route)}",method="{method}"}} {stats.sql_time:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict:
+        routes = []
+        for (route, method), stats in self._snapshot():
+            n = stats.count or 1
+            routes.append({
+                'route': route,
+                'method': method,
+                'count': stats.count,
+                'avg_ms': round(stats.total / n * 1000, 3),
+                'p50_ms': round(stats.quantile(0.50) * 1000, 3),
+                'p95_ms': round(stats.quantile(0.95) * 1000, 3),
+                'p99_ms': round(stats.quantile(0.99) * 1000, 3),
+                'max_ms': round(stats.max * 1000, 3),
+                'statuses': {str(k): v for k, v in sorted(stats.statuses.items())},
+                'sql_per_request': round(stats.sql_count / n, 2),
+                'sql_ms_per_request': round(stats.sql_time / n * 1000, 3),
+            })
+        return {'since': self.started, 'pid': os.getpid(), 'routes': routes}
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+# ----------------------------------------------------------------------
+# Hooks
+# ----------------------------------------------------------------------
+
+metrics = Metrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metrics_start' in g:
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts or not has_request_context() or 'metrics_start' not in g:
+        return
+    g.metrics_sql_time += time.perf_counter() - starts.pop()
+    g.metrics_sql_count += 1
+
+
+def _handle_error(exception_context):
+    # A failed statement gets no after_cursor_execute: drop its start time,
+    # or the next statement on this connection would pop the wrong one
+    conn = exception_context.connection
+    starts = conn.info.get('metrics_query_start') if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def init_metrics(app):
+    """Register request/SQL hooks and the /api/_metrics endpoint"""
+    enabled = os.environ.get('FRAMES_METRICS', '1') != '0'
+    app.config.setdefault('METRICS_ENABLED', enabled)
+    if not app.config['METRICS_ENABLED']:
+        return None
+
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_sql_count = 0
+        g.metrics_sql_time = 0.0
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            metrics.observe(route, request.method, response.status_code,
+                            time.perf_counter() - start, g.metrics_sql_count, g.metrics_sql_time)
+        return response
+
+    @app.route('/api/_metrics', methods=['GET'])
+    def get_metrics():
+        """Prometheus text exposition, or a JSON summary with ?format=json"""
+        if request.args.get('format') == 'json':
+            return jsonify(metrics.summary())
+        return app.response_class(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
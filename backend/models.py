@@ -7,9 +7,15 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from datetime import datetime
 import json
+import sys
 
 
-@dataclass
+def _intern(value):
+    """Intern categorical strings so large states share one copy per distinct value"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
 class Team:
     """Represents a team/micro-module in the system"""
     id: str
@@ -21,6 +27,10 @@ class Team:
     description: str
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    def __post_init__(self):
+        self.discipline = _intern(self.discipline)
+        self.lifecycle = _intern(self.lifecycle)
+
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -40,7 +50,7 @@ class Team:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class Faculty:
     """Represents faculty/staff members in the system"""
     id: str
@@ -49,6 +59,9 @@ class Faculty:
     description: str
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    def __post_init__(self):
+        self.role = _intern(self.role)
+
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -65,7 +78,7 @@ class Faculty:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class Project:
     """Represents a project in the system"""
     id: str
@@ -75,6 +88,9 @@ class Project:
     description: str
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    def __post_init__(self):
+        self.type = _intern(self.type)
+
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -92,7 +108,7 @@ class Project:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class Interface:
     """Represents an interface/bond between entities"""
     id: str
@@ -103,6 +119,13 @@ class Interface:
     energy_loss: int  # percentage 5, 15, 35, 60
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    def __post_init__(self):
+        # Entity IDs repeat across many interfaces, so they are interned as well
+        self.from_entity = _intern(self.from_entity)
+        self.to_entity = _intern(self.to_entity)
+        self.interface_type = _intern(self.interface_type)
+        self.bond_type = _intern(self.bond_type)
+
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -132,55 +155,125 @@ class Interface:
 class SystemState:
     """Manages the complete state of the FRAMES system"""
 
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        self.columnar = columnar
         self.teams: List[Team] = []
         self.faculty: List[Faculty] = []
         self.projects: List[Project] = []
-        self.interfaces: List[Interface] = []
+        self.interfaces = self._new_interface_store()
+        # Sequence number of the last applied mutation; persisted with snapshots
+        self.version = 0
+        # Set by JournaledStateStore so every mutation is appended to its journal
+        self.journal = None
+
+    def _new_interface_store(self):
+        """Plain list by default; NumPy-backed columnar store for very large networks"""
+        if self.columnar:
+            from interface_store import ColumnarInterfaceStore
+            return ColumnarInterfaceStore()
+        return []
+
+    def _remove_entity_interfaces(self, entity_id: str):
+        """Drop every interface that touches an entity"""
+        if self.columnar:
+            self.interfaces.remove_entity(entity_id)
+        else:
+            self.interfaces = [i for i in self.interfaces if i.from_entity != entity_id and i.to_entity != entity_id]
+
+    def _record(self, op: str, data):
+        """Append a mutation to the journal, if one is attached"""
+        if self.journal is not None:
+            self.journal.record(self, op, data)
 
     def add_team(self, team: Team) -> Team:
         """Add a team to the system"""
         self.teams.append(team)
+        self._record('add_team', team.to_dict())
         return team
 
     def add_faculty(self, faculty_member: Faculty) -> Faculty:
         """Add a faculty member to the system"""
         self.faculty.append(faculty_member)
+        self._record('add_faculty', faculty_member.to_dict())
         return faculty_member
 
     def add_project(self, project: Project) -> Project:
         """Add a project to the system"""
         self.projects.append(project)
+        self._record('add_project', project.to_dict())
         return project
 
     def add_interface(self, interface: Interface) -> Interface:
         """Add an interface to the system"""
         self.interfaces.append(interface)
+        self._record('add_interface', interface.to_dict())
         return interface
 
     def remove_team(self, team_id: str) -> bool:
         """Remove a team and its associated interfaces"""
         self.teams = [t for t in self.teams if t.id != team_id]
-        self.interfaces = [i for i in self.interfaces if i.from_entity != team_id and i.to_entity != team_id]
+        self._remove_entity_interfaces(team_id)
+        self._record('remove_team', team_id)
         return True
 
     def remove_faculty(self, faculty_id: str) -> bool:
         """Remove a faculty member and associated interfaces"""
         self.faculty = [f for f in self.faculty if f.id != faculty_id]
-        self.interfaces = [i for i in self.interfaces if i.from_entity != faculty_id and i.to_entity != faculty_id]
+        self._remove_entity_interfaces(faculty_id)
+        self._record('remove_faculty', faculty_id)
         return True
 
     def remove_project(self, project_id: str) -> bool:
         """Remove a project and associated interfaces"""
         self.projects = [p for p in self.projects if p.id != project_id]
-        self.interfaces = [i for i in self.interfaces if i.from_entity != project_id and i.to_entity != project_id]
+        self._remove_entity_interfaces(project_id)
+        self._record('remove_project', project_id)
         return True
 
     def remove_interface(self, interface_id: str) -> bool:
         """Remove an interface"""
-        self.interfaces = [i for i in self.interfaces if i.id != interface_id]
+        if self.columnar:
+            self.interfaces.remove_id(interface_id)
+        else:
+            self.interfaces = [i for i in self.interfaces if i.id != interface_id]
+        self._record('remove_interface', interface_id)
         return True
 
+    def apply_record(self, op: str, data):
+        """Re-apply a journaled mutation without journaling it again"""
+        journal, self.journal = self.journal, None
+        try:
+            if op == 'add_team':
+                self.add_team(Team.from_dict(data))
+            elif op == 'add_faculty':
+                self.add_faculty(Faculty.from_dict(data))
+            elif op == 'add_project':
+                self.add_project(Project.from_dict(data))
+            elif op == 'add_interface':
+                self.add_interface(Interface.from_dict(data))
+            elif op == 'remove_team':
+                self.remove_team(data)
+            elif op == 'remove_faculty':
+                self.remove_faculty(data)
+            elif op == 'remove_project':
+                self.remove_project(data)
+            elif op == 'remove_interface':
+                self.remove_interface(data)
+            else:
+                raise ValueError(f"Unknown journal operation: {op}")
+        finally:
+            self.journal = journal
+
+    def copy(self) -> 'SystemState':
+        """Copy the containers (entities are shared) so a snapshot can be written off-thread"""
+        clone = SystemState(columnar=self.columnar)
+        clone.teams = list(self.teams)
+        clone.faculty = list(self.faculty)
+        clone.projects = list(self.projects)
+        clone.interfaces = self.interfaces.copy()
+        clone.version = self.version
+        return clone
+
     def get_team(self, team_id: str) -> Optional[Team]:
         """Get a team by ID"""
         return next((t for t in self.teams if t.id == team_id), None)
@@ -199,7 +292,7 @@ class SystemState:
             'teams': [t.to_dict() for t in self.teams],
             'faculty': [f.to_dict() for f in self.faculty],
             'projects': [p.to_dict() for p in self.projects],
-            'interfaces': [i.to_dict() for i in self.interfaces]
+            'interfaces': self.interfaces.to_dicts() if self.columnar else [i.to_dict() for i in self.interfaces]
         }
 
     def from_dict(self, data: Dict):
@@ -207,7 +300,11 @@ class SystemState:
         self.teams = [Team.from_dict(t) for t in data.get('teams', [])]
         self.faculty = [Faculty.from_dict(f) for f in data.get('faculty', [])]
         self.projects = [Project.from_dict(p) for p in data.get('projects', [])]
-        self.interfaces = [Interface.from_dict(i) for i in data.get('interfaces', [])]
+        if self.columnar:
+            self.interfaces = self._new_interface_store()
+            self.interfaces.extend_dicts(data.get('interfaces', []))
+        else:
+            self.interfaces = [Interface.from_dict(i) for i in data.get('interfaces', [])]
 
     def save_to_file(self, filename: str):
         """Save system state to JSON file"""
@@ -215,7 +312,21 @@ class SystemState:
             json.dump(self.to_dict(), f, indent=2)
 
     def load_from_file(self, filename: str):
-        """Load system state from JSON file"""
+        """Load system state from a JSON file or a binary snapshot"""
+        from state_store import is_snapshot
+        if is_snapshot(filename):
+            self.load_snapshot(filename)
+            return
         with open(filename, 'r') as f:
             data = json.load(f)
             self.from_dict(data)
+
+    def save_snapshot(self, filename: str, meta: Optional[Dict] = None):
+        """Save system state to a compact binary snapshot (atomic write-then-rename)"""
+        from state_store import save_snapshot
+        save_snapshot(self, filename, meta)
+
+    def load_snapshot(self, filename: str) -> Dict:
+        """Load system state from a binary snapshot, returning its metadata"""
+        from state_store import load_snapshot
+        return load_snapshot(self, filename)
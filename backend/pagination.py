@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination for FRAMES list endpoints
+Pages are selected with `WHERE key > :last_key ORDER BY key LIMIT n`, so
+fetching page N costs the same as fetching page 1.
+"""
+
+import base64
+import json
+from typing import Callable, Dict, Mapping, Optional
+
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class PaginationError(ValueError):
+    """Raised for malformed `limit`/`cursor` parameters"""
+
+
+def encode_cursor(value) -> str:
+    """Opaque cursor for the last key returned on a page"""
+    raw = json.dumps([value], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))[0]
+    except Exception:
+        raise PaginationError('Invalid cursor')
+
+
+def pagination_requested(args: Mapping) -> bool:
+    """List endpoints return a plain array unless `limit` or `cursor` is given"""
+    return 'limit' in args or 'cursor' in args
+
+
+def parse_limit(args: Mapping) -> int:
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be at least 1')
+    return min(limit, MAX_LIMIT)
+
+
+def paginate(query, key_column, args: Mapping, descending: bool = False,
+             serialize: Optional[Callable] = None) -> Dict:
+    """
+    Return one page of `query` ordered by `key_column` (normally the primary key).
+
+    Response shape:
+    {
+        "items": [...],
+        "next": "<cursor>" | null,
+        "limit": 100,
+        "total": 1234          # only when include_total=true
+    }
+    """
+    limit = parse_limit(args)
+    serialize = serialize or (lambda row: row.to_dict())
+    base_query = query
+
+    cursor = args.get('cursor')
+    if cursor:
+        last_key = decode_cursor(cursor)
+        query = query.filter(key_column < last_key if descending else key_column > last_key)
+
+    order = key_column.desc() if descending else key_column.asc()
+    rows = query.order_by(order).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    result = {
+        'items': [serialize(row) for row in rows],
+        'next': encode_cursor(getattr(rows[-1], key_column.key)) if has_more else None,
+        'limit': limit,
+    }
+
+    # Totals need a separate COUNT over the filtered set, so they are opt-in
+    if str(args.get('include_total', 'false')).lower() == 'true':
+        result['total'] = base_query.order_by(None).count()
+
+    return result
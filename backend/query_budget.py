@@ -0,0 +1,143 @@
+"""
+Query budgets and N+1 detection for FRAMES
+Every SQL statement executed while serving a request is fingerprinted
+(literals and placeholders stripped). A fingerprint repeated more than
+`repeats` times in one request, or a request running more than its
+route's declared `@query_budget(n)`, is logged with the route and the
+application stack that issued the repeated statement.
+
+Modes (FRAMES_QUERY_BUDGET): 'log' (default), 'strict' (violations raise
+QueryBudgetExceeded, the default while pytest is running) or 'off'.
+"""
+
+import os
+import re
+import traceback
+from functools import lru_cache, wraps
+from typing import Dict, List, Optional
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+DEFAULT_REPEATS = int(os.environ.get('FRAMES_QUERY_REPEATS', 5))
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM = re.compile(r'%\(\w+\)s|%s|:\w+|\$\d+|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode; an AssertionError so test runners report a failure"""
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize a SQL statement so repeats with different values compare equal"""
+    sql = _STRING.sub('?', statement)
+    sql = _PARAM.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def query_budget(total: Optional[int] = None, repeats: Optional[int] = None):
+    """
+    Declare a route's query budget next to its definition:
+
+        @app.route('/api/things')
+        @query_budget(3)
+        def get_things(): ...
+
+    `total` caps statements per request; `repeats` overrides how often one
+    fingerprint may run before it is reported as an N+1 pattern.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return view(*args, **kwargs)
+        wrapper.query_budget = {'total': total, 'repeats': repeats}
+        return wrapper
+    return decorator
+
+
+def _mode(app) -> str:
+    mode = app.config.get('QUERY_BUDGET') or os.environ.get('FRAMES_QUERY_BUDGET')
+    if mode:
+        return mode
+    return 'strict' if 'PYTEST_CURRENT_TEST' in os.environ else 'log'
+
+
+def _app_stack() -> List[str]:
+    """Application frames (this backend, minus this module) of the current stack"""
+    lines = []
+    for frame in traceback.extract_stack()[:-2]:
+        if frame.filename.startswith(_BACKEND_DIR) and frame.filename != __file__:
+            lines.append(f'{os.path.relpath(frame.filename, _BACKEND_DIR)}:{frame.lineno} in {frame.name}')
+    return lines
+
+
+def _budget() -> Dict:
+    view = current_app.view_functions.get(request.endpoint) if request.endpoint else None
+    return getattr(view, 'query_budget', None) or {}
+
+
+# ----------------------------------------------------------------------
+# Hooks
+# ----------------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context() or 'query_counts' not in g:
+        return
+    key = fingerprint(statement)
+    counts = g.query_counts
+    counts[key] = counts.get(key, 0) + 1
+    if counts[key] == g.query_repeats + 1:
+        # First statement over the limit: this stack is inside the loop
+        g.query_stacks[key] = _app_stack()
+
+
+def init_query_budget(app):
+    """Register the per-request detector on `app`"""
+    if _mode(app) == 'off':
+        return
+
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+
+    @app.before_request
+    def start_query_budget():
+        g.query_counts = {}
+        g.query_stacks = {}
+        g.query_repeats = _budget().get('repeats') or DEFAULT_REPEATS
+
+    @app.after_request
+    def check_query_budget(response):
+        counts = g.pop('query_counts', None)
+        if counts is None:
+            return response
+        stacks = g.pop('query_stacks', {})
+        budget = _budget()
+        route = request.url_rule.rule if request.url_rule is not None else request.path
+
+        problems = []
+        executed = sum(counts.values())
+        if budget.get('total') is not None and executed > budget['total']:
+            problems.append(f'{executed} statements, budget {budget["total"]}')
+        for key, stack in stacks.items():
+            problems.append(
+                f'{counts[key]}x (limit {g.query_repeats}): {key}\n    '
+                + '\n    '.join(stack or ['<no application frames>'])
+            )
+        if not problems:
+            return response
+
+        message = f'Query budget exceeded on {request.method} {route}:\n  ' + '\n  '.join(problems)
+        if _mode(current_app) == 'strict':
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+        return response
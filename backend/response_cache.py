@@ -0,0 +1,136 @@
+"""
+Response cache for expensive FRAMES read endpoints
+Serialized payloads are cached per (name, table versions), so any write to
+a table the payload depends on changes the key and the stale entry is never
+served again. Two tiers: an in-process LRU and an optional SQLite file
+shared by all workers on the host.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from sandbox_store import LRUCache
+
+
+DEFAULT_SIZE = int(os.environ.get('FRAMES_RESPONSE_CACHE_SIZE', 16))
+DEFAULT_DISK_PATH = os.environ.get('FRAMES_RESPONSE_CACHE_DB') or None
+
+
+class ResponseCache:
+    """
+    get_or_build() returns the cached bytes for a key or builds them once.
+    Concurrent misses on the same key wait for the first builder instead of
+    rebuilding (single flight).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_SIZE, disk_path: Optional[str] = DEFAULT_DISK_PATH):
+        self.memory = LRUCache(maxsize)
+        self.disk_path = disk_path
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._local = threading.local()
+        self._latest = {}  # name -> newest key, so superseded payloads are freed
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'disk_errors': 0}
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if not self.disk_path:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache ('
+                ' name TEXT NOT NULL, key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        try:
+            conn = self._disk()
+            if conn is None:
+                return None
+            row = conn.execute('SELECT value FROM response_cache WHERE key = ?', (key,)).fetchone()
+            return bytes(row[0]) if row else None
+        except sqlite3.Error:
+            self.stats['disk_errors'] += 1
+            return None
+
+    def _disk_put(self, name: str, key: str, value: bytes):
+        try:
+            conn = self._disk()
+            if conn is None:
+                return
+            with conn:
+                # Entries for older versions of the same payload are dead
+                conn.execute('DELETE FROM response_cache WHERE name = ? AND key != ?', (name, key))
+                conn.execute(
+                    'INSERT OR REPLACE INTO response_cache (name, key, value, created) VALUES (?, ?, ?, ?)',
+                    (name, key, sqlite3.Binary(value), time.time()),
+                )
+        except sqlite3.Error:
+            self.stats['disk_errors'] += 1
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def get_or_build(self, name: str, version: str, build: Callable[[], bytes]) -> bytes:
+        """Cached payload `name` at `version`, calling build() on a miss"""
+        key = f'{name}:{version}'
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats['hits'] += 1
+            return value
+
+        lock = self._lock_for(key)
+        with lock:
+            # Another thread may have built it while we waited
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats['hits'] += 1
+                return value
+
+            value = self._disk_get(key)
+            if value is not None:
+                self.stats['disk_hits'] += 1
+            else:
+                self.stats['misses'] += 1
+                value = build()
+                self._disk_put(name, key, value)
+            self.memory.put(key, value)
+            previous = self._latest.get(name)
+            if previous is not None and previous != key:
+                self.memory.discard(previous)
+            self._latest[name] = key
+
+        with self._locks_guard:
+            if self._locks.get(key) is lock and not lock.locked():
+                del self._locks[key]
+        return value
+
+    def clear(self):
+        self.memory.clear()
+        self._latest.clear()
+        try:
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    conn.execute('DELETE FROM response_cache')
+        except sqlite3.Error:
+            self.stats['disk_errors'] += 1
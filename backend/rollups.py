@@ -0,0 +1,267 @@
+"""
+Pre-aggregated rollups for FRAMES analytics
+`student_rollups` and `team_rollups` hold counts (and the sum of
+terms_remaining) per combination of grouping columns, so analytics read a
+few hundred rollup rows instead of scanning the rosters.
+
+Rollups are updated in the writing transaction:
+- ORM flushes and bulk writes by primary key re-aggregate the touched ids
+  before and after the write and apply the difference;
+- set-based statements (advance-term, Query.delete()) rebuild the affected
+  universities just before commit.
+`scripts/rebuild_rollups.py` rebuilds or checks them from scratch.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, event, func, insert, select, update
+
+from db_models import StudentModel, StudentRollup, TeamModel, TeamRollup
+
+
+_BEFORE = 'rollups_before'
+_STALE = 'rollups_stale'
+
+
+def _upsert(conn, table, keys: Tuple[str, ...], names: List[str]):
+    """INSERT that adds to the measures of an existing row instead (None if unsupported)"""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + stmt.excluded[name] for name in names},
+    )
+
+
+class Rollup:
+    """
+    Aggregates of `source` rows matching `where`, grouped by `keys` (column
+    names shared by the source and the rollup table). `measures` maps rollup
+    columns to aggregates over the source; the first one is the row count.
+    """
+
+    def __init__(self, model, source, keys: Tuple[str, ...], measures: Dict, where: Tuple = ()):
+        self.table = model.__table__
+        self.source = source.__table__
+        self.keys = keys
+        self.measures = measures
+        self.where = where
+
+    def _aggregate(self, *predicates):
+        keys = [func.coalesce(self.source.c[k], '') for k in self.keys]
+        return (
+            select(*(expr.label(k) for expr, k in zip(keys, self.keys)),
+                   *(agg.label(name) for name, agg in self.measures.items()))
+            .where(*self.where, *predicates)
+            .group_by(*keys)
+        )
+
+    def snapshot(self, conn, ids: Iterable) -> Dict[Tuple, Tuple]:
+        """{key: measures} over the source rows with the given ids"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        width = len(self.keys)
+        rows = conn.execute(self._aggregate(self.source.c.id.in_(ids))).all()
+        return {tuple(row[:width]): tuple(row[width:]) for row in rows}
+
+    def apply(self, conn, before: Dict[Tuple, Tuple], after: Dict[Tuple, Tuple]):
+        """Add `after - before` to the rollup rows; rows counting nothing are removed"""
+        names = list(self.measures)
+        zero = (0,) * len(names)
+        changes, decremented = [], []
+        # Sorted so concurrent writers take row locks in the same order
+        for key in sorted(set(before) | set(after)):
+            deltas = [(a or 0) - (b or 0) for a, b in zip(after.get(key, zero), before.get(key, zero))]
+            if not any(deltas):
+                continue
+            changes.append({**dict(zip(self.keys, key)), **dict(zip(names, deltas))})
+            if deltas[0] < 0:
+                decremented.append({f'k_{k}': v for k, v in zip(self.keys, key)})
+        if not changes:
+            return
+
+        upsert = _upsert(conn, self.table, self.keys, names)
+        if upsert is not None:
+            conn.execute(upsert, changes)
+        else:
+            for change in changes:
+                match = [self.table.c[k] == change[k] for k in self.keys]
+                bump = update(self.table).where(*match).values(
+                    {name: self.table.c[name] + change[name] for name in names}
+                )
+                if not conn.execute(bump).rowcount:
+                    conn.execute(insert(self.table).values(change))
+        if decremented:
+            conn.execute(
+                delete(self.table).where(
+                    *(self.table.c[k] == bindparam(f'k_{k}') for k in self.keys),
+                    self.table.c[names[0]] <= 0,
+                ),
+                decremented,
+            )
+
+    def rebuild(self, conn, universities: Optional[Iterable[str]] = None):
+        """Recompute the rollup (or only the given universities' rows) from the source"""
+        clear = delete(self.table)
+        predicates = []
+        if universities is not None:
+            universities = sorted({str(u) for u in universities if u is not None})
+            if not universities:
+                return
+            clear = clear.where(self.table.c.university_id.in_(universities))
+            predicates.append(self.source.c.university_id.in_(universities))
+        conn.execute(clear)
+        conn.execute(insert(self.table).from_select([*self.keys, *self.measures], self._aggregate(*predicates)))
+
+    def check(self, conn) -> List[Tuple[Tuple, Optional[Tuple], Optional[Tuple]]]:
+        """(key, stored, expected) for every rollup row that differs from the source"""
+        width = len(self.keys)
+        stored = {
+            tuple(row[:width]): tuple(row[width:])
+            for row in conn.execute(select(*(self.table.c[c] for c in (*self.keys, *self.measures)))).all()
+        }
+        expected = {tuple(row[:width]): tuple(row[width:]) for row in conn.execute(self._aggregate()).all()}
+        return [
+            (key, stored.get(key), expected.get(key))
+            for key in sorted(set(stored) | set(expected))
+            if stored.get(key) != expected.get(key)
+        ]
+
+    def is_empty(self, conn) -> bool:
+        return conn.execute(select(self.table.c[self.keys[0]]).limit(1)).first() is None
+
+    def source_is_empty(self, conn) -> bool:
+        return conn.execute(select(self.source.c.id).where(*self.where).limit(1)).first() is None
+
+
+STUDENT_ROLLUP = Rollup(
+    StudentRollup, StudentModel,
+    keys=('university_id', 'team_id', 'status', 'expertise_area'),
+    measures={
+        'student_count': func.count(),
+        'terms_remaining_sum': func.coalesce(func.sum(StudentModel.terms_remaining), 0),
+    },
+    where=(StudentModel.active == True,),
+)
+
+TEAM_ROLLUP = Rollup(
+    TeamRollup, TeamModel,
+    keys=('university_id', 'project_id', 'discipline'),
+    measures={'team_count': func.count()},
+)
+
+# Source table name -> rollup
+ROLLUPS = {rollup.source.name: rollup for rollup in (STUDENT_ROLLUP, TEAM_ROLLUP)}
+
+
+def rebuild_all(conn, universities: Optional[Iterable[str]] = None):
+    for rollup in ROLLUPS.values():
+        rollup.rebuild(conn, universities)
+
+
+def ensure_rollups(conn):
+    """Build rollups that are empty while their source is not (first start after upgrading)"""
+    for rollup in ROLLUPS.values():
+        if rollup.is_empty(conn) and not rollup.source_is_empty(conn):
+            print(f"Building {rollup.table.name}...")
+            rollup.rebuild(conn)
+
+
+# ----------------------------------------------------------------------
+# Session hooks
+# ----------------------------------------------------------------------
+
+def _ids_by_rollup(objects) -> Dict[Rollup, List]:
+    ids = {}
+    for obj in objects:
+        rollup = ROLLUPS.get(getattr(obj, '__tablename__', None))
+        if rollup is not None and obj.id is not None:
+            ids.setdefault(rollup, []).append(obj.id)
+    return ids
+
+
+def _before_flush(session, flush_context, instances):
+    touched = _ids_by_rollup(list(session.dirty) + list(session.deleted))
+    if not touched:
+        session.info.pop(_BEFORE, None)
+        return
+    conn = session.connection()
+    session.info[_BEFORE] = {rollup: rollup.snapshot(conn, ids) for rollup, ids in touched.items()}
+
+
+def _after_flush(session, flush_context):
+    before = session.info.pop(_BEFORE, None) or {}
+    touched = _ids_by_rollup(list(session.new) + list(session.dirty))
+    if not touched and not before:
+        return
+    conn = session.connection()
+    for rollup in set(touched) | set(before):
+        after = rollup.snapshot(conn, touched.get(rollup, ()))
+        rollup.apply(conn, before.get(rollup, {}), after)
+
+
+def _mark_stale(session, rollup: Rollup, universities: Optional[Iterable[str]]):
+    stale = session.info.setdefault(_STALE, {})
+    if universities is None or (rollup in stale and stale[rollup] is None):
+        stale[rollup] = None  # whole table
+    else:
+        stale.setdefault(rollup, set()).update(str(u) for u in universities)
+
+
+def _on_orm_execute(orm_execute_state):
+    """
+    Bulk writes by primary key are re-aggregated around the statement.
+    Set-based statements mark their universities (execution option
+    `rollup_universities`, default: all) for a rebuild before commit.
+    """
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    rollup = ROLLUPS.get(mapper.local_table.name) if mapper is not None else None
+    if rollup is None:
+        return
+
+    rows = state.parameters
+    if isinstance(rows, dict):
+        rows = [rows] if rows else []
+    if not rows or any(row.get('id') is None for row in rows):
+        _mark_stale(state.session, rollup, state.execution_options.get('rollup_universities'))
+        return
+
+    ids = [row['id'] for row in rows]
+    conn = state.session.connection()
+    before = {} if state.is_insert else rollup.snapshot(conn, ids)
+    result = state.invoke_statement()
+    rollup.apply(conn, before, rollup.snapshot(conn, ids))
+    return result
+
+
+def _before_commit(session):
+    stale = session.info.pop(_STALE, None)
+    if not stale:
+        return
+    conn = session.connection()
+    for rollup, universities in stale.items():
+        rollup.rebuild(conn, universities)
+
+
+def _after_rollback(session):
+    session.info.pop(_BEFORE, None)
+    session.info.pop(_STALE, None)
+
+
+def install_rollup_hooks(db):
+    """Keep the rollups in step with writes made through the app's session (idempotent)"""
+    for name, fn in (('before_flush', _before_flush), ('after_flush', _after_flush),
+                     ('do_orm_execute', _on_orm_execute), ('before_commit', _before_commit),
+                     ('after_rollback', _after_rollback)):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,166 @@
+"""
+Structural-sharing storage for FRAMES sandboxes
+A sandbox is a reference to an immutable base snapshot plus a compact diff
+of the entities it changed; full states are only materialized on read.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+COLLECTIONS = ('teams', 'faculty', 'projects', 'interfaces')
+
+
+class DiffError(ValueError):
+    """A client-supplied diff or state has the wrong shape"""
+
+
+class LRUCache:
+    """Small thread-safe LRU mapping"""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def empty_diff() -> Dict:
+    return {name: {'upsert': {}, 'remove': []} for name in COLLECTIONS}
+
+
+def _normalize(diff: Optional[Dict]) -> Dict:
+    """Fill in missing collections/keys so callers can index freely"""
+    result = empty_diff()
+    for name in COLLECTIONS:
+        part = (diff or {}).get(name) or {}
+        result[name]['upsert'] = dict(part.get('upsert') or {})
+        result[name]['remove'] = list(part.get('remove') or [])
+    return result
+
+
+def validate_diff(diff) -> Dict:
+    """`diff` if it is shaped like {collection: {'upsert': {id: entity}, 'remove': [id]}}"""
+    if not isinstance(diff, dict):
+        raise DiffError('diff must be an object')
+    for name in COLLECTIONS:
+        part = diff.get(name)
+        if part is None:
+            continue
+        if not isinstance(part, dict):
+            raise DiffError(f'diff.{name} must be an object')
+        upsert, remove = part.get('upsert'), part.get('remove')
+        if upsert is not None and not (
+            isinstance(upsert, dict) and all(isinstance(item, dict) for item in upsert.values())
+        ):
+            raise DiffError(f'diff.{name}.upsert must map entity ids to objects')
+        if remove is not None and not (
+            isinstance(remove, list) and all(isinstance(entity_id, (str, int)) for entity_id in remove)
+        ):
+            raise DiffError(f'diff.{name}.remove must be a list of entity ids')
+    return diff
+
+
+def validate_state(state) -> Dict:
+    """`state` if it is shaped like {collection: [entity, ...]}"""
+    if not isinstance(state, dict):
+        raise DiffError('data must be an object')
+    for name in COLLECTIONS:
+        items = state.get(name)
+        if items is not None and not (isinstance(items, list) and all(isinstance(i, dict) for i in items)):
+            raise DiffError(f'data.{name} must be a list of objects')
+    return state
+
+
+def compact_diff(diff: Dict) -> Dict:
+    """Drop empty collections for storage"""
+    return {
+        name: {k: v for k, v in part.items() if v}
+        for name, part in _normalize(diff).items()
+        if part['upsert'] or part['remove']
+    }
+
+
+def diff_size(diff: Dict) -> int:
+    """Number of entity changes recorded in a diff"""
+    return sum(len(part['upsert']) + len(part['remove']) for part in _normalize(diff).values())
+
+
+def _by_id(items: Iterable[Dict]) -> 'OrderedDict[str, Dict]':
+    return OrderedDict((item.get('id'), item) for item in items)
+
+
+def compute_diff(base: Dict, target: Dict) -> Dict:
+    """Entity-level diff that turns `base` into `target`"""
+    diff = empty_diff()
+    for name in COLLECTIONS:
+        before = _by_id(base.get(name, []))
+        after = _by_id(target.get(name, []))
+        diff[name]['upsert'] = {
+            entity_id: item for entity_id, item in after.items()
+            if before.get(entity_id) != item
+        }
+        diff[name]['remove'] = [entity_id for entity_id in before if entity_id not in after]
+    return compact_diff(diff)
+
+
+def merge_diff(diff: Dict, patch: Dict) -> Dict:
+    """Apply `patch` on top of an existing diff (later changes win)"""
+    merged = _normalize(diff)
+    patch = _normalize(patch)
+    for name in COLLECTIONS:
+        upsert, remove = merged[name]['upsert'], merged[name]['remove']
+        for entity_id in patch[name]['remove']:
+            upsert.pop(entity_id, None)
+            if entity_id not in remove:
+                remove.append(entity_id)
+        for entity_id, item in patch[name]['upsert'].items():
+            if entity_id in remove:
+                remove.remove(entity_id)
+            upsert[entity_id] = item
+    return compact_diff(merged)
+
+
+def apply_diff(base: Dict, diff: Dict) -> Dict:
+    """
+    Materialize a full state from `base` and `diff`.
+    Base order is kept; changed entities are replaced in place and new ones appended.
+    """
+    diff = _normalize(diff)
+    result = {}
+    for name in COLLECTIONS:
+        upsert = diff[name]['upsert']
+        removed = set(diff[name]['remove'])
+        items: List[Dict] = []
+        seen = set()
+        for item in base.get(name, []):
+            entity_id = item.get('id')
+            if entity_id in removed:
+                continue
+            items.append(upsert.get(entity_id, item))
+            seen.add(entity_id)
+        items.extend(item for entity_id, item in upsert.items() if entity_id not in seen)
+        result[name] = items
+    return result
@@ -0,0 +1,181 @@
+"""
+Append-only mutation journal for the FRAMES SystemState
+Every mutation is appended as one JSON line next to the binary snapshot and
+replayed on load; a background compaction folds the journal into a fresh
+snapshot once it grows past a size threshold.
+"""
+
+import json
+import os
+import threading
+import traceback
+from typing import Optional
+
+from models import SystemState
+
+
+DEFAULT_COMPACT_BYTES = int(os.environ.get('FRAMES_JOURNAL_COMPACT_BYTES', 4 * 1024 * 1024))
+
+
+class JournaledStateStore:
+    """
+    Snapshot + journal persistence for a SystemState.
+
+    Files (for a snapshot at `frames_data.snapshot`):
+    - `frames_data.snapshot`                      last compacted state, with its sequence number
+    - `frames_data.snapshot.journal`              mutations appended since then
+    - `frames_data.snapshot.journal.compacting`   journal being folded into a new snapshot
+
+    Journal records carry the state's sequence number, so records already
+    contained in the snapshot are skipped on replay and a crash at any point
+    (mid-append, mid-compaction) loses at most the record being written.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None,
+                 compact_threshold: int = DEFAULT_COMPACT_BYTES, fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{snapshot_path}.journal"
+        self.compacting_path = f"{self.journal_path}.compacting"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._file = None
+        self._compactor: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self, state: SystemState, fallback_path: Optional[str] = None) -> int:
+        """
+        Load the snapshot (or `fallback_path`, e.g. legacy JSON) into `state`,
+        replay the journal and attach the store to the state.
+        Returns the number of replayed records.
+        """
+        with self._lock:
+            if os.path.exists(self.snapshot_path):
+                meta = state.load_snapshot(self.snapshot_path)
+                state.version = int(meta.get('seq', 0))
+            elif fallback_path and os.path.exists(fallback_path):
+                state.load_from_file(fallback_path)
+
+            replayed = 0
+            for path in (self.compacting_path, self.journal_path):
+                replayed += self._replay(state, path)
+
+            self._attach(state)
+            return replayed
+
+    def _replay(self, state: SystemState, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+
+        replayed = 0
+        good_offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                # A line without a newline is a torn write from a crash
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_offset += len(line)
+                if record['seq'] <= state.version:
+                    continue
+                state.apply_record(record['op'], record['data'])
+                state.version = record['seq']
+                replayed += 1
+
+        # Drop a torn tail so later appends start on a clean line
+        if good_offset < os.path.getsize(path):
+            with open(path, 'rb+') as f:
+                f.truncate(good_offset)
+        return replayed
+
+    def _attach(self, state: SystemState):
+        state.journal = self
+        if self._file is None:
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def record(self, state: SystemState, op: str, data):
+        """Append one mutation record; O(1) regardless of state size"""
+        with self._lock:
+            seq = state.version + 1
+            self._file.write(json.dumps({'seq': seq, 'op': op, 'data': data}, separators=(',', ':')) + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            state.version = seq
+
+            if self._file.tell() >= self.compact_threshold:
+                self._start_compaction(state)
+
+    def checkpoint(self, state: SystemState):
+        """
+        Synchronously write a full snapshot of `state` and clear the journal.
+        Used when the whole state is replaced (import/reset).
+        """
+        self.wait_for_compaction()
+        with self._lock:
+            state.version += 1
+            state.save_snapshot(self.snapshot_path, {'seq': state.version})
+            self._close()
+            for path in (self.journal_path, self.compacting_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._attach(state)
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _start_compaction(self, state: SystemState):
+        """Rotate the journal and fold it into a new snapshot on a background thread"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+
+        frozen = state.copy()
+        self._close()
+        if os.path.exists(self.compacting_path):
+            # A previous compaction failed; keep its records ahead of ours
+            with open(self.compacting_path, 'ab') as dst, open(self.journal_path, 'rb') as src:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.compacting_path)
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+        self._compactor = threading.Thread(
+            target=self._compact, args=(frozen,), name='frames-journal-compaction', daemon=True
+        )
+        self._compactor.start()
+
+    def _compact(self, frozen: SystemState):
+        try:
+            frozen.save_snapshot(self.snapshot_path, {'seq': frozen.version})
+            os.remove(self.compacting_path)
+        except Exception:
+            # The rotated journal stays on disk and is replayed on next load
+            print('Journal compaction failed:', traceback.format_exc())
+
+    def wait_for_compaction(self, timeout: Optional[float] = None):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Finish any running compaction and close the journal file"""
+        self.wait_for_compaction()
+        with self._lock:
+            self._close()
@@ -0,0 +1,145 @@
+"""
+Snapshot persistence for the FRAMES SystemState
+Compact single-file SQLite snapshots with atomic write-then-rename saves
+and streaming, memory-mapped loads.
+"""
+
+import os
+import sqlite3
+from typing import Dict, Optional
+
+from models import SystemState, Team, Faculty, Project, Interface
+
+
+SNAPSHOT_FORMAT_VERSION = '1'
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+
+# Column order matches the dataclass field order so rows map straight to
+# positional constructor arguments when loading.
+_TABLES = {
+    'teams': ('id', 'discipline', 'lifecycle', 'name', 'size', 'experience', 'description', 'created_at'),
+    'faculty': ('id', 'name', 'role', 'description', 'created_at'),
+    'projects': ('id', 'name', 'type', 'duration', 'description', 'created_at'),
+    'interfaces': ('id', 'from_entity', 'to_entity', 'interface_type', 'bond_type', 'energy_loss', 'created_at'),
+}
+
+# Let SQLite memory-map up to 256MB of the snapshot while reading
+_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def is_snapshot(path: str) -> bool:
+    """Return True if the file at `path` is a SQLite snapshot (not legacy JSON)"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def _interface_rows(state: SystemState):
+    if state.columnar:
+        store = state.interfaces
+        entities = store.entities.values
+        interface_types = store.interface_types.values
+        bond_types = store.bond_types.values
+        for i in range(len(store)):
+            yield (
+                store.ids[i],
+                entities[store.from_codes[i]],
+                entities[store.to_codes[i]],
+                interface_types[store.interface_type_codes[i]],
+                bond_types[store.bond_type_codes[i]],
+                store.energy_value(i),
+                store.created_at[i],
+            )
+    else:
+        for i in state.interfaces:
+            yield (i.id, i.from_entity, i.to_entity, i.interface_type, i.bond_type, i.energy_loss, i.created_at)
+
+
+def _fsync_dir(path: str):
+    """Persist a rename by syncing the containing directory (no-op where unsupported)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def save_snapshot(state: SystemState, path: str, meta: Optional[Dict[str, str]] = None):
+    """
+    Write `state` to a SQLite snapshot at `path`.
+
+    The snapshot is built in a temporary file next to the target and moved
+    into place with os.replace, so readers (and a crash mid-save) only ever
+    see the previous complete snapshot or the new one.
+    """
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        # The temp file is discarded on failure, so skip SQLite's own journaling
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        for table, columns in _TABLES.items():
+            conn.execute(f"CREATE TABLE {table} ({', '.join(columns)})")
+
+        insert = "INSERT INTO {} VALUES ({})"
+        conn.executemany(insert.format('teams', ','.join('?' * 8)),
+                         ((t.id, t.discipline, t.lifecycle, t.name, t.size, t.experience, t.description, t.created_at)
+                          for t in state.teams))
+        conn.executemany(insert.format('faculty', ','.join('?' * 5)),
+                         ((f.id, f.name, f.role, f.description, f.created_at) for f in state.faculty))
+        conn.executemany(insert.format('projects', ','.join('?' * 6)),
+                         ((p.id, p.name, p.type, p.duration, p.description, p.created_at) for p in state.projects))
+        conn.executemany(insert.format('interfaces', ','.join('?' * 7)), _interface_rows(state))
+
+        meta_rows = {'format_version': SNAPSHOT_FORMAT_VERSION}
+        meta_rows.update(meta or {})
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', [(k, str(v)) for k, v in meta_rows.items()])
+        conn.commit()
+    except Exception:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+
+    with open(tmp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+def load_snapshot(state: SystemState, path: str) -> Dict[str, str]:
+    """
+    Replace the contents of `state` with the snapshot at `path`.
+
+    Rows are streamed from a read-only, memory-mapped connection; columnar
+    states receive interface rows without building `Interface` objects.
+    Returns the snapshot's meta table.
+    """
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        conn.execute(f'PRAGMA mmap_size={_MMAP_SIZE}')
+        meta = dict(conn.execute('SELECT key, value FROM meta'))
+
+        def rows(table):
+            return conn.execute(f"SELECT {', '.join(_TABLES[table])} FROM {table} ORDER BY rowid")
+
+        state.teams = [Team(*row) for row in rows('teams')]
+        state.faculty = [Faculty(*row) for row in rows('faculty')]
+        state.projects = [Project(*row) for row in rows('projects')]
+        state.interfaces = state._new_interface_store()
+        if state.columnar:
+            for row in rows('interfaces'):
+                state.interfaces.append_row(*row)
+        else:
+            state.interfaces.extend(Interface(*row) for row in rows('interfaces'))
+    finally:
+        conn.close()
+    return meta
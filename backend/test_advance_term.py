@@ -0,0 +1,93 @@
+"""
+Set-based advance-term against the per-student loop it replaced.
+"""
+
+import pytest
+
+RESEARCHER = {'X-Is-Researcher': 'true'}
+
+
+def snapshot(app):
+    from db_models import StudentModel
+
+    with app.app_context():
+        return {
+            student.id: {
+                'university_id': student.university_id, 'terms_remaining': student.terms_remaining,
+                'status': student.status, 'active': student.active, 'graduated': student.graduated_at is not None,
+            }
+            for student in StudentModel.query.all()
+        }
+
+
+def loop_advance(students, university_ids=None):
+    """
+    The original endpoint's semantics: decrement every active student;
+    at <= 0 they graduate (status untouched), otherwise status is recomputed.
+    Returns (students after, graduated, updated, dry-run preview).
+    """
+    from db_models import StudentModel
+
+    after, graduated, updated, preview = {}, 0, 0, {}
+    for student_id, student in students.items():
+        student = dict(student)
+        if student['active'] and (university_ids is None or student['university_id'] in university_ids):
+            entry = preview.setdefault(student['university_id'],
+                                       {'graduating': 0, 'advancing': 0, 'status_after': {}})
+            student['terms_remaining'] -= 1
+            if student['terms_remaining'] <= 0:
+                student['active'] = False
+                student['graduated'] = True
+                graduated += 1
+                entry['graduating'] += 1
+            else:
+                student['status'] = StudentModel.status_for(student['terms_remaining'])
+                updated += 1
+                entry['advancing'] += 1
+                entry['status_after'][student['status']] = entry['status_after'].get(student['status'], 0) + 1
+        after[student_id] = student
+    return after, graduated, updated, preview
+
+
+def advance(client, university_ids=None, dry_run=False):
+    query = '?dry_run=true' if dry_run else ''
+    if university_ids is not None and len(university_ids) == 1:
+        response = client.post(f'/api/university/{university_ids[0]}/advance-term{query}')
+    else:
+        body = {} if university_ids is None else {'university_ids': university_ids}
+        response = client.post(f'/api/advance-term{query}', json=body, headers=RESEARCHER)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+@pytest.mark.parametrize('university_ids', [['U1'], ['U0', 'U2'], None])
+def test_matches_per_student_loop(seeded, client, rollup_drift, university_ids):
+    # Five terms graduate every seeded student (1-5 terms remaining); the sixth is a no-op
+    for _ in range(6):
+        before = snapshot(client.application)
+        expected, graduated, updated, preview = loop_advance(before, university_ids)
+
+        dry_run = advance(client, university_ids, dry_run=True)
+        assert snapshot(client.application) == before
+        assert dry_run['by_university'] == preview
+        assert (dry_run['graduated'], dry_run['updated']) == (graduated, updated)
+
+        result = advance(client, university_ids)
+        assert (result['graduated'], result['updated']) == (graduated, updated)
+        assert snapshot(client.application) == expected
+        assert rollup_drift() == {}
+
+    assert not any(student['active'] for student in expected.values()
+                   if university_ids is None or student['university_id'] in university_ids)
+
+
+def test_all_universities_includes_inactive_university(seeded, client):
+    preview = advance(client, dry_run=True)['by_university']
+    assert set(preview) == {'U0', 'U1', 'U2', 'U3'}
+
+
+def test_advance_all_is_researcher_only(seeded, client):
+    before = snapshot(client.application)
+    assert client.post('/api/advance-term', json={}).status_code == 403
+    assert client.post('/api/advance-term', json={'university_ids': 'U1'}, headers=RESEARCHER).status_code == 400
+    assert snapshot(client.application) == before
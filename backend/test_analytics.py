@@ -0,0 +1,175 @@
+"""
+/api/analytics/data: every registered metric and grouping against a
+hand-written GROUP BY over the source table, multi-metric requests,
+validation and timeRange.
+"""
+
+from datetime import datetime
+
+import pytest
+
+# metric -> (table, WHERE, aggregate, total label, digits)
+RAW_METRICS = {
+    'student_count': ('students', 'active', 'COUNT(*)', 'Total Students', None),
+    'avg_terms_remaining': ('students', 'active', 'AVG(terms_remaining)', 'Average Terms Remaining', 2),
+    'team_count': ('teams', None, 'COUNT(*)', 'Total Teams', None),
+    'faculty_count': ('faculty', None, 'COUNT(*)', 'Total Faculty/Mentors', None),
+    'project_count': ('projects', None, 'COUNT(*)', 'Total Projects', None),
+    'graduated_count': ('students', 'NOT active AND graduated_at IS NOT NULL', 'COUNT(*)', 'Total Graduated', None),
+    'outcome_count': ('outcomes', None, 'COUNT(*)', 'Total Outcomes', None),
+    'success_rate': ('outcomes', None, '100.0 * AVG(CASE WHEN success THEN 1.0 ELSE 0.0 END)',
+                     'Success Rate (%)', 2),
+}
+
+RAW_COLUMNS = {
+    'university': 'university_id', 'team': 'team_id', 'status': 'status', 'expertise_area': 'expertise_area',
+    'project': 'project_id', 'discipline': 'discipline', 'role': 'role', 'type': 'type',
+    'outcome_type': 'outcome_type',
+}
+
+
+def raw(app, metric, group_by=(), where=None):
+    """The metric's rows from a plain GROUP BY, shaped like the endpoint's data"""
+    from sqlalchemy import text
+    from backend.database import db
+
+    table, condition, aggregate, total_label, digits = RAW_METRICS[metric]
+    columns = [RAW_COLUMNS[d] for d in group_by]
+    conditions = [c for c in (condition, where) if c]
+    sql = f"SELECT {', '.join(columns + [aggregate])} FROM {table}"
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(f'({c})' for c in conditions)
+    if columns:
+        sql += f" GROUP BY {', '.join(columns)}"
+    with app.app_context():
+        rows = db.session.execute(text(sql)).all()
+
+    def value(v):
+        return round(float(v or 0), digits) if digits is not None else v or 0
+
+    if not group_by:
+        return [{'label': total_label, 'value': value(rows[0][0])}]
+    if len(group_by) == 1:
+        return [{'label': str(row[0] or 'Unknown'), 'value': value(row[1])} for row in rows]
+    return [{**{d: str(row[i] or 'Unknown') for i, d in enumerate(group_by)}, 'value': value(row[-1])}
+            for row in rows]
+
+
+def unordered(rows):
+    return sorted(rows, key=lambda row: sorted((k, str(v)) for k, v in row.items()))
+
+
+def post(client, body, status=200):
+    response = client.post('/api/analytics/data', json=body)
+    assert response.status_code == status, response.get_json()
+    return response.get_json()
+
+
+def groupings(client):
+    """(metric, groupBy) for every metric and each dimension it lists as applicable, plus no grouping"""
+    described = client.get('/api/analytics/dimensions').get_json()
+    presets = {'status_distribution', 'students_by_status_and_expertise'}
+    cases = [(m['value'], None) for m in described['metrics'] if m['value'] not in presets]
+    cases += [(metric, d['value']) for d in described['dimensions'] for metric in d['applicableTo']]
+    return cases
+
+
+def test_every_metric_and_grouping_matches_raw_query(seeded, client):
+    cases = groupings(client)
+    assert {metric for metric, _ in cases} == set(RAW_METRICS)
+    assert len(cases) > len(RAW_METRICS)
+    for metric, group_by in cases:
+        body = post(client, {'metric': metric, 'groupBy': group_by})
+        assert body['metric'] == metric and body['groupBy'] == group_by
+        expected = raw(client.application, metric, (group_by,) if group_by else ())
+        assert unordered(body['data']) == unordered(expected), (metric, group_by)
+
+
+def test_preset_breakdowns_match_raw_query(seeded, client):
+    data = post(client, {'metric': 'status_distribution'})['data']
+    expected = raw(client.application, 'student_count', ('status',))
+    assert unordered(data) == unordered([{**row, 'label': row['label'].title()} for row in expected])
+
+    data = post(client, {'metric': 'students_by_status_and_expertise'})['data']
+    expected = raw(client.application, 'student_count', ('status', 'expertise_area'))
+    assert unordered(data) == unordered(
+        [{'status': row['status'], 'expertise': row['expertise_area'], 'value': row['value']} for row in expected]
+    )
+
+
+def test_two_level_grouping(seeded, client):
+    data = post(client, {'metric': 'student_count', 'groupBy': ['university', 'status']})['data']
+    assert unordered(data) == unordered(raw(client.application, 'student_count', ('university', 'status')))
+
+
+@pytest.mark.parametrize('metric, group_by, filters, where', [
+    ('student_count', 'status', {'university_id': 'U1'}, "university_id = 'U1'"),
+    ('avg_terms_remaining', 'team', {'project_id': 'U2_p1'},
+     "team_id IN (SELECT id FROM teams WHERE project_id = 'U2_p1')"),
+    ('student_count', 'university', {'expertise_area': 'Software', 'status': ''}, "expertise_area = 'Software'"),
+    ('team_count', 'project', {'discipline': 'software'}, "discipline = 'software'"),
+    ('faculty_count', 'university', {'role': 'lead'}, "role = 'lead'"),
+    ('success_rate', 'university', {'outcome_type': 'mission_success'}, "outcome_type = 'mission_success'"),
+])
+def test_filters_match_raw_query(seeded, client, metric, group_by, filters, where):
+    data = post(client, {'metric': metric, 'groupBy': group_by, 'filters': filters})['data']
+    assert unordered(data) == unordered(raw(client.application, metric, (group_by,), where))
+
+
+def test_multi_metric_request(seeded, client):
+    names = ['student_count', 'avg_terms_remaining', 'status_distribution', 'team_count']
+    body = post(client, {'metrics': names, 'groupBy': 'university'})
+    assert body['metrics'] == names
+    assert set(body['data']) == set(names)
+    for name in names:
+        single = post(client, {'metric': name, 'groupBy': None if name == 'status_distribution' else 'university'})
+        assert body['data'][name] == single['data']
+
+
+@pytest.mark.parametrize('body', [
+    {'metric': 'student_count', 'groupBy': 'nonsense'},
+    {'metric': 'student_count', 'groupBy': 'role'},
+    {'metric': 'team_count', 'groupBy': ['university', 'team']},
+    {'metric': 'status_distribution', 'groupBy': 'university'},
+    {'metrics': ['student_count', 'faculty_count'], 'groupBy': 'team'},
+    {'metric': 'no_such_metric'},
+    {'metrics': []},
+    {'metric': 'student_count', 'filters': {'bogus': 1}},
+    {'metric': 'student_count', 'timeRange': {'start': 'yesterday'}},
+    {'metric': 'student_count', 'timeRange': {'start': '2024-01-01', 'end': '2023-01-01'}},
+])
+def test_invalid_request_is_400(seeded, client, body):
+    assert 'error' in post(client, body, status=400)
+
+
+def in_range(stamp, start, end):
+    return stamp is not None and start <= datetime.fromisoformat(stamp) < end
+
+
+def test_time_range(seeded, client):
+    start, end = datetime(2023, 3, 1), datetime(2023, 7, 1)
+    time_range = {'start': '2023-03-01', 'end': '2023-06-30'}  # a date-only end includes that day
+
+    students = client.get('/api/students?active=false').get_json()
+    assert any(not s['active'] for s in students)
+    expected = {}
+    for student in students:
+        if student['active'] and in_range(student['created_at'], start, end):
+            expected[student['university_id']] = expected.get(student['university_id'], 0) + 1
+    data = post(client, {'metric': 'student_count', 'groupBy': 'university', 'timeRange': time_range})['data']
+    assert {row['label']: row['value'] for row in data} == expected
+    assert sum(expected.values()) < sum(s['active'] for s in students)
+
+    graduated = sum(not s['active'] and in_range(s['graduated_at'], start, end) for s in students)
+    data = post(client, {'metric': 'graduated_count', 'timeRange': time_range})['data']
+    assert data == [{'label': 'Total Graduated', 'value': graduated}]
+
+    outcomes = client.get('/api/outcomes').get_json()
+    recorded = [o for o in outcomes if in_range(o['recorded_at'], start, end)]
+    data = post(client, {'metric': 'outcome_count', 'groupBy': 'university', 'timeRange': time_range})['data']
+    assert sum(row['value'] for row in data) == len(recorded) < len(outcomes)
+
+    open_ended = post(client, {'metric': 'student_count', 'timeRange': {'start': '2023-03-01'}})['data']
+    assert open_ended[0]['value'] == sum(
+        s['active'] and datetime.fromisoformat(s['created_at']) >= start for s in students
+    )
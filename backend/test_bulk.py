@@ -0,0 +1,135 @@
+"""
+Bulk create/update endpoints: per-row validation, CSV input, atomic mode
+and the rollups they maintain.
+"""
+
+RESEARCHER = {'X-University-ID': 'U1', 'X-Is-Researcher': 'true'}
+
+
+def students(app, *ids):
+    from db_models import StudentModel
+
+    with app.app_context():
+        rows = StudentModel.query.filter(StudentModel.id.in_(ids)).all()
+        return {row.id: row.to_dict() for row in rows}
+
+
+def test_mixed_batch_reports_bad_rows(seeded, client):
+    rows = [
+        {'id': 'bulk_ok', 'university_id': 'U1', 'name': 'Ok', 'team_id': 'U1_p0_t0', 'terms_remaining': 3},
+        {'id': 'bulk_ts', 'university_id': 'U1', 'name': 'Bad time', 'created_at': 5},
+        {'id': 'bulk_name', 'university_id': 'U1', 'name': {'a': 1}},
+        {'id': 'bulk_terms', 'university_id': 'U1', 'name': 'Bad terms', 'terms_remaining': [1]},
+        {'id': 'bulk_active', 'university_id': 'U1', 'name': 'Bad flag', 'active': 'maybe'},
+        {'id': {'nested': True}, 'university_id': 'U1', 'name': 'Bad id'},
+        {'id': 'U1_p0_t0_s1', 'terms_remaining': 2, 'meta': {'note': 'json column'}},
+        'not an object',
+    ]
+    response = client.post('/api/students/bulk', json=rows, headers=RESEARCHER)
+    assert response.status_code == 200, response.get_json()
+    summary = response.get_json()
+    assert (summary['created'], summary['updated'], summary['failed']) == (1, 1, 6)
+    assert summary['committed'] is True
+
+    results = {result['row']: result for result in summary['results']}
+    assert [results[i]['status'] for i in range(len(rows))] == [
+        'created', 'error', 'error', 'error', 'error', 'error', 'updated', 'error',
+    ]
+    assert 'created_at' in results[1]['error']
+    assert 'name' in results[2]['error']
+    assert 'terms_remaining' in results[3]['error']
+    assert 'active' in results[4]['error']
+    assert results[7]['error'] == 'Row must be an object'
+
+    written = students(client.application, 'bulk_ok', 'bulk_ts', 'bulk_name', 'U1_p0_t0_s1')
+    assert set(written) == {'bulk_ok', 'U1_p0_t0_s1'}
+    assert written['bulk_ok']['status'] == 'established'
+    assert written['U1_p0_t0_s1']['terms_remaining'] == 2
+    assert written['U1_p0_t0_s1']['meta'] == {'note': 'json column'}
+
+
+def test_json_values_are_coerced(seeded, client):
+    rows = [
+        {'id': 'bulk_a', 'university_id': 'U2', 'name': 'A', 'terms_remaining': 2.0, 'active': True,
+         'created_at': '2024-02-03T04:05:06', 'graduation_term': 2026},
+        {'id': 'bulk_b', 'university_id': 'U2', 'name': 'B', 'terms_remaining': 2.5},
+    ]
+    summary = client.post('/api/students/bulk', json=rows, headers=RESEARCHER).get_json()
+    assert [result['status'] for result in summary['results']] == ['created', 'error']
+
+    written = students(client.application, 'bulk_a')['bulk_a']
+    assert written['terms_remaining'] == 2
+    assert written['graduation_term'] == '2026'
+    assert written['created_at'] == '2024-02-03T04:05:06'
+
+
+def test_csv_upload(seeded, client):
+    body = (
+        'id,university_id,name,team_id,terms_remaining,is_lead,created_at\n'
+        'csv_1,U2,Csv One,U2_p1_t0,1,yes,2024-09-01T10:00:00\n'
+        'csv_2,U2,Csv Two,U2_p1_t0,,no,\n'
+        'csv_3,U2,Csv Three,U2_p1_t0,many,no,\n'
+        'U2_p0_t0_s0,,,,4,,\n'
+    )
+    response = client.post('/api/students/bulk', data=body.encode(), content_type='text/csv',
+                           headers=RESEARCHER)
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert [result['status'] for result in summary['results']] == ['created', 'created', 'error', 'updated']
+    assert 'terms_remaining' in summary['results'][2]['error']
+
+    written = students(client.application, 'csv_1', 'csv_2', 'U2_p0_t0_s0')
+    assert written['csv_1']['is_lead'] is True
+    assert written['csv_1']['status'] == 'outgoing'
+    assert written['csv_1']['created_at'] == '2024-09-01T10:00:00'
+    assert written['csv_2']['terms_remaining'] == 4  # model default
+    assert written['U2_p0_t0_s0']['terms_remaining'] == 4
+    assert written['U2_p0_t0_s0']['name'] == 'Student 0'  # empty cells leave fields unchanged
+
+
+def test_atomic_batch_rolls_back(seeded, client, rollup_drift):
+    before = client.get('/api/students?university_id=U1').get_json()
+    rows = [
+        {'id': 'atomic_ok', 'university_id': 'U1', 'name': 'Ok', 'team_id': 'U1_p0_t0'},
+        {'id': 'U1_p0_t0_s0', 'terms_remaining': 1},
+        {'id': 'atomic_bad', 'university_id': 'U1', 'name': 'Bad', 'created_at': True},
+    ]
+    response = client.post('/api/students/bulk', json={'rows': rows, 'atomic': True}, headers=RESEARCHER)
+    assert response.status_code == 422
+    summary = response.get_json()
+    assert summary['committed'] is False
+    assert summary['failed'] == 1
+    assert summary['results'][2]['status'] == 'error'
+
+    assert client.get('/api/students?university_id=U1').get_json() == before
+    assert rollup_drift() == {}
+
+    response = client.post('/api/students/bulk?atomic=true', json=rows[:2], headers=RESEARCHER)
+    assert response.status_code == 200
+    assert response.get_json()['committed'] is True
+    assert set(students(client.application, 'atomic_ok', 'U1_p0_t0_s0')) == {'atomic_ok', 'U1_p0_t0_s0'}
+
+
+def test_rollups_follow_bulk_writes(seeded, client, rollup_drift):
+    assert rollup_drift() == {}
+
+    rows = [{'id': f'rollup_{i}', 'university_id': f'U{i % 3}', 'name': f'New {i}',
+             'team_id': f'U{i % 3}_p{i % 2}_t0', 'terms_remaining': i % 5 + 1,
+             'expertise_area': ('Software', 'Avionics')[i % 2]} for i in range(12)]
+    rows += [{'id': f'U{u}_p1_t1_s{s}', 'terms_remaining': 1, 'expertise_area': 'Avionics',
+              'team_id': f'U{u}_p0_t0'} for u in range(3) for s in range(0, 5, 2)]
+    summary = client.post('/api/students/bulk', json=rows, headers=RESEARCHER).get_json()
+    assert (summary['created'], summary['updated'], summary['failed']) == (12, 9, 0)
+    assert rollup_drift() == {}
+
+    teams = [{'id': 'U0_p0_t0', 'discipline': 'avionics'},
+             {'id': 'U1_bulk_team', 'name': 'Bulk', 'project_id': 'U1_p1', 'university_id': 'U1',
+              'discipline': 'software'}]
+    summary = client.post('/api/teams/bulk', json=teams, headers=RESEARCHER).get_json()
+    assert (summary['created'], summary['updated'], summary['failed']) == (1, 1, 0)
+    assert rollup_drift() == {}
+
+
+def test_not_a_list_is_400(seeded, client):
+    response = client.post('/api/students/bulk', json={'rows': 'nope'}, headers=RESEARCHER)
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+"""
+Compressed responses served from the response caches.
+"""
+
+import gzip
+
+import compression
+
+
+def test_cached_payload_is_compressed_once(seeded, client, monkeypatch):
+    calls = []
+    compress = compression._compress
+    monkeypatch.setattr(compression, '_compress', lambda data, encoding: calls.append(encoding) or compress(data, encoding))
+
+    plain = client.get('/api/dashboard/comparative', headers={'Accept-Encoding': 'identity'})
+    assert plain.status_code == 200
+    assert 'Content-Encoding' not in plain.headers
+
+    for _ in range(3):
+        response = client.get('/api/dashboard/comparative', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == plain.data
+    assert calls == ['gzip']
+
+
+def test_analytics_payload_is_compressed_once(seeded, client, monkeypatch):
+    calls = []
+    compress = compression._compress
+    monkeypatch.setattr(compression, '_compress', lambda data, encoding: calls.append(encoding) or compress(data, encoding))
+    monkeypatch.setitem(client.application.extensions['frames_compression'], 'min_size', 0)
+
+    body = {'metric': 'student_count', 'groupBy': ['university', 'team']}
+    plain = client.post('/api/analytics/data', json=body)
+    for _ in range(2):
+        response = client.post('/api/analytics/data', json=body, headers={'Accept-Encoding': 'gzip'})
+        assert gzip.decompress(response.data) == plain.data
+    assert calls == ['gzip']
@@ -0,0 +1,46 @@
+"""
+Version-based ETags and 304 responses (@conditional).
+"""
+
+import pytest
+
+
+def new_team(client, university_id, team_id):
+    response = client.post('/api/teams', json={'id': team_id, 'name': team_id, 'project_id': f'{university_id}_p0'},
+                           headers={'X-University-ID': university_id})
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize('url', ['/api/teams', '/api/teams?university_id=U1', '/api/dashboard/comparative'])
+def test_etag_revalidation(seeded, client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    cached = client.get(url, headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == etag
+
+    new_team(client, 'U1', 'U1_new_team')
+
+    stale = client.get(url, headers={'If-None-Match': etag})
+    assert stale.status_code == 200
+    assert stale.headers['ETag'] != etag
+    assert 'U1_new_team' in stale.get_data(as_text=True)
+    assert client.get(url, headers={'If-None-Match': stale.headers['ETag']}).status_code == 304
+
+
+def test_write_to_other_university_keeps_scoped_etag(seeded, client):
+    url = '/api/teams?university_id=U1'
+    etag = client.get(url).headers['ETag']
+
+    new_team(client, 'U2', 'U2_new_team')
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/teams', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_etag_depends_on_query(seeded, client):
+    assert client.get('/api/teams?fields=name').headers['ETag'] != client.get('/api/teams').headers['ETag']
@@ -0,0 +1,98 @@
+"""
+Change feed (/api/events): committed writes reach subscribers, and the
+cross-process poller runs exactly while someone is subscribed.
+"""
+
+import json
+import time
+
+import pytest
+
+
+@pytest.fixture
+def fast_poll(monkeypatch):
+    import events
+
+    monkeypatch.setattr(events, 'POLL_SECONDS', 0.02)
+    yield events.feed
+    deadline = time.monotonic() + 2
+    while events.feed._poller is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def subscribe(client, query=''):
+    """(response, iterator over its SSE chunks) with the subscription registered"""
+    response = client.get(f'/api/events{query}')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'retry:')
+    return response, chunks
+
+
+def read_events(chunks):
+    text = next(chunks).decode()
+    return [json.loads(line[len('data: '):]) for line in text.splitlines() if line.startswith('data: ')]
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_subscriber_receives_committed_write(seeded, client, fast_poll):
+    response, chunks = subscribe(client, '?types=team')
+    try:
+        created = client.post('/api/teams', json={'id': 'U1_live', 'name': 'Live', 'project_id': 'U1_p0'},
+                              headers={'X-University-ID': 'U1'})
+        assert created.status_code == 201
+
+        [event] = read_events(chunks)
+        assert (event['type'], event['op'], event['id'], event['universities']) == ('team', 'created', 'U1_live', ['U1'])
+        assert event['version']
+    finally:
+        response.close()
+    assert fast_poll.subscribers == 0
+
+
+def test_poller_publishes_other_process_writes(seeded, app, client, fast_poll):
+    from sqlalchemy import update
+    from backend.database import db
+    from db_models import TableVersion
+
+    response, chunks = subscribe(client, '?types=student')
+    try:
+        wait_for(lambda: fast_poll._polled)
+        versions = TableVersion.__table__
+        with app.app_context(), db.engine.begin() as conn:  # bypasses the session hooks
+            conn.execute(update(versions).where(versions.c.table_name == 'students', versions.c.scope == 'U2')
+                         .values(version=versions.c.version + 1))
+
+        [event] = read_events(chunks)
+        assert (event['type'], event['op'], event['id'], event['universities']) == ('student', 'changed', None, ['U2'])
+    finally:
+        response.close()
+
+
+def test_resubscribing_while_poller_stops_keeps_a_poller(seeded, client, fast_poll):
+    response, _ = subscribe(client)
+    wait_for(lambda: fast_poll._polled)
+    first = fast_poll._poller
+
+    # Hold the feed's (re-entrant) lock while the last subscriber leaves and
+    # a new one arrives: the poller reaches its exit check in between
+    with fast_poll._cond:
+        response.close()
+        time.sleep(0.1)
+        response, _ = subscribe(client)
+    try:
+        time.sleep(0.1)
+        poller = fast_poll._poller
+        assert poller is not None and poller.is_alive()
+        assert fast_poll.subscribers == 1
+        assert first is poller or not first.is_alive()
+    finally:
+        response.close()
+    wait_for(lambda: fast_poll._poller is None)
@@ -0,0 +1,23 @@
+"""
+Request/SQL metrics hooks.
+"""
+
+import pytest
+
+
+def test_failed_statement_drops_its_timer(app):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from backend.database import db
+
+    with app.test_request_context('/api/teams'):
+        app.preprocess_request()
+        conn = db.session.connection()
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+        assert not conn.info.get('metrics_query_start')
+
+        conn.execute(text('SELECT 1'))
+        assert not conn.info.get('metrics_query_start')
+        db.session.rollback()
@@ -0,0 +1,83 @@
+"""
+Keyset pagination and sparse fieldsets on the list endpoints.
+"""
+
+import pytest
+
+LIST_ROUTES = ['/api/teams', '/api/students', '/api/faculty', '/api/projects',
+               '/api/interfaces', '/api/outcomes']
+
+
+def page_through(client, url, limit):
+    """Every item of a paginated list, following `next` to the end"""
+    items, cursor, pages = [], None, 0
+    while True:
+        separator = '&' if '?' in url else '?'
+        page_url = f'{url}{separator}limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(page_url)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        assert len(page['items']) <= limit
+        items.extend(page['items'])
+        pages += 1
+        cursor = page['next']
+        if not cursor:
+            return items, pages
+
+
+@pytest.mark.parametrize('route', LIST_ROUTES)
+@pytest.mark.parametrize('limit', [1, 7, 1000])
+def test_pages_cover_every_row_once_in_order(seeded, client, route, limit):
+    full = client.get(route).get_json()
+    assert full
+
+    items, pages = page_through(client, route, limit)
+    ids = [item['id'] for item in items]
+    assert len(ids) == len(set(ids))
+    assert ids == sorted(item['id'] for item in full)
+    assert items == sorted(full, key=lambda item: item['id'])
+    assert pages == max(1, -(-len(full) // limit))
+
+
+def test_pages_respect_filters(seeded, client):
+    items, _ = page_through(client, '/api/students?university_id=U1', 4)
+    expected = client.get('/api/students?university_id=U1').get_json()
+    assert {item['university_id'] for item in items} == {'U1'}
+    assert [item['id'] for item in items] == sorted(item['id'] for item in expected)
+
+
+def test_include_total(seeded, client):
+    page = client.get('/api/teams?limit=5&include_total=true').get_json()
+    assert page['total'] == len(client.get('/api/teams').get_json())
+    assert 'total' not in client.get('/api/teams?limit=5').get_json()
+
+
+@pytest.mark.parametrize('query', ['cursor=not-a-cursor', 'cursor=!!!&limit=5', 'limit=abc', 'limit=0'])
+def test_malformed_pagination_is_400(seeded, client, query):
+    response = client.get(f'/api/students?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_sparse_fieldsets(seeded, client):
+    rows = client.get('/api/interfaces?fields=from,bondType').get_json()
+    assert rows
+    assert all(set(row) == {'id', 'from', 'bondType'} for row in rows)
+
+    full = {row['id']: row for row in client.get('/api/interfaces').get_json()}
+    for row in rows:
+        assert row['from'] == full[row['id']]['from']
+        assert row['bondType'] == full[row['id']]['bondType']
+
+
+def test_sparse_fieldsets_with_pagination(seeded, client):
+    items, _ = page_through(client, '/api/teams?fields=name', 5)
+    assert all(set(item) == {'id', 'name'} for item in items)
+    assert len(items) == len(client.get('/api/teams').get_json())
+
+
+@pytest.mark.parametrize('route', LIST_ROUTES)
+def test_unknown_field_is_400(seeded, client, route):
+    response = client.get(f'{route}?fields=id,no_such_field')
+    assert response.status_code == 400
+    assert 'no_such_field' in response.get_json()['error']
@@ -0,0 +1,97 @@
+"""
+Query budget checks for the energy endpoints, run in the detector's
+pytest mode (strict: a route over its @query_budget raises
+QueryBudgetExceeded instead of logging).
+"""
+
+import pytest
+
+BOND_TYPES = ['codified-strong', 'codified-moderate', 'institutional-weak', 'fragile-temporary']
+
+
+@pytest.fixture(scope='module', autouse=True)
+def energy_data(app, empty_database):
+    from backend.database import db
+    from db_models import FactorModel, InterfaceModel, ModelFactor
+    from energy_engine import EnergyCalculationEngine
+
+    empty_database()
+    with app.app_context():
+        engine = EnergyCalculationEngine()
+        engine.get_active_model()  # creates the baseline model and factors
+
+        for i in range(12):
+            db.session.add(InterfaceModel(
+                id=f'if-{i}', from_entity=f'team-{i}', to_entity=f'team-{i + 1}',
+                bond_type=BOND_TYPES[i % len(BOND_TYPES)],
+                from_university='CalPolyPomona' if i % 2 else 'TexasState',
+                to_university='CalPolyPomona',
+            ))
+        db.session.commit()
+        for i in range(12):
+            engine.auto_assign_factors_from_legacy(f'if-{i}')
+
+        factor_ids = [factor['id'] for factor in engine.catalog().active()]
+        for i in range(7):
+            model = FactorModel(model_name=f'experiment_{i}', display_name=f'Experiment {i}')
+            db.session.add(model)
+            db.session.flush()
+            for j, factor_id in enumerate(factor_ids[:i % 4 + 1]):
+                db.session.add(ModelFactor(model_id=model.id, factor_id=factor_id,
+                                           weight=0.5 + i / 10 + j, enabled=j != 2))
+        db.session.commit()
+
+
+def model_ids(app):
+    from db_models import FactorModel
+
+    with app.app_context():
+        return [model.id for model in FactorModel.query.order_by(FactorModel.id)]
+
+
+def test_pytest_mode_is_strict(app, client):
+    from query_budget import _mode
+
+    assert _mode(app) == 'strict'
+
+
+def test_route_over_budget_fails(app, client, monkeypatch):
+    from query_budget import QueryBudgetExceeded
+
+    view = app.view_functions['calculate_network_energy']
+    monkeypatch.setattr(view, 'query_budget', {'total': 1, 'repeats': None})
+    with pytest.raises(QueryBudgetExceeded):
+        client.get('/api/research/energy/network')
+
+
+def test_network_energy_within_budget(client):
+    response = client.get('/api/research/energy/network')
+    assert response.status_code == 200
+    assert response.get_json()['analyzed_interfaces'] == 12
+
+
+def test_compare_models_within_budget(app, client):
+    ids = model_ids(app)
+    assert len(ids) >= 6
+
+    response = client.post('/api/research/compare-models', json={'model_ids': ids + [None]})
+    assert response.status_code == 200
+    comparisons = response.get_json()['comparisons']
+
+    expected = [client.get(f'/api/research/energy/network?model_id={i}').get_json() for i in ids]
+    assert comparisons[:-1] == expected
+    assert comparisons[-1] == client.get('/api/research/energy/network').get_json()
+
+
+def test_compare_models_by_university(app, client):
+    ids = model_ids(app)
+    response = client.post('/api/research/compare-models',
+                           json={'model_ids': ids, 'university_id': 'TexasState'})
+    assert response.status_code == 200
+    assert {c['total_interfaces'] for c in response.get_json()['comparisons']} == {6}
+
+
+def test_unknown_model_is_404(app, client):
+    assert client.get('/api/research/energy/network?model_id=9999').status_code == 404
+    response = client.post('/api/research/compare-models', json={'model_ids': model_ids(app) + [9999]})
+    assert response.status_code == 404
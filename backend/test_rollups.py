@@ -0,0 +1,90 @@
+"""
+Analytics rollups stay equal to a GROUP BY over their source tables after
+every kind of write, and scripts/rebuild_rollups.py invalidates cached
+analytics after repairing them.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+RESEARCHER = {'X-University-ID': 'U1', 'X-Is-Researcher': 'true'}
+
+
+def ok(response, status=200):
+    assert response.status_code == status, response.get_json()
+    return response.get_json()
+
+
+def test_rollups_follow_every_write(seeded, client, rollup_drift):
+    assert rollup_drift() == {}
+    created = {}
+
+    def create_student():
+        created['student'] = ok(client.post('/api/students', json={
+            'university_id': 'U1', 'name': 'New', 'team_id': 'U1_p0_t0',
+            'terms_remaining': 3, 'expertise_area': 'Avionics'}), 201)['id']
+
+    steps = [
+        create_student,
+        lambda: ok(client.put(f"/api/students/{created['student']}",
+                              json={'terms_remaining': 5, 'team_id': 'U1_p1_t1'})),
+        lambda: ok(client.put('/api/students/U2_p0_t0_s1', json={'expertise_area': None, 'team_id': 'U2_p1_t0'})),
+        lambda: ok(client.delete('/api/students/U0_p1_t1_s2')),
+        lambda: ok(client.post('/api/teams', json={'id': 'r_team', 'name': 'Rollup', 'project_id': 'U1_p1',
+                                                   'discipline': 'avionics'}, headers=RESEARCHER), 201),
+        lambda: ok(client.put('/api/teams/U0_p0_t1', json={'discipline': 'avionics', 'project_id': 'U0_p1'},
+                              headers=RESEARCHER)),
+        lambda: ok(client.delete('/api/teams/r_team', headers=RESEARCHER)),
+        lambda: ok(client.post('/api/students/bulk', json=[
+            {'id': 'r_bulk_1', 'university_id': 'U2', 'name': 'Bulk', 'team_id': 'U2_p0_t1', 'terms_remaining': 1},
+            {'id': 'U1_p0_t1_s0', 'terms_remaining': 4, 'expertise_area': 'Software'},
+        ], headers=RESEARCHER)),
+        lambda: ok(client.post('/api/teams/bulk', json=[
+            {'id': 'U2_p1_t1', 'discipline': None},
+            {'id': 'r_bulk_team', 'name': 'Bulk', 'project_id': 'U2_p0', 'university_id': 'U2'},
+        ], headers=RESEARCHER)),
+        lambda: ok(client.post('/api/university/U1/advance-term')),
+        lambda: ok(client.post('/api/advance-term', json={'university_ids': ['U0', 'U3']}, headers=RESEARCHER)),
+        lambda: ok(client.post('/api/advance-term', headers=RESEARCHER)),
+    ]
+    for number, step in enumerate(steps):
+        step()
+        assert rollup_drift() == {}, f'step {number}'
+
+
+def student_count(client):
+    body = ok(client.post('/api/analytics/data', json={'metric': 'student_count', 'groupBy': 'university'}))
+    return {row['label']: row['value'] for row in body['data']}
+
+
+def test_rebuild_script_repairs_and_invalidates(seeded, app, client, rollup_drift, tmp_path):
+    from sqlalchemy import delete
+    from backend.database import db
+    from db_models import StudentModel
+    from response_cache import ResponseCache
+
+    before = student_count(client)
+    disk_path = str(tmp_path / 'responses.db')
+    disk = ResponseCache(disk_path=disk_path)
+    disk.get_or_build('analytics/data:example', 'v1', lambda: b'stale')
+
+    # A write the app never sees: the rollups and cached results go stale
+    with app.app_context(), db.engine.begin() as conn:
+        conn.execute(delete(StudentModel.__table__).where(StudentModel.university_id == 'U1'))
+    assert rollup_drift()
+    assert student_count(client) == before
+
+    env = dict(os.environ, FRAMES_RESPONSE_CACHE_DB=disk_path)
+    script = os.path.join(ROOT, 'scripts', 'rebuild_rollups.py')
+    check = subprocess.run([sys.executable, script, '--check'], env=env, capture_output=True, text=True)
+    assert check.returncode == 1, check.stdout + check.stderr
+    rebuild = subprocess.run([sys.executable, script, '-u', 'U1'], env=env, capture_output=True, text=True)
+    assert rebuild.returncode == 0, rebuild.stdout + rebuild.stderr
+
+    assert rollup_drift() == {}
+    after = student_count(client)
+    assert 'U1' not in after
+    assert after == {label: n for label, n in before.items() if label != 'U1'}
+    assert ResponseCache(disk_path=disk_path).get_or_build('analytics/data:example', 'v1', lambda: b'fresh') == b'fresh'
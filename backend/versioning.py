@@ -0,0 +1,216 @@
+"""
+Per-table write versions for FRAMES
+Every ORM write bumps a counter for the table (scope '*') and for each
+university the written row belongs to. GET endpoints derive ETags from
+those counters, so `If-None-Match` revalidation costs one lookup in
+`table_versions` instead of a query over the entity tables.
+"""
+
+import hashlib
+from functools import wraps
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import g, make_response, request
+from sqlalchemy import event, inspect, select, update
+
+from db_models import TableVersion
+
+
+ALL = '*'
+
+_table = TableVersion.__table__
+
+
+# ----------------------------------------------------------------------
+# Bumping
+# ----------------------------------------------------------------------
+
+def _insert_ignore(conn):
+    """INSERT that does nothing if the (table, scope) row already exists"""
+    dialect = conn.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(_table).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(_table).on_conflict_do_nothing()
+    return _table.insert()
+
+
+def _bump_key(conn, table_name: str, scope: str):
+    bump = (
+        update(_table)
+        .where(_table.c.table_name == table_name, _table.c.scope == scope)
+        .values(version=_table.c.version + 1)
+    )
+    if conn.execute(bump).rowcount:
+        return
+    inserted = conn.execute(_insert_ignore(conn).values(table_name=table_name, scope=scope, version=1))
+    if not inserted.rowcount:
+        # Another transaction created the row first
+        conn.execute(bump)
+
+
+def _bump_table(conn, table_name: str):
+    """Bump every scope of a table (used when the affected universities are unknown)"""
+    conn.execute(
+        update(_table)
+        .where(_table.c.table_name == table_name, _table.c.scope != ALL)
+        .values(version=_table.c.version + 1)
+    )
+    _bump_key(conn, table_name, ALL)
+
+
+def bump_versions(session, table_name: str, scopes: Optional[Iterable[str]] = None):
+    """
+    Bump versions for writes the ORM hooks cannot see (raw SQL, Core inserts).
+    `scopes=None` bumps every university of the table. Runs in the session's
+    transaction, so the bump commits or rolls back with the write.
+    """
+    bump_connection_versions(session.connection(), table_name, scopes)
+
+
+def bump_connection_versions(conn, table_name: str, scopes: Optional[Iterable[str]] = None):
+    """bump_versions() on a Core connection, for scripts that write without a session"""
+    if scopes is None:
+        _bump_table(conn, table_name)
+        return
+    _bump_scopes(conn, table_name, scopes)
+
+
+def _bump_scopes(conn, table_name: str, scopes: Iterable[str]):
+    for scope in sorted({ALL, *(str(s) for s in scopes if s is not None)}):
+        _bump_key(conn, table_name, scope)
+
+
+def _scopes(obj) -> Iterable[str]:
+    """University ids a written row belongs to, before and after the write"""
+    state = inspect(obj)
+    for attr in getattr(type(obj), 'version_scopes', ()):
+        history = state.attrs[attr].history
+        for value in chain(history.added, history.unchanged, history.deleted):
+            if value is not None:
+                yield str(value)
+
+
+def _after_flush(session, flush_context):
+    changes = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table_name = getattr(obj, '__tablename__', None)
+        if table_name is None or table_name == _table.name:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        changes.add((table_name, ALL))
+        changes.update((table_name, scope) for scope in _scopes(obj))
+
+    if changes:
+        conn = session.connection()
+        # Sorted so concurrent writers take row locks in the same order
+        for table_name, scope in sorted(changes):
+            _bump_key(conn, table_name, scope)
+
+
+def _on_orm_execute(orm_execute_state):
+    """
+    ORM bulk statements (`session.execute(insert(Model), rows)`, `Query.update()`,
+    `Query.delete()`) bypass the flush. Bulk inserts bump the universities named
+    in their rows; updates and deletes bump the whole table.
+    """
+    state = orm_execute_state
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    if mapper is None or mapper.local_table is _table:
+        return
+    table_name = mapper.local_table.name
+    conn = state.session.connection()
+
+    rows = state.parameters
+    if isinstance(rows, dict):
+        rows = [rows]
+    if state.is_insert and rows:
+        attrs = getattr(mapper.class_, 'version_scopes', ())
+        _bump_scopes(conn, table_name, (row.get(attr) for row in rows for attr in attrs))
+    else:
+        _bump_table(conn, table_name)
+
+
+def install_version_hooks(db):
+    """Register the version hooks on the app's session (idempotent)"""
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+    if not event.contains(db.session, 'do_orm_execute', _on_orm_execute):
+        event.listen(db.session, 'do_orm_execute', _on_orm_execute)
+
+
+# ----------------------------------------------------------------------
+# Reading / ETags
+# ----------------------------------------------------------------------
+
+def get_versions(session, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+    """Current versions for (table, scope) keys; never-written keys are 0"""
+    keys = sorted(set(keys))
+    tables = {table_name for table_name, _ in keys}
+    rows = session.execute(
+        select(_table.c.table_name, _table.c.scope, _table.c.version)
+        .where(_table.c.table_name.in_(tables))
+    ).all()
+    found = {(row.table_name, row.scope): row.version for row in rows}
+    return {key: found.get(key, 0) for key in keys}
+
+
+def _digest(versions: Dict[Tuple[str, str], int], extra: str = '') -> str:
+    raw = '|'.join(f'{t}:{s}:{v}' for (t, s), v in versions.items()) + '|' + extra
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def compute_etag(session, tables: Iterable[str], scope: Optional[str] = None, extra: str = '') -> str:
+    return _digest(get_versions(session, ((table_name, scope or ALL) for table_name in tables)), extra)
+
+
+def conditional(*tables: str, scope_arg: Optional[str] = None):
+    """
+    Serve a GET view with a weak ETag built from the versions of `tables`
+    and answer a matching `If-None-Match` with 304 without calling the view.
+
+    `scope_arg` names the query-string or URL argument holding a university
+    id; when present only that university's counters are consulted.
+
+    The view finds the same versions, without the request path, in
+    `g.table_version` (compute_etag(session, tables, scope)), so it can key
+    a server-side cache without reading the counters a second time.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from backend.database import db
+
+            scope = None
+            if scope_arg:
+                scope = kwargs.get(scope_arg) or request.args.get(scope_arg)
+
+            # g outlives the request in sequential batches; never reuse a value
+            g.table_version = None
+            try:
+                versions = get_versions(db.session, ((table_name, scope or ALL) for table_name in tables))
+            except Exception:
+                # No version table yet (fresh database); serve without an ETag
+                db.session.rollback()
+                return view(*args, **kwargs)
+
+            etag = _digest(versions, extra=request.full_path)
+            g.table_version = _digest(versions)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                response.headers.setdefault('Cache-Control', 'no-cache')
+            return response
+        return wrapper
+    return decorator
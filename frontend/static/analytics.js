@@ -12,8 +12,7 @@ let teams = [];
 
 // Initialize on page load
 window.addEventListener('DOMContentLoaded', async () => {
-    await loadDimensionsAndMetrics();
-    await loadFilterOptions();
+    await loadInitialData();
     setupEventListeners();
 
     // Set default selection if university is in URL
@@ -25,20 +24,35 @@ window.addEventListener('DOMContentLoaded', async () => {
     }
 });
 
-// Load available metrics and dimensions from API
-async function loadDimensionsAndMetrics() {
+// Load metrics, dimensions and filter options in one round trip
+async function loadInitialData() {
+    let data;
     try {
-        const response = await fetch(`${API_BASE_URL}/analytics/dimensions`);
-        const data = await response.json();
-
-        availableMetrics = data.metrics;
-        availableDimensions = data.dimensions;
-
-        populateMetricSelect();
+        data = await FramesAPI.batch({
+            dimensions: '/api/analytics/dimensions',
+            universities: '/api/universities',
+            projects: '/api/projects',
+            teams: '/api/teams'
+        });
     } catch (error) {
-        console.error('Error loading dimensions:', error);
+        console.error('Error loading analytics data:', error);
+        showError('Failed to load analytics configuration');
+        return;
+    }
+    loadDimensionsAndMetrics(data.dimensions);
+    loadFilterOptions(data);
+}
+
+// Populate available metrics and dimensions
+function loadDimensionsAndMetrics(data) {
+    if (!data) {
         showError('Failed to load analytics configuration');
+        return;
     }
+    availableMetrics = data.metrics;
+    availableDimensions = data.dimensions;
+
+    populateMetricSelect();
 }
 
 // Populate metric dropdown
@@ -89,18 +103,12 @@ function updateGroupByOptions() {
     });
 }
 
-// Load filter dropdown options (universities, projects, teams)
-async function loadFilterOptions() {
+// Populate filter dropdown options (universities, projects, teams)
+function loadFilterOptions(data) {
     try {
-        const [universitiesResp, projectsResp, teamsResp] = await Promise.all([
-            fetch(`${API_BASE_URL}/universities`),
-            fetch(`${API_BASE_URL}/projects`),
-            fetch(`${API_BASE_URL}/teams`)
-        ]);
-
-        universities = await universitiesResp.json();
-        projects = await projectsResp.json();
-        teams = await teamsResp.json();
+        universities = data.universities || [];
+        projects = data.projects || [];
+        teams = data.teams || [];
 
         // Populate filter dropdowns
         const uniSelect = document.getElementById('filterUniversity');
@@ -235,6 +235,36 @@ class FramesAPI {
         });
         return await FramesAPI._handleResponse(response);
     }
+
+    // ============================================================================
+    // Batch
+    // ============================================================================
+
+    /**
+     * Run several GETs in one round trip.
+     * requests: {id: '/api/path', ...}; resolves to {id: body, ...}.
+     * A failed item resolves to null and is logged.
+     */
+    static async batch(requests) {
+        const response = await fetch(`${API_BASE_URL}/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                requests: Object.entries(requests).map(([id, path]) => ({ id, path }))
+            })
+        });
+        const data = await FramesAPI._handleResponse(response);
+        const results = {};
+        data.responses.forEach(item => {
+            if (item.status >= 400) {
+                console.error(`Batch request ${item.id} failed (${item.status}):`, item.body);
+                results[item.id] = null;
+            } else {
+                results[item.id] = item.body;
+            }
+        });
+        return results;
+    }
 }
 
 // Export for use in other scripts
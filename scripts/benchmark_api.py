@@ -0,0 +1,323 @@
+"""
+End-to-end load test for the FRAMES API.
+
+Seeds a local database (SQLite by default, or any URL given with
+--database) at a configurable scale, then drives the main endpoints
+concurrently through Flask's test client and reports, per scenario:
+- p50 / p95 / p99 / mean latency and throughput
+- SQL statements per request (from the /api/_metrics counters)
+- non-2xx responses
+
+Results can be saved as a baseline and later runs compared against it;
+--compare exits non-zero when a scenario's p95 regresses beyond
+--tolerance or it runs more queries than the baseline.
+
+The app runs in-process, so numbers include Python/GIL contention but no
+HTTP server or network. DATABASE_URL is never used implicitly: --seed
+drops and recreates every table of the target database.
+
+Usage:
+    python scripts/benchmark_api.py --seed --universities 8 --interfaces 2000
+    python scripts/benchmark_api.py --concurrency 8 --requests 200 --output baseline.json
+    python scripts/benchmark_api.py --compare baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / 'backend'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+DEFAULT_DATABASE = f"sqlite:///{Path(tempfile.gettempdir()) / 'frames_benchmark.db'}"
+
+EXPERTISE = ['Software', 'Electrical', 'Mechanical', 'Systems', 'Science']
+DISCIPLINES = ['software', 'electrical', 'mechanical', 'systems']
+BOND_TYPES = ['codified-strong', 'codified-moderate', 'institutional-weak', 'fragile-temporary']
+INTERFACE_TYPES = ['team-to-team', 'team-to-faculty', 'faculty-to-project']
+
+
+# ----------------------------------------------------------------------
+# Seeding
+# ----------------------------------------------------------------------
+
+def seed(app, db, args) -> dict:
+    """Recreate the schema and bulk-insert a synthetic multi-university dataset"""
+    from sqlalchemy import insert
+
+    from db_models import (
+        FacultyModel, FactorModel, FactorValue, InterfaceFactorValue, InterfaceModel,
+        ModelFactor, ProjectModel, RiskFactor, StudentModel, TeamModel, University,
+    )
+
+    rng = random.Random(args.random_seed)
+    rows = {name: [] for name in ('universities', 'projects', 'teams', 'students', 'faculty', 'interfaces')}
+    entities = []  # (university_id, entity_id) candidates for interfaces
+
+    rows['projects'].append({'id': 'PROVES', 'name': 'PROVES', 'type': 'collaborative', 'is_collaborative': True})
+    for u in range(args.universities):
+        university_id = f'U{u:02d}'
+        rows['universities'].append({'id': university_id, 'name': f'University {u}', 'is_lead': u == 0, 'active': True})
+        for p in range(args.projects):
+            project_id = f'{university_id}_project_{p}'
+            rows['projects'].append({'id': project_id, 'university_id': university_id,
+                                     'name': f'Project {p}', 'type': 'contract'})
+            for t in range(args.teams):
+                team_id = f'{project_id}_team_{t}'
+                entities.append((university_id, team_id))
+                rows['teams'].append({'id': team_id, 'university_id': university_id, 'project_id': project_id,
+                                      'name': f'Team {t}', 'discipline': rng.choice(DISCIPLINES)})
+                for s in range(args.students):
+                    terms = rng.randint(0, 6)
+                    rows['students'].append({
+                        'id': f'{team_id}_student_{s}', 'university_id': university_id, 'name': f'Student {s}',
+                        'team_id': team_id, 'expertise_area': rng.choice(EXPERTISE),
+                        'terms_remaining': terms, 'status': StudentModel.status_for(terms),
+                        'is_lead': s == 0, 'active': terms > 0,
+                    })
+        for f in range(args.faculty):
+            faculty_id = f'{university_id}_faculty_{f}'
+            entities.append((university_id, faculty_id))
+            rows['faculty'].append({'id': faculty_id, 'university_id': university_id,
+                                    'name': f'Faculty {f}', 'role': 'advisor'})
+
+    for i in range(args.interfaces):
+        (from_university, from_entity), (to_university, to_entity) = rng.choice(entities), rng.choice(entities)
+        rows['interfaces'].append({
+            'id': f'interface_{i}', 'from_entity': from_entity, 'to_entity': to_entity,
+            'interface_type': rng.choice(INTERFACE_TYPES), 'bond_type': rng.choice(BOND_TYPES),
+            'energy_loss': rng.randint(0, 60), 'from_university': from_university,
+            'to_university': to_university, 'is_cross_university': from_university != to_university,
+        })
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for model, key in ((University, 'universities'), (ProjectModel, 'projects'), (TeamModel, 'teams'),
+                           (StudentModel, 'students'), (FacultyModel, 'faculty'), (InterfaceModel, 'interfaces')):
+            if rows[key]:
+                db.session.execute(insert(model), rows[key])
+
+        factor_values = {}
+        for f in range(args.factors):
+            factor = RiskFactor(factor_name=f'factor_{f}', display_name=f'Factor {f}',
+                                category='Benchmark', confidence_level='exploratory', active=True)
+            db.session.add(factor)
+            db.session.flush()
+            values = [FactorValue(factor_id=factor.id, value_name=f'level_{v}', display_name=f'Level {v}',
+                                  energy_loss_contribution=round(0.05 * (v + 1), 2), sort_order=v)
+                      for v in range(3)]
+            db.session.add_all(values)
+            db.session.flush()
+            factor_values[factor.id] = [value.id for value in values]
+
+        for m in range(args.models):
+            model = FactorModel(model_name=f'benchmark_model_{m}', display_name=f'Benchmark Model {m}',
+                                is_active=m == 0, is_baseline=m == 0, validation_status='testing')
+            db.session.add(model)
+            db.session.flush()
+            db.session.add_all(ModelFactor(model_id=model.id, factor_id=factor_id,
+                                           weight=round(rng.uniform(0.5, 1.5), 2), enabled=True)
+                               for factor_id in factor_values)
+
+        assignments = [
+            {'interface_id': interface['id'], 'factor_id': factor_id, 'factor_value_id': rng.choice(value_ids)}
+            for interface in rows['interfaces']
+            for factor_id, value_ids in factor_values.items()
+        ]
+        if assignments:
+            db.session.execute(insert(InterfaceFactorValue), assignments)
+        db.session.commit()
+
+    counts = {key: len(value) for key, value in rows.items()}
+    counts.update(factors=args.factors, models=args.models, factor_assignments=len(assignments))
+    return counts
+
+
+# ----------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------
+
+def build_scenarios(app, db) -> list[dict]:
+    """Requests to drive; ids are read from the seeded database"""
+    from db_models import FactorModel, University
+
+    with app.app_context():
+        universities = [u.id for u in University.query.order_by(University.id).limit(2)]
+        model_ids = [m.id for m in FactorModel.query.order_by(FactorModel.id).limit(3)]
+    university = universities[0] if universities else 'U00'
+
+    analytics = [
+        {'metric': 'student_count', 'groupBy': 'university'},
+        {'metric': 'student_count', 'groupBy': 'status', 'filters': {'university_id': university}},
+        {'metric': 'avg_terms_remaining', 'groupBy': 'team'},
+        {'metric': 'team_count', 'groupBy': 'university'},
+    ]
+    return [
+        {'name': 'students', 'method': 'GET', 'path': '/api/students'},
+        {'name': 'students_page', 'method': 'GET', 'path': f'/api/students?university_id={university}&limit=50'},
+        {'name': 'dashboard_comparative', 'method': 'GET', 'path': '/api/dashboard/comparative'},
+        {'name': 'analytics_data', 'method': 'POST', 'path': '/api/analytics/data', 'bodies': analytics},
+        {'name': 'energy_network', 'method': 'GET', 'path': '/api/research/energy/network'},
+        {'name': 'energy_network_university', 'method': 'GET',
+         'path': f'/api/research/energy/network?university_id={university}'},
+        {'name': 'compare_models', 'method': 'POST', 'path': '/api/research/compare-models',
+         'bodies': [{'model_ids': model_ids}]},
+    ]
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(app, scenario: dict, requests: int, concurrency: int, warmup: int) -> dict:
+    from metrics import metrics
+
+    headers = {'X-Is-Researcher': 'true', 'X-University-ID': 'U00'}
+    bodies = scenario.get('bodies') or [None]
+    local = threading.local()
+
+    def call(i: int) -> tuple[float, int]:
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        body = bodies[i % len(bodies)]
+        start = time.perf_counter()
+        response = client.open(scenario['path'], method=scenario['method'], json=body, headers=headers)
+        response.get_data()
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    for i in range(warmup):
+        call(i)
+    metrics.reset()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(call, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _ in samples)
+    errors = sum(1 for _, status in samples if not 200 <= status < 300)
+    routes = metrics.summary()['routes']
+    executed = sum(r['sql_per_request'] * r['count'] for r in routes)
+    served = sum(r['count'] for r in routes)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(_percentile(latencies, 0.50), 3),
+        'p95_ms': round(_percentile(latencies, 0.95), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'throughput_rps': round(requests / elapsed, 1),
+        'queries_per_request': round(executed / served, 2) if served else None,
+    }
+
+
+# ----------------------------------------------------------------------
+# Baselines
+# ----------------------------------------------------------------------
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print a comparison table and return the regressions found"""
+    regressions = []
+    print(f"\n{'scenario':<28}{'p95 base':>10}{'p95 now':>10}{'delta':>9}{'queries':>14}")
+    for name, now in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            print(f"{name:<28}{'-':>10}{now['p95_ms']:>10.2f}{'new':>9}")
+            continue
+        delta = (now['p95_ms'] - base['p95_ms']) / base['p95_ms'] if base['p95_ms'] else 0.0
+        queries = f"{base['queries_per_request']} -> {now['queries_per_request']}"
+        print(f"{name:<28}{base['p95_ms']:>10.2f}{now['p95_ms']:>10.2f}{delta:>+9.0%}{queries:>14}")
+        if delta > tolerance:
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {now['p95_ms']:.2f} ms ({delta:+.0%})")
+        if (now['queries_per_request'] or 0) > (base['queries_per_request'] or 0):
+            regressions.append(f"{name}: {queries} queries per request")
+        if now['errors'] > base['errors']:
+            regressions.append(f"{name}: {base['errors']} -> {now['errors']} errors")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help=f'database URL (default {DEFAULT_DATABASE})')
+    parser.add_argument('--seed', action='store_true', help='drop, recreate and seed the database first')
+    parser.add_argument('--random-seed', type=int, default=1)
+    scale = parser.add_argument_group('scale (with --seed)')
+    scale.add_argument('--universities', type=int, default=8)
+    scale.add_argument('--projects', type=int, default=3, help='per university')
+    scale.add_argument('--teams', type=int, default=3, help='per project')
+    scale.add_argument('--students', type=int, default=5, help='per team')
+    scale.add_argument('--faculty', type=int, default=4, help='per university')
+    scale.add_argument('--interfaces', type=int, default=500)
+    scale.add_argument('--factors', type=int, default=4)
+    scale.add_argument('--models', type=int, default=3)
+    load = parser.add_argument_group('load')
+    load.add_argument('--requests', type=int, default=100, help='per scenario')
+    load.add_argument('--concurrency', type=int, default=4)
+    load.add_argument('--warmup', type=int, default=3)
+    load.add_argument('--scenario', action='append', help='only run these scenarios (repeatable)')
+    parser.add_argument('--output', help='write results to this JSON file (e.g. a new baseline)')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 increase (default 0.25)')
+    args = parser.parse_args()
+
+    # The app reads these at import time
+    os.environ['DATABASE_URL'] = args.database
+    os.environ.setdefault('FRAMES_AUDIT_SYNC', '1')
+    os.environ.setdefault('FRAMES_QUERY_BUDGET', 'off')
+    os.environ.setdefault('FRAMES_RESPONSE_CACHE_DB', '')
+    from backend.app import app, db
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'database': args.database.split(':', 1)[0],
+        'python': platform.python_version(),
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+    }
+    if args.seed:
+        start = time.perf_counter()
+        results['seeded'] = seed(app, db, args)
+        print(f"Seeded {results['seeded']} in {time.perf_counter() - start:.1f}s")
+
+    results['scenarios'] = {}
+    for scenario in build_scenarios(app, db):
+        if args.scenario and scenario['name'] not in args.scenario:
+            continue
+        r = run_scenario(app, scenario, args.requests, args.concurrency, args.warmup)
+        results['scenarios'][scenario['name']] = r
+        print(f"{scenario['name']:<28} p50 {r['p50_ms']:8.2f}  p95 {r['p95_ms']:8.2f}  p99 {r['p99_ms']:8.2f} ms"
+              f"  {r['throughput_rps']:8.1f} req/s  {r['queries_per_request']} q/req"
+              + (f"  {r['errors']} errors" if r['errors'] else ''))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print('\nRegressions:\n  ' + '\n  '.join(regressions))
+            sys.exit(1)
+        print('\nNo regressions.')
+
+
+if __name__ == "__main__":
+    main()
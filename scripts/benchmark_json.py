@@ -0,0 +1,102 @@
+"""
+Benchmark JSON encoding and response compression on the largest endpoints.
+
+Runs against the database in DATABASE_URL through Flask's test client and
+reports, per endpoint:
+- encode time of the payload with the stdlib provider vs FastJSONProvider
+- response bytes uncompressed / gzip / brotli
+- end-to-end request latency for each Accept-Encoding
+
+Usage:
+    python scripts/benchmark_json.py [--repeat 20] [--endpoint /api/students ...]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / 'backend'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from flask.json.provider import DefaultJSONProvider
+
+from backend.app import app
+from compression import _compress, brotli
+from json_provider import FastJSONProvider, orjson
+
+DEFAULT_ENDPOINTS = [
+    '/api/dashboard/comparative',
+    '/api/research/energy/network',
+    '/api/students',
+    '/api/interfaces',
+]
+
+
+def _median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_endpoint(client, endpoint: str, repeat: int) -> dict | None:
+    response = client.get(endpoint, headers={'Accept-Encoding': 'identity'})
+    if response.status_code != 200:
+        print(f"  {endpoint}: HTTP {response.status_code}, skipped")
+        return None
+    raw = response.get_data()
+    payload = json.loads(raw)
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    result = {
+        'endpoint': endpoint,
+        'bytes': len(raw),
+        'encode_stdlib_ms': _median_ms(lambda: stdlib.response(payload), repeat),
+        'encode_fast_ms': _median_ms(lambda: fast.response(payload), repeat),
+        'gzip_bytes': len(_compress(raw, 'gzip')),
+        'gzip_ms': _median_ms(lambda: _compress(raw, 'gzip'), repeat),
+    }
+    if brotli is not None:
+        result['br_bytes'] = len(_compress(raw, 'br'))
+        result['br_ms'] = _median_ms(lambda: _compress(raw, 'br'), repeat)
+
+    for encoding in ('identity', 'gzip', 'br'):
+        headers = {'Accept-Encoding': encoding}
+        result[f'request_{encoding}_ms'] = _median_ms(
+            lambda: client.get(endpoint, headers=headers).get_data(), repeat)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', action='append', help='endpoint to benchmark (repeatable)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if orjson else 'no'}, brotli: {'yes' if brotli else 'no'}")
+    client = app.test_client()
+    for endpoint in args.endpoint or DEFAULT_ENDPOINTS:
+        r = bench_endpoint(client, endpoint, args.repeat)
+        if r is None:
+            continue
+        print(f"\n{endpoint}")
+        print(f"  encode   stdlib {r['encode_stdlib_ms']:8.2f} ms   fast {r['encode_fast_ms']:8.2f} ms")
+        line = f"  bytes    raw {r['bytes']:>10,}   gzip {r['gzip_bytes']:>10,} ({r['gzip_ms']:.2f} ms)"
+        if 'br_bytes' in r:
+            line += f"   br {r['br_bytes']:>10,} ({r['br_ms']:.2f} ms)"
+        print(line)
+        print("  request  " + "   ".join(
+            f"{enc} {r[f'request_{enc}_ms']:.2f} ms" for enc in ('identity', 'gzip', 'br')))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Apply additive schema changes to an existing FRAMES database.
+
+`db.create_all()` creates missing tables but never alters existing ones, so
+columns and indexes added to existing models are applied here. Every step
+checks the live schema first and is safe to re-run.
+"""
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+
+from sqlalchemy import DateTime, String, bindparam, inspect, text, update
+from sqlalchemy.sql import column as sql_column, table as sql_table
+
+# Add backend to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / 'backend'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from backend.db_connection import get_engine
+from db_models import parse_timestamp
+
+# (table, column, column DDL)
+ADDED_COLUMNS = [
+    ('sandboxes', 'base_snapshot_id', 'VARCHAR'),
+    ('sandboxes', 'diff', 'TEXT'),
+]
+
+# (table, column) changed from ISO-string VARCHAR to a native timestamp
+TIMESTAMP_COLUMNS = [
+    ('teams', 'created_at'),
+    ('faculty', 'created_at'),
+    ('projects', 'created_at'),
+    ('students', 'created_at'),
+    ('students', 'graduated_at'),
+    ('outcomes', 'recorded_at'),
+    ('audit_logs', 'timestamp'),
+]
+
+# (index name, table, columns)
+ADDED_INDEXES = [
+    ('ix_sandboxes_base_snapshot_id', 'sandboxes', ('base_snapshot_id',)),
+    ('ix_audit_logs_entity', 'audit_logs', ('entity_type', 'entity_id', 'id')),
+    ('ix_audit_logs_university', 'audit_logs', ('university_id', 'id')),
+    ('ix_audit_logs_actor', 'audit_logs', ('actor', 'id')),
+    ('ix_audit_logs_timestamp', 'audit_logs', ('timestamp',)),
+    ('ix_interface_factor_values_interface_id', 'interface_factor_values', ('interface_id',)),
+    ('ix_teams_created_at', 'teams', ('created_at',)),
+    ('ix_faculty_created_at', 'faculty', ('created_at',)),
+    ('ix_projects_created_at', 'projects', ('created_at',)),
+    ('ix_students_created_at', 'students', ('created_at',)),
+    ('ix_students_graduated_at', 'students', ('graduated_at',)),
+    ('ix_outcomes_recorded_at', 'outcomes', ('recorded_at',)),
+]
+
+
+def add_columns(conn, inspector) -> None:
+    tables = set(inspector.get_table_names())
+    for table, column, ddl in ADDED_COLUMNS:
+        if table not in tables:
+            continue  # created with the column by db.create_all()
+        existing = {c['name'] for c in inspector.get_columns(table)}
+        if column in existing:
+            continue
+        print(f"  + {table}.{column}")
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+# Values PostgreSQL casts to the same naive timestamp parse_timestamp() returns
+_PLAIN_TIMESTAMP = r'\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?'
+
+
+def _normalize_timestamp(value):
+    """The value the app would store for `value`: naive local time, or None if unparseable"""
+    try:
+        return parse_timestamp(value)
+    except ValueError:
+        return None
+
+
+def _rewrite_values(conn, table_name: str, column_name: str, values, as_text: bool) -> None:
+    target = sql_table(table_name, sql_column(column_name, String() if as_text else DateTime()))
+    rows = []
+    for value in values:
+        parsed = _normalize_timestamp(value)
+        if as_text and parsed is not None:
+            parsed = parsed.isoformat(sep=' ')
+        rows.append({'old': value, 'new': parsed})
+    conn.execute(
+        update(target)
+        .where(target.c[column_name] == bindparam('old', type_=String()))
+        .values({column_name: bindparam('new', type_=target.c[column_name].type)}),
+        rows,
+    )
+
+
+def convert_timestamps(conn, inspector) -> None:
+    """
+    Values are normalized with the app's own parse_timestamp(), so backfilled
+    and newly written rows agree: offsets become naive local time and
+    unparseable values ('' included) become NULL.
+
+    PostgreSQL: rewrite the values a plain cast would get wrong (offsets) or
+    fail on (malformed, out-of-range dates), then change the column type.
+    SQLite keeps declared types, so rewrite every value not already in the
+    DateTime storage format ('T' separator, offsets, dates, '') so that range
+    comparisons order correctly.
+    """
+    tables = set(inspector.get_table_names())
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        if table_name not in tables:
+            continue
+        if conn.dialect.name == 'postgresql':
+            current = {c['name']: c['type'] for c in inspector.get_columns(table_name)}[column_name]
+            if isinstance(current, DateTime):
+                continue
+            plain = re.compile(_PLAIN_TIMESTAMP)
+            values = [
+                value for (value,) in conn.execute(text(
+                    f"SELECT DISTINCT {column_name} FROM {table_name} WHERE {column_name} IS NOT NULL"
+                ))
+                if not plain.fullmatch(value) or _normalize_timestamp(value) is None
+            ]
+            if values:
+                print(f"  ~ {table_name}.{column_name}: normalizing {len(values)} values")
+                _rewrite_values(conn, table_name, column_name, values, as_text=True)
+            print(f"  ~ {table_name}.{column_name} -> TIMESTAMP")
+            conn.execute(text(
+                f"ALTER TABLE {table_name} ALTER COLUMN {column_name} TYPE TIMESTAMP "
+                f"USING {column_name}::timestamp"
+            ))
+            continue
+
+        values = [row[0] for row in conn.execute(text(
+            f"SELECT DISTINCT {column_name} FROM {table_name} "
+            f"WHERE typeof({column_name}) = 'text' AND ({column_name} LIKE '%T%' OR length({column_name}) != 26)"
+        ))]
+        if not values:
+            continue
+        print(f"  ~ {table_name}.{column_name}: normalizing {len(values)} values")
+        _rewrite_values(conn, table_name, column_name, values, as_text=False)
+
+
+def add_indexes(conn, inspector) -> None:
+    tables = set(inspector.get_table_names())
+    for name, table, columns in ADDED_INDEXES:
+        if table not in tables:
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table)}
+        if name in existing:
+            continue
+        print(f"  + index {name}")
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def main() -> None:
+    print("Applying schema migrations...")
+    engine = get_engine()
+    try:
+        with engine.begin() as conn:
+            add_columns(conn, inspect(conn))
+        with engine.begin() as conn:
+            convert_timestamps(conn, inspect(conn))
+        with engine.begin() as conn:
+            add_indexes(conn, inspect(conn))
+        print("Schema is up to date.")
+    except Exception as exc:
+        print(f"Schema migration failed: {exc}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Rebuild or check the FRAMES analytics rollups.
+
+The app keeps `student_rollups` and `team_rollups` in step with its own
+writes. Writes made outside the app (SQL consoles, scripts with their own
+engine) are not seen; run this afterwards, or with --check to compare the
+rollups against a fresh aggregation without changing anything.
+
+A rebuild bumps the rollup tables' write versions, which the analytics
+results are cached under, so running workers stop serving payloads built
+from the old rollups; the shared response cache (FRAMES_RESPONSE_CACHE_DB)
+is cleared as well.
+
+    python scripts/rebuild_rollups.py                  # rebuild everything
+    python scripts/rebuild_rollups.py -u CalPolyPomona # rebuild one university
+    python scripts/rebuild_rollups.py --check          # exit 1 on any drift
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add backend to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / 'backend'):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from backend.db_connection import get_engine
+from backend.database import db
+from response_cache import DEFAULT_DISK_PATH, ResponseCache
+from rollups import ROLLUPS
+from versioning import bump_connection_versions
+
+
+def check(conn) -> int:
+    drift = 0
+    for rollup in ROLLUPS.values():
+        differences = rollup.check(conn)
+        drift += len(differences)
+        print(f"{rollup.table.name}: {len(differences)} differing rows")
+        for key, stored, expected in differences[:20]:
+            print(f"  {key}: stored {stored}, expected {expected}")
+        if len(differences) > 20:
+            print(f"  ... {len(differences) - 20} more")
+    return drift
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--check', action='store_true', help='report drift instead of rebuilding')
+    parser.add_argument('-u', '--university', action='append', dest='universities',
+                        help='only rebuild this university (repeatable)')
+    args = parser.parse_args()
+
+    engine = get_engine()
+    try:
+        db.Model.metadata.create_all(bind=engine, tables=[r.table for r in ROLLUPS.values()])
+        if args.check:
+            with engine.connect() as conn:
+                drift = check(conn)
+            sys.exit(1 if drift else 0)
+        with engine.begin() as conn:
+            for rollup in ROLLUPS.values():
+                rollup.rebuild(conn, args.universities)
+                bump_connection_versions(conn, rollup.table.name, args.universities)
+                print(f"Rebuilt {rollup.table.name}")
+        if DEFAULT_DISK_PATH:
+            ResponseCache(disk_path=DEFAULT_DISK_PATH).clear()
+            print(f"Cleared response cache {DEFAULT_DISK_PATH}")
+    except Exception as exc:
+        print(f"Rollup rebuild failed: {exc}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()